@@ -1,56 +1,239 @@
 import os
 import pandas as pd
 import numpy as np
-from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from scipy.spatial import KDTree
-import traceback
 
+from dataset_loader import industry_name
+from instrumentation import (
+    QUIET,
+    RUN_REPORT_NAME,
+    STAGE,
+    banner,
+    configure,
+    file_bytes,
+    log,
+    main_stage,
+)
+from stage_cache import run_cached_file_tasks
+from table_io import list_tables, read_table, table_name, write_table
 
-def add_adj_industry_count_column(input_csv_folder, output_csv_folder):
-    # type: (str, str) -> str
+# 인접 업장 수 프로파일 반경 (m, EPSG:5174 좌표 단위)
+ADJ_RADII = (50, 100, 250, 500, 1000, 2000)
+
+COORD_COLUMNS = ["좌표정보x(epsg5174)", "좌표정보y(epsg5174)"]
+
+
+def adj_count_column(radius):
+    # type: (float) -> str
+    return f"adj_count_{radius:g}m"
+
+
+def adjacent_count_profile(tree, coords, radii):
+    # type: (KDTree, np.ndarray, tuple) -> dict
+    # 반경별 인접 업장 수 (자기 자신 제외), {반경: 배열}
+    # KDTree 는 파일마다 한 번만 만들고 반경마다 전체 좌표를 한 번에 조회한다.
+    return {
+        radius: tree.query_ball_point(coords, r=radius, return_length=True) - 1
+        for radius in radii
+    }
+
+
+def _operating_days(df):
+    # type: (pd.DataFrame) -> tuple
+    # start_date / end_date (03DISTANCE_CALCULATED) 를 일 단위 정수로 변환
+    start_days = pd.to_datetime(df["start_date"]).to_numpy(dtype="datetime64[D]")
+    end_days = pd.to_datetime(df["end_date"]).to_numpy(dtype="datetime64[D]")
+    return start_days.astype(np.int64), end_days.astype(np.int64)
+
+
+def time_aware_adjacent_counts(coords, start_days, end_days, radius):
+    # type: (np.ndarray, np.ndarray, np.ndarray, float) -> tuple
+    # 반경 radius 안의 업장 중 영업 기간이 겹치는 업장 수와
+    # 영업 기간 동안 동시에 영업한 업장 수의 평균 (겹친 일수 합 / 영업 일수)
+    # 반경 안의 쌍은 KDTree.query_pairs 로 한 번에 구하고 기간 비교는 배열 연산으로 처리
+    n = len(coords)
+    overlap_counts = np.zeros(n, dtype=np.int64)
+    concurrent = np.zeros(n)
+    if n < 2 or not np.isfinite(radius):
+        return overlap_counts, concurrent
+
+    pairs = KDTree(coords).query_pairs(radius, output_type="ndarray")
+    first, second = pairs[:, 0], pairs[:, 1]
+    shared_days = (
+        np.minimum(end_days[first], end_days[second])
+        - np.maximum(start_days[first], start_days[second])
+        + 1
+    )
+    overlap = shared_days > 0
+    first, second, shared_days = first[overlap], second[overlap], shared_days[overlap]
+
+    overlap_counts = np.bincount(first, minlength=n) + np.bincount(second, minlength=n)
+    total_days = np.bincount(first, weights=shared_days, minlength=n) + np.bincount(
+        second, weights=shared_days, minlength=n
+    )
+    durations = end_days - start_days + 1
+    np.divide(total_days, durations, out=concurrent, where=durations > 0)
+    return overlap_counts, concurrent
+
+
+def _add_adj_industry_count_file(
+    file_name, input_csv_folder, output_csv_folder, output_format, time_aware, radii
+):
+    # type: (str, str, str, str, bool, tuple) -> dict
+    log(f"Processing {file_name}...")
+    input_file_path = os.path.join(input_csv_folder, file_name)
+    output_file_path = os.path.join(
+        output_csv_folder, table_name(file_name, output_format)
+    )
+
+    # Read the table (csv / parquet / feather)
+    df = read_table(input_file_path)
+
+    # Calculate nearest neighbor distances
+    coords = df[["좌표정보x(epsg5174)", "좌표정보y(epsg5174)"]].values
+    # Mean of all values in the column "동일업종 최근접거리의 평균"
+    avg_distance = df["동일업종 최근접거리의 평균"].mean()
+    if len(coords) < 2:
+        df["adj_industry_count"] = np.zeros(len(df), dtype=int)
+        for radius in radii:
+            df[adj_count_column(radius)] = np.zeros(len(df), dtype=int)
+    else:
+        tree = KDTree(coords)
+        df["adj_industry_count"] = (
+            tree.query_ball_point(coords, avg_distance, return_length=True) - 1
+        )
+        for radius, counts in adjacent_count_profile(tree, coords, radii).items():
+            df[adj_count_column(radius)] = counts
+
+    # 영업 기간이 겹치는 인접 업장 수 / 동시에 영업한 인접 업장 수의 평균
+    if time_aware:
+        if {"start_date", "end_date"}.issubset(df.columns):
+            start_days, end_days = _operating_days(df)
+            overlap_counts, concurrent = time_aware_adjacent_counts(
+                np.asarray(coords, dtype=float), start_days, end_days, avg_distance
+            )
+            df["adj_industry_count_overlap"] = overlap_counts
+            df["adj_industry_avg_concurrent"] = concurrent
+        else:
+            log(
+                f"⚠️ start_date / end_date 가 없어 기간 비교를 건너뜀: {file_name}",
+                level=QUIET,
+            )
+
+    # Save the updated DataFrame to the output folder
+    write_table(df, output_file_path)
+    log(f"Processed and saved: {file_name}")
+    return {"rows": len(df), "rows_in": len(df)}
+
+
+def _output_names(file_name, output_format):
+    # type: (str, str) -> list
+    return [table_name(file_name, output_format)]
+
+
+def add_adj_industry_count_column(
+    input_csv_folder,
+    output_csv_folder,
+    max_workers=None,
+    output_format="csv",
+    force=False,
+    time_aware=False,
+    radii=(),
+):
+    # type: (str, str, int, str, bool, bool, tuple) -> str
+    # 입력 파일 내용이 이전 실행과 같으면 다시 계산하지 않는다. (force=True 이면 모두 계산)
+    # time_aware 이면 영업 기간이 겹치는 업장만 센 컬럼도 추가한다. (기본값은 추가하지 않음)
+    # (adj_industry_count_overlap, adj_industry_avg_concurrent)
+    # radii 의 반경마다 adj_count_{r}m 컬럼을 추가하고, 업종별 K/L 함수 요약을
+    # output_csv_folder 에 업종별_인접업장_프로파일.csv 로 저장한다. (예: radii=ADJ_RADII)
+    banner("add_adj_industry_count")
+    radii = tuple(radii or ())
+    summary_folder = output_csv_folder
     output_csv_folder = os.path.join(output_csv_folder + "/" + "04adj_industry_added")
     os.makedirs(output_csv_folder, exist_ok=True)
 
-    def process_file(file_name):
-        print(f"Processing {file_name}...")
-        try:
-            input_file_path = os.path.join(input_csv_folder, file_name)
-            output_file_path = os.path.join(output_csv_folder, file_name)
-
-            # Read the CSV file
-            df = pd.read_csv(input_file_path)
-
-            # Calculate nearest neighbor distances
-            coords = df[["좌표정보x(epsg5174)", "좌표정보y(epsg5174)"]].values
-            if len(coords) < 2:
-                df["adj_industry_count"] = np.zeros(len(df), dtype=int)
-            else:
-                tree = KDTree(coords)
-                avg_distance = df[
-                    "동일업종 최근접거리의 평균"
-                ].mean()  # Mean of all values in the column "동일업종 최근접거리의 평균"
-                df["adj_industry_count"] = [
-                    len(tree.query_ball_point(coord, avg_distance)) - 1
-                    for coord in coords
-                ]
-
-            # Save the updated DataFrame to the output folder
-            df.to_csv(output_file_path, index=False)
-            print(f"Processed and saved: {file_name}")
-
-        except Exception as e:
-            print(f"Error processing {file_name}: {e}")
-            traceback.print_exc()
-
-    # Use ThreadPoolExecutor for parallel processing
-    with ThreadPoolExecutor() as executor:
-        csv_files = [f for f in os.listdir(input_csv_folder) if f.endswith(".csv")]
-        executor.map(process_file, csv_files)
+    # Use a process pool for parallel processing
+    csv_files = list_tables(input_csv_folder)
+    run_cached_file_tasks(
+        partial(
+            _add_adj_industry_count_file,
+            input_csv_folder=input_csv_folder,
+            output_csv_folder=output_csv_folder,
+            output_format=output_format,
+            time_aware=time_aware,
+            radii=radii,
+        ),
+        input_csv_folder,
+        csv_files,
+        output_csv_folder,
+        partial(_output_names, output_format=output_format),
+        params={
+            "output_format": output_format,
+            "time_aware": time_aware,
+            "radii": radii,
+        },
+        force=force,
+        max_workers=max_workers,
+        stage_name="add_adj_industry_count",
+    )
+
+    if radii:
+        write_adjacency_profile_summary(
+            output_csv_folder,
+            os.path.join(summary_folder, "업종별_인접업장_프로파일.csv"),
+            radii,
+        )
 
     return output_csv_folder
 
 
+def ripley_summary(coords, counts_by_radius):
+    # type: (np.ndarray, dict) -> dict
+    # 업종 단위 Ripley K / L 함수 (좌표 bounding box 면적 기준, 가장자리 보정 없음)
+    # K(r) = 면적 / (n (n-1)) * 반경 r 안의 (자기 제외) 이웃 수 합, L(r) = sqrt(K(r) / pi)
+    n = len(coords)
+    area = float(np.prod(np.ptp(coords, axis=0))) if n > 0 else 0.0
+    summary = {"샘플수": n, "면적(m²)": area}
+    for radius, counts in counts_by_radius.items():
+        if n < 2 or area <= 0:
+            k_value = np.nan
+        else:
+            k_value = area * float(np.sum(counts)) / (n * (n - 1))
+        summary[f"K_{radius:g}m"] = k_value
+        summary[f"L_{radius:g}m"] = np.sqrt(k_value / np.pi)
+    return summary
+
+
+def write_adjacency_profile_summary(input_csv_folder, output_csv_path, radii):
+    # type: (str, str, tuple) -> pd.DataFrame
+    # 04adj_industry_added 의 반경별 인접 업장 수 컬럼만 읽어서 업종별 요약 저장
+    with main_stage("adjacency_profile_summary") as record:
+        rows = []
+        record["rows_in"] = 0
+        record["bytes_in"] = 0
+        for file_name in list_tables(input_csv_folder):
+            file_path = os.path.join(input_csv_folder, file_name)
+            columns = COORD_COLUMNS + [adj_count_column(radius) for radius in radii]
+            df = read_table(file_path, columns=columns)
+            record["rows_in"] += len(df)
+            record["bytes_in"] += file_bytes(file_path)
+            if not set(columns).issubset(df.columns):
+                continue
+            summary = ripley_summary(
+                df[COORD_COLUMNS].to_numpy(dtype=float),
+                {radius: df[adj_count_column(radius)].to_numpy() for radius in radii},
+            )
+            rows.append({"업종명": industry_name(file_name), **summary})
+
+        output_df = pd.DataFrame(rows)
+        output_df.to_csv(output_csv_path, index=False, encoding="utf-8-sig")
+        record["rows"] = len(output_df)
+        record["bytes_out"] = file_bytes(output_csv_path)
+    log(f"업종별 인접 업장 프로파일 저장: {output_csv_path}", level=STAGE)
+    return output_df
+
+
 if __name__ == "__main__":
     OUTPUT_FOLDER = (
         "C:/Users/bsh96/Documents/GitHub/spring_UDIK/DATA/LOCALDATA_FILTERED_CSV"
@@ -58,8 +241,16 @@ if __name__ == "__main__":
 
     input_csv_folder = "C:/Users/bsh96/Documents/GitHub/spring_UDIK/DATA/LOCALDATA_FILTERED_CSV/03DISTANCE_CALCULATED"
 
-    # 생존 column 추가
+    # 콘솔 출력 수준과 실행 보고서 (단계별 처리 시간, 행 수, 바이트, 최대 메모리)
+    configure(verbosity=STAGE, report_path=os.path.join(OUTPUT_FOLDER, RUN_REPORT_NAME))
+
+    # 인접 동일업종 수 column 추가 (output_format: "csv", "parquet", "feather")
+    # time_aware: 영업 기간이 겹치는 인접 업장 수 컬럼도 추가
+    # radii: 반경별 인접 업장 수 컬럼과 업종별 K/L 함수 요약 (업종별_인접업장_프로파일.csv)
     output_csv_folder = add_adj_industry_count_column(
         input_csv_folder,
         OUTPUT_FOLDER,
+        output_format="csv",
+        time_aware=True,
+        radii=ADJ_RADII,
     )
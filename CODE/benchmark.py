@@ -0,0 +1,464 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+from add_adj_industry_count import add_adj_industry_count_column
+from dataset_loader import load_industries
+from filter_csv import (
+    DISTANCE_MODES,
+    DISTANCE_SUMS,
+    DistanceCalculator,
+    add_survival_column,
+    filter_by_address,
+    filter_by_open_and_close,
+    filter_small_csv_files,
+    shared_average_distance,
+    time_windows,
+)
+from get_total_industry_chart import REPORTS, build_industry_reports
+from logit_batch import fit_logit_batch, stack_designs
+from render_boxplots import render_boxplots
+from resampling import compare_industries
+from synthetic_localdata import make_industry, write_localdata
+from table_io import list_tables, table_row_count
+
+# 합성 데이터 크기별 (전체 행 수) 단계 시간 측정
+SIZES = (2_000, 10_000, 50_000)
+N_INDUSTRIES = 4
+ADDRESS_NAME = "서울특별시"
+OPEN_YEAR = 2016
+MAX_ROWS = 50
+END_DATE = datetime(2024, 12, 31)
+# 분석 단계의 순열/부트스트랩 재표본 수 (ttest_boxplot 보다 적게)
+BENCH_RESAMPLES = 2_000
+
+# 기준 대비 (1 + TOLERANCE) 배보다 느리고, 차이가 MIN_SECONDS 이상이면 성능 저하로 표시
+TOLERANCE = 0.25
+MIN_SECONDS = 0.05
+
+RESULT_NAME = "benchmark_results.json"
+
+# 한 파일을 여러 프로세스로 나눠 계산할 때 (DistanceCalculator row_workers) 의 확장성
+ROW_WORKER_ROWS = 20_000
+ROW_WORKERS = (2, 4, 8)
+ROW_WORKER_YEARS = (2010, 2023)
+ROW_WORKER_RESULT_NAME = "row_worker_scaling.json"
+
+LOGIT_COLUMNS = ["생존", "동일업종 최근접거리의 평균", "adj_industry_count"]
+TTEST_COLUMNS = ["생존", "adj_industry_count"]
+
+
+def folder_rows(folder):
+    # type: (str) -> int
+    return sum(
+        table_row_count(os.path.join(folder, file_name))
+        for file_name in list_tables(folder)
+    )
+
+
+def folder_bytes(folder):
+    # type: (str) -> int
+    return sum(
+        os.path.getsize(os.path.join(folder, file_name))
+        for file_name in list_tables(folder)
+    )
+
+
+def _timed(records, stage, input_folder, func):
+    # type: (dict, str, str, callable) -> object
+    # func() 실행 시간과 입력 행 수 / 출력 행 수 / 처리량(행/초)을 records[stage] 에 기록
+    # func 가 폴더 경로를 반환하면 그 폴더의 행 수를 출력 행 수로 본다.
+    rows_in = folder_rows(input_folder)
+    bytes_in = folder_bytes(input_folder)
+    start = time.perf_counter()
+    output = func()
+    seconds = time.perf_counter() - start
+    rows_out = (
+        folder_rows(output)
+        if isinstance(output, str) and os.path.isdir(output)
+        else None
+    )
+    records[stage] = {
+        "seconds": round(seconds, 4),
+        "rows_in": rows_in,
+        "rows_out": rows_out,
+        "bytes_in": bytes_in,
+        "rows_per_second": round(rows_in / seconds, 1) if seconds > 0 else None,
+    }
+    return output
+
+
+def _logistic_stage(input_folder):
+    # type: (str) -> None
+    # logistic_summary.py 와 같은 읽기 + 일괄 적합
+    datasets = load_industries(
+        input_folder, columns=LOGIT_COLUMNS, required=True, disk_cache=False
+    )
+    designs, targets = [], []
+    for df in datasets.values():
+        df = df[LOGIT_COLUMNS].dropna()
+        if df["생존"].nunique() < 2 or len(df) < 10:
+            continue
+        designs.append(
+            np.column_stack([np.ones(len(df)), df[LOGIT_COLUMNS[1:]].to_numpy(float)])
+        )
+        targets.append(df["생존"].astype(int).to_numpy())
+    if designs:
+        fit_logit_batch(*stack_designs(designs, targets))
+
+
+def _resampling_stage(input_folder, max_workers):
+    # type: (str, int) -> None
+    # ttest_boxplot.py 와 같은 업종별 생존/폐업 표본의 순열 검정 + 부트스트랩
+    samples = {}
+    datasets = load_industries(
+        input_folder, columns=TTEST_COLUMNS, required=True, disk_cache=False
+    )
+    for name, df in datasets.items():
+        alive = df[df["생존"] == True]["adj_industry_count"].dropna()
+        dead = df[df["생존"] == False]["adj_industry_count"].dropna()
+        if len(alive) > 1 and len(dead) > 1:
+            samples[name] = (alive.to_numpy(), dead.to_numpy())
+    compare_industries(
+        samples, seed=0, n_resamples=BENCH_RESAMPLES, max_workers=max_workers
+    )
+
+
+def run_pipeline(work_folder, total_rows, encoding="cp949", max_workers=None, seed=0):
+    # type: (str, int, str, int, int) -> dict
+    # 합성 원본을 만들고 파이프라인 단계와 분석 단계를 순서대로 실행하면서 시간 측정
+    # 모든 단계는 force=True 로 실행한다. (단계 캐시를 사용하지 않음)
+    raw_folder = os.path.join(work_folder, "raw")
+    out = os.path.join(work_folder, "out")
+    write_localdata(
+        raw_folder,
+        total_rows,
+        n_industries=N_INDUSTRIES,
+        encoding=encoding,
+        seed=seed,
+        open_years=(OPEN_YEAR, OPEN_YEAR),
+    )
+
+    records = {}
+    folder = _timed(
+        records,
+        "filter_by_address",
+        raw_folder,
+        lambda: filter_by_address(
+            raw_folder, out, ADDRESS_NAME, max_workers=max_workers, force=True
+        ),
+    )
+    folder = _timed(
+        records,
+        "filter_by_open_and_close",
+        folder,
+        lambda: filter_by_open_and_close(
+            folder, out, open_year=OPEN_YEAR, max_workers=max_workers, force=True
+        ),
+    )
+    folder = _timed(
+        records,
+        "filter_small_csv_files",
+        folder,
+        lambda: filter_small_csv_files(
+            folder, out, max_rows=MAX_ROWS, max_workers=max_workers, force=True
+        ),
+    )
+    folder = _timed(
+        records,
+        "add_survival_column",
+        folder,
+        lambda: add_survival_column(folder, out, max_workers=max_workers, force=True),
+    )
+    calculator = DistanceCalculator(folder, out, end_date=END_DATE)
+
+    def distance_stage():
+        calculator.process_all_files(max_workers=max_workers, force=True)
+        return calculator.output_folder_path
+
+    _timed(records, "DistanceCalculator", folder, distance_stage)
+    folder = _timed(
+        records,
+        "add_adj_industry_count_column",
+        calculator.output_folder_path,
+        lambda: add_adj_industry_count_column(
+            calculator.output_folder_path, out, max_workers=max_workers, force=True
+        ),
+    )
+
+    # 분석 단계 (04adj_industry_added 입력)
+    report_folder = os.path.join(work_folder, "reports")
+    os.makedirs(report_folder, exist_ok=True)
+    _timed(
+        records,
+        "build_industry_reports",
+        folder,
+        lambda: build_industry_reports(
+            folder,
+            report_folder,
+            reports=tuple(REPORTS),
+            group_stats=[
+                ("생존", "동일업종 최근접거리의 평균"),
+                ("생존", "adj_industry_count"),
+            ],
+            max_workers=max_workers,
+        ),
+    )
+    _timed(records, "logistic_summary", folder, lambda: _logistic_stage(folder))
+    _timed(
+        records,
+        "resampling",
+        folder,
+        lambda: _resampling_stage(folder, max_workers),
+    )
+    _timed(
+        records,
+        "render_boxplots",
+        folder,
+        lambda: render_boxplots(
+            folder,
+            os.path.join(report_folder, "boxplots"),
+            max_workers=max_workers,
+            force=True,
+        ),
+    )
+    return records
+
+
+def scaling_exponents(results):
+    # type: (dict) -> dict
+    # 단계별 시간 ~ 행 수^k 의 k (로그-로그 기울기, 1 이면 선형)
+    exponents = {}
+    for stage, runs in results["stages"].items():
+        points = [
+            (run["size"], run["seconds"])
+            for run in runs
+            if run["size"] > 0 and run["seconds"] > 0
+        ]
+        if len(points) < 2:
+            exponents[stage] = None
+            continue
+        sizes, seconds = np.log(np.array(points)).T
+        exponents[stage] = round(float(np.polyfit(sizes, seconds, 1)[0]), 3)
+    return exponents
+
+
+def find_regressions(results, baseline, tolerance=TOLERANCE, min_seconds=MIN_SECONDS):
+    # type: (dict, dict, float, float) -> list
+    # 같은 단계 / 같은 크기의 기준 시간보다 느려진 경우 목록
+    regressions = []
+    for stage, runs in results["stages"].items():
+        base_runs = {
+            run["size"]: run for run in baseline.get("stages", {}).get(stage, [])
+        }
+        for run in runs:
+            base = base_runs.get(run["size"])
+            if base is None:
+                continue
+            if (
+                run["seconds"] > base["seconds"] * (1 + tolerance)
+                and run["seconds"] - base["seconds"] >= min_seconds
+            ):
+                regressions.append(
+                    {
+                        "stage": stage,
+                        "size": run["size"],
+                        "seconds": run["seconds"],
+                        "baseline_seconds": base["seconds"],
+                        "ratio": round(run["seconds"] / base["seconds"], 3),
+                    }
+                )
+    return regressions
+
+
+def print_report(results):
+    # type: (dict) -> None
+    print("----- benchmark 결과 (초 / 행/초) -----")
+    sizes = results["sizes"]
+    print("단계".ljust(32) + "".join(f"{size:>22,}" for size in sizes) + "   scaling")
+    for stage, runs in results["stages"].items():
+        by_size = {run["size"]: run for run in runs}
+        cells = ""
+        for size in sizes:
+            run = by_size.get(size)
+            if run is None:
+                cells += " " * 22
+                continue
+            throughput = run["rows_per_second"] or 0
+            cells += f"{run['seconds']:>10.3f}s {throughput:>10,.0f}"
+        exponent = results["scaling"].get(stage)
+        print(stage.ljust(32) + cells + f"   {'' if exponent is None else exponent}")
+
+    for regression in results.get("regressions", []):
+        print(
+            f"⚠️ 성능 저하: {regression['stage']} ({regression['size']:,}행) "
+            f"{regression['baseline_seconds']}s -> {regression['seconds']}s "
+            f"(x{regression['ratio']})"
+        )
+
+
+def row_worker_scaling(
+    total_rows=ROW_WORKER_ROWS,
+    workers=ROW_WORKERS,
+    modes=tuple(DISTANCE_MODES),
+    output_folder=None,
+    seed=0,
+    open_years=ROW_WORKER_YEARS,
+):
+    # type: (int, tuple, tuple, str, int, tuple) -> dict
+    # 업종 파일 하나의 거리 계산을 row_workers=1 과 row_workers=w 로 비교한다.
+    # - seconds / speedup: 실제 프로세스 풀 실행 시간과 row_workers=1 대비 배수
+    # - work_ratio: 구간별 계산 시간 합계 / row_workers=1 시간 (1 이면 중복 계산 없음)
+    # - ideal_speedup: row_workers=1 시간 / 가장 오래 걸린 구간 시간
+    #   (코어가 w 개 이상일 때 기대할 수 있는 배수, 코어 수와 관계없이 측정 가능)
+    # - max_abs_diff: row_workers=1 결과와의 최대 차이 (합산 순서 차이만 있어야 한다)
+    df = make_industry(total_rows, seed=seed, open_years=open_years)
+    with tempfile.TemporaryDirectory() as work_folder:
+        calculator = DistanceCalculator(work_folder, work_folder, end_date=END_DATE)
+        inputs = calculator.engine_inputs(calculator.prepare_rows(df))
+    coords, start_dates, end_dates, name_codes = inputs
+
+    results = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "rows": len(coords),
+        "cpu_count": os.cpu_count(),
+        "modes": {},
+    }
+    for mode in modes:
+        start = time.perf_counter()
+        serial = DISTANCE_MODES[mode](*inputs, return_bound=True)
+        serial_seconds = time.perf_counter() - start
+        runs = [{"row_workers": 1, "seconds": round(serial_seconds, 4), "speedup": 1.0}]
+
+        for worker_count in workers:
+            start = time.perf_counter()
+            shared = shared_average_distance(
+                mode, *inputs, worker_count, return_bound=True
+            )
+            seconds = time.perf_counter() - start
+
+            # 구간마다 현재 프로세스에서 따로 계산해서 작업량 분배 확인
+            window_seconds = []
+            for window in time_windows(mode, start_dates, end_dates, worker_count):
+                start = time.perf_counter()
+                DISTANCE_SUMS[mode](
+                    *inputs, np.ones(len(coords), dtype=bool), window=window
+                )
+                window_seconds.append(time.perf_counter() - start)
+
+            runs.append(
+                {
+                    "row_workers": worker_count,
+                    "seconds": round(seconds, 4),
+                    "speedup": round(serial_seconds / seconds, 2),
+                    "work_ratio": round(sum(window_seconds) / serial_seconds, 2),
+                    "ideal_speedup": round(serial_seconds / max(window_seconds), 2),
+                    "max_abs_diff": float(np.abs(shared[0] - serial[0]).max()),
+                }
+            )
+        results["modes"][mode] = runs
+
+    print(f"----- row_workers 확장성 ({len(coords):,} 행, CPU {os.cpu_count()}) -----")
+    print("mode      workers   seconds  speedup  work_ratio  ideal_speedup")
+    for mode, runs in results["modes"].items():
+        for run in runs:
+            print(
+                f"{mode:<9} {run['row_workers']:>7} {run['seconds']:>9.3f}"
+                f" {run['speedup']:>8.2f} {run.get('work_ratio', 1.0):>11.2f}"
+                f" {run.get('ideal_speedup', 1.0):>14.2f}"
+            )
+
+    if output_folder is not None:
+        os.makedirs(output_folder, exist_ok=True)
+        result_path = os.path.join(output_folder, ROW_WORKER_RESULT_NAME)
+        with open(result_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"row_workers 확장성 결과 저장: {result_path}")
+    return results
+
+
+def run_benchmark(
+    sizes=SIZES,
+    output_folder=None,
+    baseline_path=None,
+    encoding="cp949",
+    max_workers=None,
+    seed=0,
+    tolerance=TOLERANCE,
+    min_seconds=MIN_SECONDS,
+    update_baseline=False,
+    keep_data=False,
+):
+    # type: (tuple, str, str, str, int, int, float, float, bool, bool) -> dict
+    # 크기마다 새 작업 폴더에서 전체 파이프라인을 실행하고 결과를 JSON 으로 저장한다.
+    # - baseline_path 가 있으면 기준 결과와 비교해서 성능 저하를 표시
+    # - update_baseline 이면 이번 결과를 기준으로 저장
+    # - keep_data 이면 합성 데이터와 중간 결과를 output_folder/data_<크기> 에 남긴다.
+    if output_folder is None:
+        output_folder = os.getcwd()
+    os.makedirs(output_folder, exist_ok=True)
+
+    results = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "encoding": encoding,
+        "max_workers": max_workers,
+        "cpu_count": os.cpu_count(),
+        "sizes": list(sizes),
+        "stages": {},
+    }
+    for size in sizes:
+        print(f"===== benchmark: {size:,} 행 =====")
+        if keep_data:
+            work_folder = os.path.join(output_folder, f"data_{size}")
+            shutil.rmtree(work_folder, ignore_errors=True)
+            records = run_pipeline(work_folder, size, encoding, max_workers, seed)
+        else:
+            with tempfile.TemporaryDirectory() as work_folder:
+                records = run_pipeline(work_folder, size, encoding, max_workers, seed)
+        for stage, record in records.items():
+            results["stages"].setdefault(stage, []).append({"size": size, **record})
+
+    results["scaling"] = scaling_exponents(results)
+    results["regressions"] = []
+    if baseline_path is not None and os.path.exists(baseline_path):
+        with open(baseline_path, encoding="utf-8") as f:
+            baseline = json.load(f)
+        results["regressions"] = find_regressions(
+            results, baseline, tolerance, min_seconds
+        )
+
+    result_path = os.path.join(output_folder, RESULT_NAME)
+    with open(result_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    if update_baseline and baseline_path is not None:
+        shutil.copyfile(result_path, baseline_path)
+        print(f"기준 결과 저장: {baseline_path}")
+
+    print_report(results)
+    print(f"benchmark 결과 저장: {result_path}")
+    return results
+
+
+if __name__ == "__main__":
+    OUTPUT_FOLDER = "C:/Users/bsh96/Documents/GitHub/spring_UDIK/BENCHMARK"
+    BASELINE_PATH = os.path.join(OUTPUT_FOLDER, "benchmark_baseline.json")
+
+    # 기준 결과가 없으면 이번 결과를 기준으로 저장
+    results = run_benchmark(
+        SIZES,
+        OUTPUT_FOLDER,
+        baseline_path=BASELINE_PATH,
+        update_baseline=not os.path.exists(BASELINE_PATH),
+    )
+
+    # 한 파일의 거리 계산을 여러 프로세스로 나눴을 때의 확장성
+    row_worker_scaling(output_folder=OUTPUT_FOLDER)
+
+    # 성능 저하가 있으면 종료 코드 1
+    sys.exit(1 if results["regressions"] else 0)
@@ -0,0 +1,294 @@
+import os
+import pandas as pd
+import numpy as np
+from functools import partial
+from scipy.spatial import KDTree
+
+from dataset_loader import industry_name
+from instrumentation import (
+    QUIET,
+    RUN_REPORT_NAME,
+    STAGE,
+    banner,
+    configure,
+    file_bytes,
+    log,
+    main_stage,
+)
+from parallel import run_file_tasks
+from table_io import list_tables, read_table, table_name, write_table
+
+COORD_COLUMNS = ["좌표정보x(epsg5174)", "좌표정보y(epsg5174)"]
+KEY_COLUMNS = ["관리번호", "사업장명"]
+
+# 영업 기간이 겹치는 업장을 찾을 때까지 늘리는 k 의 최대값
+MAX_K = 64
+# k 를 MAX_K 까지 늘려도 못 찾은 업장을 직접 계산할 때 한 번에 만드는 거리 행렬의 최대 원소 수
+MAX_CELLS = 1 << 22
+
+# 작업 프로세스마다 한 번만 적재하는 전체 업종 인덱스
+# {업종명: {"rows", "coords", "start_days", "end_days", "tree"}}
+_INDEX = {}
+
+
+def load_industry(file_path):
+    # type: (str) -> dict
+    # 업종 파일에서 좌표/영업 기간 컬럼만 읽는다. (좌표가 없는 행은 제외)
+    # 영업 기간 컬럼이 없으면 모든 업장이 항상 영업 중인 것으로 본다.
+    df = read_table(file_path, columns=COORD_COLUMNS + ["start_date", "end_date"])
+    coords = df[COORD_COLUMNS].apply(pd.to_numeric, errors="coerce")
+    rows = np.flatnonzero(np.isfinite(coords).all(axis=1))
+    df = df.iloc[rows]
+    coords = coords.iloc[rows].to_numpy(dtype=float)
+
+    if {"start_date", "end_date"}.issubset(df.columns):
+        start_days = pd.to_datetime(df["start_date"]).to_numpy(dtype="datetime64[D]")
+        end_days = pd.to_datetime(df["end_date"]).to_numpy(dtype="datetime64[D]")
+        start_days = start_days.astype(np.int64)
+        end_days = end_days.astype(np.int64)
+    else:
+        log(
+            f"⚠️ start_date / end_date 가 없어 기간을 비교하지 않음: {file_path}",
+            level=QUIET,
+        )
+        start_days = np.full(len(df), np.iinfo(np.int64).min)
+        end_days = np.full(len(df), np.iinfo(np.int64).max)
+
+    return {
+        "rows": rows,
+        "coords": coords,
+        "start_days": start_days,
+        "end_days": end_days,
+    }
+
+
+def build_index(input_csv_folder):
+    # type: (str) -> dict
+    # 모든 업종 파일을 한 번씩만 읽어서 좌표와 영업 기간을 모은다.
+    with main_stage("cross_industry_index") as record:
+        index = {}
+        record["bytes_in"] = 0
+        for file_name in list_tables(input_csv_folder):
+            file_path = os.path.join(input_csv_folder, file_name)
+            index[industry_name(file_name)] = load_industry(file_path)
+            record["bytes_in"] += file_bytes(file_path)
+        record["rows"] = sum(len(entry["rows"]) for entry in index.values())
+    return index
+
+
+def _init_index(index):
+    # type: (dict) -> None
+    # 프로세스 풀 initializer: 전체 업종 인덱스를 작업 프로세스에 한 번만 전달
+    # KDTree 는 처음 조회할 때 프로세스 안에서 만든다.
+    _INDEX.clear()
+    _INDEX.update(index)
+
+
+def _industry_tree(name):
+    # type: (str) -> KDTree
+    entry = _INDEX[name]
+    if "tree" not in entry:
+        entry["tree"] = KDTree(entry["coords"])
+    return entry["tree"]
+
+
+def overlap_counts(target_starts, target_ends, starts, ends):
+    # type: (np.ndarray, np.ndarray, np.ndarray, np.ndarray) -> np.ndarray
+    # 각 업장과 영업 기간이 겹치는 대상 업장 수
+    # (시작일 <= 종료 기준일인 대상 수) - (종료일 < 시작 기준일인 대상 수) 를 정렬된 배열에서 센다.
+    # 시작일 > 종료일인 대상 업장은 모든 업장과 겹친다고 보고 더한다. (많게 세는 것은 안전하다)
+    ordered = target_starts <= target_ends
+    counts = np.searchsorted(
+        np.sort(target_starts[ordered]), ends, side="right"
+    ) - np.searchsorted(np.sort(target_ends[ordered]), starts, side="left")
+    return counts + np.count_nonzero(~ordered)
+
+
+def _pairwise_overlapping(
+    target_coords, target_starts, target_ends, coords, starts, ends, max_cells=MAX_CELLS
+):
+    # type: (np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, int) -> np.ndarray
+    # 영업 기간이 겹치는 대상 업장까지의 최근접 거리를 직접 계산 (없으면 NaN)
+    # 업장을 시작일 순으로 묶고, 묶음의 기간과 겹치는 대상 업장만 비교한다.
+    distances = np.full(len(coords), np.nan)
+    order = np.argsort(starts, kind="stable")
+    step = max(1, max_cells // max(len(target_coords), 1))
+    for begin in range(0, len(order), step):
+        rows = order[begin : begin + step]
+        candidates = np.flatnonzero(
+            (target_starts <= ends[rows].max()) & (starts[rows].min() <= target_ends)
+        )
+        if len(candidates) == 0:
+            continue
+        dist = np.hypot(
+            coords[rows, 0][:, None] - target_coords[candidates, 0][None, :],
+            coords[rows, 1][:, None] - target_coords[candidates, 1][None, :],
+        )
+        valid = (target_starts[candidates][None, :] <= ends[rows][:, None]) & (
+            starts[rows][:, None] <= target_ends[candidates][None, :]
+        )
+        dist[~valid] = np.inf
+        best = dist.min(axis=1)
+        distances[rows] = np.where(np.isfinite(best), best, np.nan)
+    return distances
+
+
+def nearest_overlapping(
+    tree, target_starts, target_ends, coords, starts, ends, max_k=MAX_K
+):
+    # type: (KDTree, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, int) -> np.ndarray
+    # 각 업장에서 영업 기간이 겹치는 대상 업종 업장까지의 최근접 거리 (없으면 NaN)
+    # - 겹치는 대상 업장이 없는 업장은 조회하지 않는다.
+    # - 가까운 순으로 k개를 조회하고, 겹치는 업장이 없으면 k를 max_k 까지 늘려서 다시 조회한다.
+    # - 그래도 못 찾은 업장은 겹치는 대상 업장과의 거리를 직접 계산한다.
+    #   (k 를 tree.n 까지 늘리면 업장 수 x 대상 업장 수 배열을 만든다)
+    distances = np.full(len(coords), np.nan)
+    if tree.n == 0 or len(coords) == 0:
+        return distances
+
+    counts = overlap_counts(target_starts, target_ends, starts, ends)
+    pending = np.flatnonzero((counts > 0) | (starts > ends))
+    k = min(4, max_k, tree.n)
+    while len(pending) > 0:
+        dist, idx = tree.query(coords[pending], k=k)
+        dist = dist.reshape(len(pending), -1)
+        idx = idx.reshape(len(pending), -1)
+
+        valid = (target_starts[idx] <= ends[pending][:, None]) & (
+            starts[pending][:, None] <= target_ends[idx]
+        )
+        found = valid.any(axis=1)
+        first = valid.argmax(axis=1)
+        distances[pending[found]] = dist[found, first[found]]
+
+        pending = pending[~found]
+        if k >= min(max_k, tree.n):
+            break
+        k = min(k * 4, max_k, tree.n)
+
+    if len(pending) > 0 and k < tree.n:
+        distances[pending] = _pairwise_overlapping(
+            tree.data,
+            target_starts,
+            target_ends,
+            coords[pending],
+            starts[pending],
+            ends[pending],
+        )
+    return distances
+
+
+def _cross_industry_file(
+    file_name, input_csv_folder, output_csv_folder, output_format, time_aware
+):
+    # type: (str, str, str, str, bool) -> dict
+    log("cross_industry_distance -> file_name: ", file_name)
+    source = industry_name(file_name)
+    coords = _INDEX[source]["coords"]
+    start_days = _INDEX[source]["start_days"]
+    end_days = _INDEX[source]["end_days"]
+
+    # 결과 표에는 식별 컬럼만 다시 읽어서 붙인다.
+    keys = read_table(os.path.join(input_csv_folder, file_name), columns=KEY_COLUMNS)
+    features = keys.iloc[_INDEX[source]["rows"]].reset_index(drop=True)
+    summary = {}
+    for target, entry in _INDEX.items():
+        if target == source:
+            continue
+        if time_aware:
+            distances = nearest_overlapping(
+                _industry_tree(target),
+                entry["start_days"],
+                entry["end_days"],
+                coords,
+                start_days,
+                end_days,
+            )
+        elif len(entry["coords"]) > 0:
+            distances, _ = _industry_tree(target).query(coords)
+        else:
+            distances = np.full(len(coords), np.nan)
+        features[f"{target} 최근접거리"] = distances
+        summary[target] = (
+            np.nanmean(distances) if np.isfinite(distances).any() else np.nan
+        )
+
+    output_path = os.path.join(output_csv_folder, table_name(file_name, output_format))
+    write_table(features, output_path, encoding="utf-8-sig")
+    return {
+        "rows": len(features),
+        "rows_in": len(keys),
+        "bytes_in": file_bytes(os.path.join(input_csv_folder, file_name)),
+        "bytes_out": file_bytes(output_path),
+        "industry": source,
+        "summary": summary,
+    }
+
+
+def cross_industry_distance(
+    input_csv_folder,
+    output_csv_folder,
+    max_workers=None,
+    output_format="csv",
+    time_aware=True,
+):
+    # type: (str, str, int, str, bool) -> str
+    # 업장별로 다른 모든 업종의 최근접 업장까지 거리를 계산한다.
+    # - 05cross_industry/<업종 파일>: 업장 x 업종 최근접 거리 표
+    # - 업종간_최근접거리_평균.csv: 업종 x 업종 평균 최근접 거리 (행: 기준 업종, 열: 대상 업종)
+    # time_aware 이면 영업 기간이 겹치는 업장만 대상으로 본다.
+    # 입력은 start_date / end_date 가 있는 03DISTANCE_CALCULATED 이후 폴더를 사용한다.
+    banner("cross_industry_distance")
+
+    summary_csv_path = os.path.join(output_csv_folder, "업종간_최근접거리_평균.csv")
+    output_csv_folder = os.path.join(output_csv_folder + "/05cross_industry")
+    os.makedirs(output_csv_folder, exist_ok=True)
+
+    csv_files = list_tables(input_csv_folder)
+    index = build_index(input_csv_folder)
+    results = run_file_tasks(
+        partial(
+            _cross_industry_file,
+            input_csv_folder=input_csv_folder,
+            output_csv_folder=output_csv_folder,
+            output_format=output_format,
+            time_aware=time_aware,
+        ),
+        csv_files,
+        max_workers=max_workers,
+        stage_name="cross_industry_distance",
+        initializer=_init_index,
+        initargs=(index,),
+    )
+
+    with main_stage("cross_industry_summary") as record:
+        industries = [industry_name(file_name) for file_name in csv_files]
+        matrix = pd.DataFrame(np.nan, index=industries, columns=industries)
+        for result in results:
+            for target, value in result["summary"].items():
+                matrix.loc[result["industry"], target] = value
+        matrix.index.name = "업종명"
+        matrix.to_csv(summary_csv_path, encoding="utf-8-sig")
+        record["rows"] = len(matrix)
+        record["bytes_out"] = file_bytes(summary_csv_path)
+
+    log(f"업종간 최근접 거리 요약 저장: {summary_csv_path}", level=STAGE)
+    return output_csv_folder
+
+
+if __name__ == "__main__":
+    OUTPUT_FOLDER = (
+        "C:/Users/bsh96/Documents/GitHub/spring_UDIK/DATA/LOCALDATA_FILTERED_CSV"
+    )
+
+    input_csv_folder = "C:/Users/bsh96/Documents/GitHub/spring_UDIK/DATA/LOCALDATA_FILTERED_CSV/03DISTANCE_CALCULATED"
+
+    # 콘솔 출력 수준과 실행 보고서 (단계별 처리 시간, 행 수, 바이트, 최대 메모리)
+    configure(verbosity=STAGE, report_path=os.path.join(OUTPUT_FOLDER, RUN_REPORT_NAME))
+
+    # 다른 업종 최근접 거리 계산 (영업 기간이 겹치는 업장만)
+    output_csv_folder = cross_industry_distance(
+        input_csv_folder,
+        OUTPUT_FOLDER,
+        output_format="csv",
+    )
@@ -0,0 +1,138 @@
+import hashlib
+import os
+import pickle
+from functools import lru_cache
+
+import pandas as pd
+
+from table_io import list_tables, read_table, table_format
+
+# 분석 스크립트가 공유하는 업종 데이터 로더
+# - 프로세스 안: (경로, 수정시각, 크기, 컬럼) 기준 LRU 캐시
+# - 디스크: 입력 폴더의 .dataset_cache 에 CSV 를 파싱한 결과를 (경로, 수정시각, 크기) 기준으로 저장
+#   요청된 컬럼만 읽고, 다른 스크립트가 다른 컬럼을 요청하면 캐시에 컬럼을 추가한다.
+#   parquet / feather 는 컬럼 단위로 빠르게 읽히므로 디스크 캐시를 쓰지 않는다.
+CACHE_FOLDER_NAME = ".dataset_cache"
+LRU_SIZE = 64
+CSV_ENCODING = "utf-8-sig"
+
+
+def industry_name(file_name):
+    # type: (str) -> str
+    # fulldata_07_24_04_P_업종명.csv -> 업종명
+    return os.path.splitext(os.path.basename(file_name))[0].split("_")[-1]
+
+
+def _cache_path(file_path, cache_folder):
+    # type: (str, str) -> str
+    digest = hashlib.blake2b(
+        os.path.abspath(file_path).encode("utf-8"), digest_size=16
+    ).hexdigest()
+    return os.path.join(cache_folder, f"{industry_name(file_path)}_{digest}.pkl")
+
+
+def _read_cache_entry(cache_path, mtime_ns, size):
+    # type: (str, int, int) -> dict
+    # 원본의 수정시각/크기가 기록과 다르면 None
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        with open(cache_path, "rb") as f:
+            entry = pickle.load(f)
+    except Exception:
+        return None
+    if entry["mtime_ns"] != mtime_ns or entry["size"] != size:
+        return None
+    return entry
+
+
+def _write_cache_entry(cache_path, entry):
+    # type: (str, dict) -> None
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, cache_path)
+
+
+def _load_csv(file_path, mtime_ns, size, columns, cache_folder):
+    # type: (str, int, int, tuple, str) -> pd.DataFrame
+    cache_path = _cache_path(file_path, cache_folder)
+    entry = _read_cache_entry(cache_path, mtime_ns, size)
+    if entry is None:
+        header = list(pd.read_csv(file_path, nrows=0, encoding=CSV_ENCODING).columns)
+        entry = {
+            "mtime_ns": mtime_ns,
+            "size": size,
+            "header": header,
+            "frame": pd.DataFrame(index=pd.RangeIndex(0)),
+            "complete": False,
+        }
+
+    wanted = entry["header"] if columns is None else list(columns)
+    missing = [
+        column
+        for column in wanted
+        if column in entry["header"] and column not in entry["frame"].columns
+    ]
+    if missing and not entry["complete"]:
+        # 캐시에 없는 컬럼만 원본에서 읽어서 추가
+        new = read_table(file_path, columns=missing, encoding=CSV_ENCODING)
+        frame = new if len(entry["frame"].columns) == 0 else entry["frame"].join(new)
+        entry["frame"] = frame[[c for c in entry["header"] if c in frame.columns]]
+        entry["complete"] = len(entry["frame"].columns) == len(entry["header"])
+        _write_cache_entry(cache_path, entry)
+
+    wanted = set(wanted)
+    return entry["frame"][[c for c in entry["frame"].columns if c in wanted]]
+
+
+@lru_cache(maxsize=LRU_SIZE)
+def _load_cached(file_path, mtime_ns, size, columns, cache_folder):
+    # type: (str, int, int, tuple, str) -> pd.DataFrame
+    if table_format(file_path) == "csv" and cache_folder is not None:
+        return _load_csv(file_path, mtime_ns, size, columns, cache_folder)
+    kwargs = {"encoding": CSV_ENCODING} if table_format(file_path) == "csv" else {}
+    return read_table(
+        file_path, columns=None if columns is None else list(columns), **kwargs
+    )
+
+
+def load_table(file_path, columns=None, disk_cache=True):
+    # type: (str, list, bool) -> pd.DataFrame
+    # 업종 파일 하나를 캐시를 거쳐서 읽는다. (columns 가 주어지면 파일에 있는 컬럼만)
+    # 같은 프로세스의 호출은 같은 DataFrame 을 공유하므로 값을 직접 수정하지 않는다.
+    # (컬럼 추가/삭제는 얕은 복사본에 적용되므로 괜찮다)
+    stat = os.stat(file_path)
+    cache_folder = None
+    if disk_cache:
+        cache_folder = os.path.join(os.path.dirname(file_path), CACHE_FOLDER_NAME)
+    df = _load_cached(
+        file_path,
+        stat.st_mtime_ns,
+        stat.st_size,
+        None if columns is None else tuple(dict.fromkeys(columns)),
+        cache_folder,
+    )
+    return df.copy(deep=False)
+
+
+def load_industries(input_folder, columns=None, required=False, disk_cache=True):
+    # type: (str, list, bool, bool) -> dict
+    # 폴더의 업종 파일을 모두 읽어서 {업종명: DataFrame} 으로 반환 (os.listdir 순서)
+    # required 이면 columns 가 모두 있는 업종만 반환한다.
+    datasets = {}
+    for file_name in list_tables(input_folder):
+        df = load_table(
+            os.path.join(input_folder, file_name), columns, disk_cache=disk_cache
+        )
+        if required and columns is not None and not set(columns).issubset(df.columns):
+            continue
+        datasets[industry_name(file_name)] = df
+    return datasets
+
+
+def clear_cache():
+    # type: () -> None
+    # 프로세스 안의 LRU 캐시만 비운다. (디스크 캐시는 원본이 바뀌면 자동으로 다시 만든다)
+    _load_cached.cache_clear()
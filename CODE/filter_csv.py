@@ -2,16 +2,167 @@ import os
 import pandas as pd
 import numpy as np
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 from scipy.spatial import KDTree
-import traceback
 
-
-def filter_by_address(input_csv_folder, output_csv_folder, address_name="서울특별시"):
-    # type: (str, str, str) -> str
-    print("=============================")
-    print("===== filter_by_address =====")
-    print("=============================")
+from add_adj_industry_count import add_adj_industry_count_column
+from dataset_loader import industry_name
+from ingest import ingest_folder
+from instrumentation import (
+    QUIET,
+    RUN_REPORT_NAME,
+    STAGE,
+    banner,
+    configure,
+    file_bytes,
+    log,
+    main_stage,
+)
+from parallel import run_file_tasks
+from raw_reader import (
+    DEFAULT_CHUNKSIZE,
+    TableAppender,
+    detect_encoding,
+    iter_raw_chunks,
+    read_header,
+    stream_filter_csv,
+)
+from stage_cache import params_key, read_stage_manifest, run_cached_file_tasks
+from table_io import list_tables, read_table, table_name, table_row_count, write_table
+
+
+def _filter_address(df, address_name):
+    # type: (pd.DataFrame, str) -> pd.DataFrame
+    # "소재지전체주소" 열에서 city이 포함된 데이터 필터링
+    return df[df["소재지전체주소"].str.contains(address_name, na=False)]
+
+
+def _filter_open_and_close(df, open_year):
+    # type: (pd.DataFrame, int) -> pd.DataFrame
+    # Filter rows where "영업상태명" is either "폐업" or "영업/정상"
+    filtered_df = df[df["영업상태명"].isin(["폐업", "영업/정상"])]
+
+    # Filter rows where "인허가일자" is in the open_year
+    if pd.api.types.is_datetime64_any_dtype(filtered_df["인허가일자"]):
+        open_years = filtered_df["인허가일자"].dt.year.astype("Int64").astype(str)
+    else:
+        open_years = filtered_df["인허가일자"].str.split("-").str[0]
+    filtered_df = filtered_df[open_years == str(open_year)]
+
+    # 영업 상태명이 폐업이지만 폐업일자가 없는경우 제거
+    return filtered_df[
+        ~((filtered_df["영업상태명"] == "폐업") & (filtered_df["폐업일자"].isnull()))
+    ]
+
+
+# 생존 판단 기간 (년). 기간마다 "생존_{n}년" 컬럼을 만든다.
+SURVIVAL_HORIZONS = (1, 2, 3, 5, 10)
+# 기존 "생존" 컬럼의 기준 기간
+SURVIVAL_YEARS = 3
+
+
+def survival_column(years):
+    # type: (int) -> str
+    return f"생존_{years}년"
+
+
+def calculate_survival(df, horizons=SURVIVAL_HORIZONS):
+    # type: (pd.DataFrame, tuple) -> dict
+    # 기간별 생존 여부를 한 번에 계산 ({기간: bool 배열})
+    # - 영업/정상: 항상 True (생존)
+    # - 폐업: 개업 이후 영업 기간(일 / 365)이 기간(년)을 넘으면 True
+    # - 그 외 상태, 날짜가 비어있는 폐업: False
+    status = df["영업상태명"].to_numpy()
+    is_open = status == "영업/정상"
+    is_closed = status == "폐업"
+
+    start_dates = pd.to_datetime(df["인허가일자"], format="%Y-%m-%d", errors="coerce")
+    end_dates = pd.to_datetime(df["폐업일자"], format="%Y-%m-%d", errors="coerce")
+    # 날짜가 비어있으면 NaN 이 되어 비교 결과는 False
+    days = (end_dates - start_dates).dt.days.to_numpy()
+
+    flags = {}
+    for years in horizons:
+        flags[years] = is_open | (is_closed & (days > 365 * years))
+    return flags
+
+
+def _add_survival(df, horizons=SURVIVAL_HORIZONS):
+    # type: (pd.DataFrame, tuple) -> pd.DataFrame
+    # "생존" (SURVIVAL_YEARS 기준) 과 기간별 "생존_{n}년" 컬럼 추가
+    df = df.copy()
+    flags = calculate_survival(df, tuple(horizons) + (SURVIVAL_YEARS,))
+    df["생존"] = flags[SURVIVAL_YEARS]
+    for years in horizons:
+        df[survival_column(years)] = flags[years]
+    return df
+
+
+def _output_names(file_name, output_format, folder_names=("",)):
+    # type: (str, str, tuple) -> list
+    # 단계 캐시에서 확인할 출력 파일 경로 (출력 폴더 기준)
+    return [
+        os.path.join(folder_name, table_name(file_name, output_format))
+        for folder_name in folder_names
+    ]
+
+
+def _raw_usecols(usecols):
+    # type: (list) -> list
+    # 필터에 필요한 "소재지전체주소" 는 항상 읽는다.
+    if usecols is None:
+        return None
+    return list(usecols) + ["소재지전체주소"]
+
+
+def _filter_by_address_file(
+    file_name,
+    input_csv_folder,
+    output_csv_folder,
+    address_name,
+    output_format,
+    usecols,
+    chunksize,
+):
+    # type: (str, str, str, str, str, list, int) -> dict
+    log("Filtering by address_name -> file_name: ", file_name)
+    file_path = os.path.join(input_csv_folder, file_name)
+
+    encoding = detect_encoding(file_path)
+    if "소재지전체주소" not in read_header(file_path, encoding):
+        return {"status": "skipped"}
+
+    # chunk 단위로 읽으면서 필터링된 데이터를 output_csv_folder 에 이어서 저장
+    output_path = os.path.join(output_csv_folder, table_name(file_name, output_format))
+    stats = {}
+    rows = stream_filter_csv(
+        file_path,
+        output_path,
+        partial(_filter_address, address_name=address_name),
+        usecols=_raw_usecols(usecols),
+        chunksize=chunksize,
+        encoding=encoding,
+        stats=stats,
+    )
+    return {"rows": rows, "rows_in": stats["rows_in"]}
+
+
+def filter_by_address(
+    input_csv_folder,
+    output_csv_folder,
+    address_name="서울특별시",
+    max_workers=None,
+    output_format="csv",
+    usecols=None,
+    chunksize=DEFAULT_CHUNKSIZE,
+    force=False,
+):
+    # type: (str, str, str, int, str, list, int, bool) -> str
+    # usecols: 읽을 원본 컬럼 (None 이면 전체, 예: raw_reader.PIPELINE_COLUMNS)
+    # chunksize: 한 번에 읽는 행 수 (메모리 사용량 조절)
+    banner("filter_by_address")
 
     # Output folder 이름 설정
     output_csv_folder = os.path.join(output_csv_folder + "/" + address_name)
@@ -21,37 +172,243 @@ def filter_by_address(input_csv_folder, output_csv_folder, address_name="서울
         os.makedirs(output_csv_folder)
 
     # MERGED_CSV 폴더 내의 모든 CSV 파일 처리
-    for file_name in os.listdir(input_csv_folder):
-        print("Filtering by address_name -> file_name: ", file_name)
-        if file_name.endswith(".csv"):
-            file_path = os.path.join(input_csv_folder, file_name)
-
-            # CSV 파일 읽기
-            try:
-                df = pd.read_csv(file_path, encoding="utf-8-sig", on_bad_lines="warn")
-            except UnicodeDecodeError:
-                df = pd.read_csv(file_path, encoding="cp949", on_bad_lines="warn")
-            # "소재지전체주소" 열에서 city이 포함된 데이터 필터링
-            if "소재지전체주소" in df.columns:
-                filtered_df = df[
-                    df["소재지전체주소"].str.contains(address_name, na=False)
-                ]
-
-                # 필터링된 데이터를 output_csv_folder 저장
-                output_path = os.path.join(output_csv_folder, file_name)
-                filtered_df.to_csv(output_path, index=False, encoding="utf-8-sig")
-
-    print(
-        f"Filtered data containing '{address_name}' has been saved to {output_csv_folder}."
+    csv_files = [f for f in os.listdir(input_csv_folder) if f.endswith(".csv")]
+    run_cached_file_tasks(
+        partial(
+            _filter_by_address_file,
+            input_csv_folder=input_csv_folder,
+            output_csv_folder=output_csv_folder,
+            address_name=address_name,
+            output_format=output_format,
+            usecols=usecols,
+            chunksize=chunksize,
+        ),
+        input_csv_folder,
+        csv_files,
+        output_csv_folder,
+        partial(_output_names, output_format=output_format),
+        params={
+            "address_name": address_name,
+            "usecols": usecols,
+            "output_format": output_format,
+        },
+        force=force,
+        max_workers=max_workers,
+        stage_name="filter_by_address",
+    )
+
+    log(
+        f"Filtered data containing '{address_name}' has been saved to {output_csv_folder}.",
+        level=STAGE,
+    )
+    return output_csv_folder
+
+
+# 주소 앞부분에서 시도 / 시군구를 한 번에 추출 ("수원시 장안구" 처럼 시 아래 구가 있으면 함께)
+# 시군구가 없는 주소 ("서울특별시") 도 시도는 추출한다. (시군구는 NaN)
+REGION_PATTERN = r"^\s*(?P<시도>\S+)(?:\s+(?P<시군구>\S+시\s+\S+구(?=\s|$)|\S+))?"
+REGION_LEVELS = ("시도", "시군구")
+REGION_FOLDER = "00regions"
+REGION_COUNT_CSV = "지역별_인허가수.csv"
+
+
+def parse_regions(addresses, level="시군구"):
+    # type: (pd.Series, str) -> pd.Series
+    # "소재지전체주소" 에서 지역 이름을 벡터 연산으로 추출 (추출할 수 없으면 NaN)
+    # - level="시도": "서울특별시"
+    # - level="시군구": "서울특별시 강남구" (filter_by_address 의 address_name 과 같은 형식)
+    parts = addresses.str.extract(REGION_PATTERN)
+    if level == "시도":
+        return parts["시도"]
+    return parts["시도"] + " " + parts["시군구"]
+
+
+def _region_folder_name(region):
+    # type: (str) -> str
+    # 폴더 이름에 쓸 수 없는 문자는 "_" 로 바꾼다.
+    for char in '<>:"/\\|?*':
+        region = region.replace(char, "_")
+    return region
+
+
+def _remove_empty_folders(folder):
+    # type: (str) -> None
+    # 이전 실행의 출력을 지운 뒤 비어 있는 지역 폴더 삭제
+    for region_folder in os.listdir(folder):
+        path = os.path.join(folder, region_folder)
+        if os.path.isdir(path) and not os.listdir(path):
+            os.rmdir(path)
+
+
+def _partition_by_region_file(
+    file_name,
+    input_csv_folder,
+    output_csv_folder,
+    level,
+    sido,
+    output_format,
+    usecols,
+    chunksize,
+):
+    # type: (str, str, str, str, str, str, list, int) -> dict
+    log("partition_by_region -> file_name: ", file_name)
+    file_path = os.path.join(input_csv_folder, file_name)
+
+    encoding = detect_encoding(file_path)
+    header = read_header(file_path, encoding)
+    if "소재지전체주소" not in header:
+        return {"status": "skipped"}
+    if usecols is not None:
+        header = [column for column in header if column in set(_raw_usecols(usecols))]
+
+    # 이전 실행에서 이 파일이 쓴 지역별 출력 삭제 (이번에 없는 지역의 출력이 남지 않도록)
+    # 비어 있게 된 지역 폴더는 모든 파일을 처리한 뒤 partition_by_region 에서 삭제한다.
+    # (다른 작업 프로세스가 같은 폴더에 쓰는 중일 수 있다)
+    output_file_name = table_name(file_name, output_format)
+    for region_folder in os.listdir(output_csv_folder):
+        path = os.path.join(output_csv_folder, region_folder, output_file_name)
+        if os.path.isfile(path):
+            os.remove(path)
+
+    appenders = {}
+    counts = {}
+    unparsed = 0
+    rows_in = 0
+    for chunk in iter_raw_chunks(
+        file_path,
+        usecols=_raw_usecols(usecols),
+        chunksize=chunksize,
+        encoding=encoding,
+    ):
+        rows_in += len(chunk)
+        regions = parse_regions(chunk["소재지전체주소"], level)
+        unparsed += int(regions.isna().sum())
+        if sido is not None:
+            regions = regions.where((regions + " ").str.startswith(sido + " "))
+
+        for region, part in chunk.groupby(regions, sort=False):
+            if region not in appenders:
+                folder = os.path.join(output_csv_folder, _region_folder_name(region))
+                os.makedirs(folder, exist_ok=True)
+                appenders[region] = TableAppender(
+                    os.path.join(folder, output_file_name), header
+                )
+            appenders[region].append(part)
+            counts[region] = counts.get(region, 0) + len(part)
+
+    for appender in appenders.values():
+        appender.close()
+    if unparsed:
+        log(f"⚠️ 지역을 알 수 없는 주소 {unparsed}건 제외: {file_name}", level=QUIET)
+    return {
+        "rows": sum(counts.values()),
+        "rows_in": rows_in,
+        "bytes_in": file_bytes(file_path),
+        "bytes_out": file_bytes(*[appender.path for appender in appenders.values()]),
+        "counts": counts,
+        "unparsed": unparsed,
+    }
+
+
+def partition_by_region(
+    input_csv_folder,
+    output_csv_folder,
+    level="시군구",
+    sido=None,
+    max_workers=None,
+    output_format="csv",
+    usecols=None,
+    chunksize=DEFAULT_CHUNKSIZE,
+):
+    # type: (str, str, str, str, int, str, list, int) -> str
+    # 원본을 한 번만 읽어서 모든 지역의 결과를 동시에 만든다. (filter_by_address 를 지역마다
+    # 반복하지 않음)
+    # - level: "시도" 또는 "시군구", sido 가 주어지면 해당 시도 안의 지역만 (예: "서울특별시")
+    # - 00regions/<지역>/<업종 파일>: 지역별 행 (원본 컬럼 그대로)
+    # - 지역별_인허가수.csv: 지역 x 업종 인허가 수 (합계 내림차순)
+    # 지역 폴더는 filter_by_address 의 출력 폴더처럼 이후 단계의 입력으로 사용할 수 있다.
+    banner("partition_by_region")
+
+    if level not in REGION_LEVELS:
+        raise ValueError(f"level 은 {REGION_LEVELS} 중 하나: {level}")
+
+    count_csv_path = os.path.join(output_csv_folder, REGION_COUNT_CSV)
+    output_csv_folder = os.path.join(output_csv_folder + "/" + REGION_FOLDER)
+    os.makedirs(output_csv_folder, exist_ok=True)
+
+    csv_files = [f for f in os.listdir(input_csv_folder) if f.endswith(".csv")]
+    results = run_file_tasks(
+        partial(
+            _partition_by_region_file,
+            input_csv_folder=input_csv_folder,
+            output_csv_folder=output_csv_folder,
+            level=level,
+            sido=sido,
+            output_format=output_format,
+            usecols=usecols,
+            chunksize=chunksize,
+        ),
+        csv_files,
+        max_workers=max_workers,
+        stage_name="partition_by_region",
+    )
+    _remove_empty_folders(output_csv_folder)
+
+    with main_stage("partition_by_region_counts") as record:
+        counts = pd.DataFrame(
+            {
+                industry_name(result["file"]): pd.Series(
+                    result["counts"], dtype="int64"
+                )
+                for result in results
+                if result["status"] == "ok"
+            }
+        )
+        counts = counts.fillna(0).astype("int64")
+        counts.insert(0, "인허가수", counts.sum(axis=1))
+        counts = counts.sort_values("인허가수", ascending=False)
+        counts.index.name = "지역"
+        counts.to_csv(count_csv_path, encoding="utf-8-sig")
+        record["rows"] = len(counts)
+        record["bytes_out"] = file_bytes(count_csv_path)
+
+    log(
+        f"{len(counts)}개 지역을 {output_csv_folder} 에 저장했습니다. ({count_csv_path})",
+        level=STAGE,
     )
     return output_csv_folder
 
 
-def filter_by_open_and_close(input_csv_folder, output_csv_folder, open_year):
-    # type: (str, str, str) -> str
-    print("=============================")
-    print("= filter_by_open_and_close ==")
-    print("=============================")
+def _filter_by_open_and_close_file(
+    file_name, input_csv_folder, output_csv_folder, open_year, output_format
+):
+    # type: (str, str, str, int, str) -> dict
+    log("filter_by_open_and_close -> file_name: ", file_name)
+    # Check the number of rows in the CSV file
+    file_path = os.path.join(input_csv_folder, file_name)
+
+    # Read the CSV file
+    df = read_table(file_path, encoding="utf-8-sig", on_bad_lines="warn")
+
+    filtered_df = _filter_open_and_close(df, open_year)
+    write_table(
+        filtered_df,
+        os.path.join(output_csv_folder, table_name(file_name, output_format)),
+        encoding="utf-8-sig",
+    )
+    return {"rows": len(filtered_df), "rows_in": len(df)}
+
+
+def filter_by_open_and_close(
+    input_csv_folder,
+    output_csv_folder,
+    open_year,
+    max_workers=None,
+    output_format="csv",
+    force=False,
+):
+    # type: (str, str, str, int, str, bool) -> str
+    banner("filter_by_open_and_close")
 
     # Output folder 이름 설정
     output_csv_folder = os.path.join(output_csv_folder + "/00openat" + str(open_year))
@@ -60,75 +417,64 @@ def filter_by_open_and_close(input_csv_folder, output_csv_folder, open_year):
     if not os.path.exists(output_csv_folder):
         os.makedirs(output_csv_folder)
 
-    for file_name in os.listdir(input_csv_folder):
-        print("filter_by_open_and_close -> file_name: ", file_name)
-        # Check the number of rows in the CSV file
-        file_path = os.path.join(input_csv_folder, file_name)
-
-        # Read the CSV file
-        df = pd.read_csv(file_path, encoding="utf-8-sig", on_bad_lines="warn")
+    csv_files = list_tables(input_csv_folder)
+    run_cached_file_tasks(
+        partial(
+            _filter_by_open_and_close_file,
+            input_csv_folder=input_csv_folder,
+            output_csv_folder=output_csv_folder,
+            open_year=open_year,
+            output_format=output_format,
+        ),
+        input_csv_folder,
+        csv_files,
+        output_csv_folder,
+        partial(_output_names, output_format=output_format),
+        params={"open_year": open_year, "output_format": output_format},
+        force=force,
+        max_workers=max_workers,
+        stage_name="filter_by_open_and_close",
+    )
 
-        # Filter rows where "영업상태명" is either "폐업" or "영업/정상"
-        filtered_df = df[df["영업상태명"].isin(["폐업", "영업/정상"])]
+    log(
+        f"Filtered data containing '{"OPENAND CLOSE"}' has been saved to {output_csv_folder}.",
+        level=STAGE,
+    )
+    return output_csv_folder
 
-        # Filter rows where "인허가일자" is in the year 2016
-        filtered_df = filtered_df[
-            filtered_df["인허가일자"].str.split("-").str[0] == "2016"
-        ]
 
-        # 영업 상태명이 폐업이지만 폐업일자가 없는경우 제거
-        filtered_df = filtered_df[
-            ~(
-                (filtered_df["영업상태명"] == "폐업")
-                & (filtered_df["폐업일자"].isnull())
-            )
-        ]
-        filtered_df.to_csv(
-            os.path.join(output_csv_folder, file_name),
-            index=False,
-            encoding="utf-8-sig",
-        )
+def _add_survival_column_file(
+    file_name, input_csv_folder, output_csv_folder, output_format, horizons
+):
+    # type: (str, str, str, str, tuple) -> dict
+    log("add_survival_column -> file_name: ", file_name)
+    # Check the number of rows in the CSV file
+    file_path = os.path.join(input_csv_folder, file_name)
 
-    print(
-        f"Filtered data containing '{"OPENAND CLOSE"}' has been saved to {output_csv_folder}."
-    )
-    return output_csv_folder
+    # Read the CSV file
+    df = read_table(file_path, encoding="utf-8-sig", on_bad_lines="warn")
 
+    df = _add_survival(df, horizons)
 
-def add_survival_column(input_csv_folder, output_csv_folder):
-    # type: (str, str) -> str
-    def calculate_survival(row):
-        # 개업 이후부터 만 3년을 채운 경우는 True (생존) 그렇지 못한 경우는 False (사망)
-        if row["영업상태명"] == "영업/정상":
-            return True
-
-        # 폐업하였더라도 3년이상 영업한경우는 생존으로 간주
-        if row["영업상태명"] == "폐업":
-            start_date = datetime.strptime(row["인허가일자"], "%Y-%m-%d")
-            end_date = datetime.strptime(row["폐업일자"], "%Y-%m-%d")
-            survival_period = (end_date - start_date).days / 365.0
-
-            return survival_period > 3
-
-        return False
-
-        # try:
-        #     return (
-        #         True
-        #         if row["영업상태명"] == "영업/정상"
-        #         or (
-        #             row["영업상태명"] == "폐업"
-        #             and int(row["폐업일자"].split("-")[0]) > 2019
-        #         )
-        #         else False
-        #     )
-        # except Exception as e:
-        #     print(f"Error processing row: {row}")
-        #     raise e
-
-    print("=============================")
-    print("==== add_survival_column ====")
-    print("=============================")
+    # Save the filtered DataFrame to the output directory
+    output_path = os.path.join(
+        output_csv_folder + "/" + table_name(file_name, output_format)
+    )
+    write_table(df, output_path)
+    return {"rows": len(df), "rows_in": len(df)}
+
+
+def add_survival_column(
+    input_csv_folder,
+    output_csv_folder,
+    max_workers=None,
+    output_format="csv",
+    horizons=SURVIVAL_HORIZONS,
+    force=False,
+):
+    # type: (str, str, int, str, tuple, bool) -> str
+    # horizons: "생존_{n}년" 컬럼을 만들 기간 (년), "생존" 은 항상 SURVIVAL_YEARS 기준
+    banner("add_survival_column")
 
     # Output folder 이름 설정
     output_csv_folder = os.path.join(output_csv_folder + "/02survival")
@@ -137,30 +483,66 @@ def add_survival_column(input_csv_folder, output_csv_folder):
     os.makedirs(output_csv_folder, exist_ok=True)
 
     # Iterate through all CSV files in the input directory
-    print("input_csv_folder: ", input_csv_folder)
-    for file_name in os.listdir(input_csv_folder):
-        print("add_survival_column -> file_name: ", file_name)
-        # Check the number of rows in the CSV file
-        file_path = os.path.join(input_csv_folder, file_name)
+    log("input_csv_folder: ", input_csv_folder, level=STAGE)
+    csv_files = list_tables(input_csv_folder)
+    run_cached_file_tasks(
+        partial(
+            _add_survival_column_file,
+            input_csv_folder=input_csv_folder,
+            output_csv_folder=output_csv_folder,
+            output_format=output_format,
+            horizons=horizons,
+        ),
+        input_csv_folder,
+        csv_files,
+        output_csv_folder,
+        partial(_output_names, output_format=output_format),
+        params={"horizons": horizons, "output_format": output_format},
+        force=force,
+        max_workers=max_workers,
+        stage_name="add_survival_column",
+    )
 
-        # Read the CSV file
-        df = pd.read_csv(file_path, encoding="utf-8-sig", on_bad_lines="warn")
+    return output_csv_folder
 
-        # Create a new column "생존" with 0 or 1 based on the conditions
-        df["생존"] = df.apply(calculate_survival, axis=1)
 
-        # Save the filtered DataFrame to the output directory
-        output_path = os.path.join(output_csv_folder + "/" + file_name)
-        df.to_csv(output_path, index=False)
+def _filter_small_csv_file(
+    file_name, input_csv_folder, output_csv_folder, max_rows, output_format
+):
+    # type: (str, str, str, int, str) -> dict
+    log("filter_small_csv_files -> file_name: ", file_name)
+    file_path = os.path.join(input_csv_folder, file_name)
 
-    return output_csv_folder
+    # 파싱 없이 행 수를 먼저 세고, max_rows 를 넘는 순간 멈춘다.
+    row_count = table_row_count(file_path, stop_after=max_rows)
+    if row_count <= max_rows:
+        return {"status": "skipped", "rows": row_count, "rows_in": row_count}
+
+    # Read the CSV file
+    df = read_table(file_path, encoding="utf-8-sig", on_bad_lines="warn")
+
+    # 데이터 50개 이상인 파일만 남긴다. (잘못된 행이 버려져 줄어든 경우 포함)
+    if len(df) <= max_rows:
+        return {"status": "skipped", "rows": len(df), "rows_in": len(df)}
+
+    # Save the file to the output directory
+    output_path = os.path.join(
+        output_csv_folder + "/" + table_name(file_name, output_format)
+    )
+    write_table(df, output_path, encoding="utf-8-sig")
+    return {"rows": len(df), "rows_in": len(df)}
 
 
-def filter_small_csv_files(input_csv_folder, output_csv_folder, max_rows=50):
-    # type: (str, str, int) -> str
-    print("=============================")
-    print("== filter_small_csv_files ===")
-    print("=============================")
+def filter_small_csv_files(
+    input_csv_folder,
+    output_csv_folder,
+    max_rows=50,
+    max_workers=None,
+    output_format="csv",
+    force=False,
+):
+    # type: (str, str, int, int, str, bool) -> str
+    banner("filter_small_csv_files")
 
     # Output folder 이름 설정
     output_csv_folder = os.path.join(output_csv_folder + "/01filtered")
@@ -169,63 +551,773 @@ def filter_small_csv_files(input_csv_folder, output_csv_folder, max_rows=50):
     os.makedirs(output_csv_folder, exist_ok=True)
 
     # Iterate through all CSV files in the input directory
-    for file_name in os.listdir(input_csv_folder):
-        print("filter_small_csv_files -> file_name: ", file_name)
-        file_path = os.path.join(input_csv_folder, file_name)
+    csv_files = list_tables(input_csv_folder)
+    run_cached_file_tasks(
+        partial(
+            _filter_small_csv_file,
+            input_csv_folder=input_csv_folder,
+            output_csv_folder=output_csv_folder,
+            max_rows=max_rows,
+            output_format=output_format,
+        ),
+        input_csv_folder,
+        csv_files,
+        output_csv_folder,
+        partial(_output_names, output_format=output_format),
+        params={"max_rows": max_rows, "output_format": output_format},
+        force=force,
+        max_workers=max_workers,
+        stage_name="filter_small_csv_files",
+    )
+
+    log(
+        f"CSV files with {max_rows} rows or fewer have been saved to {output_csv_folder}.",
+        level=STAGE,
+    )
+    return output_csv_folder
 
-        # Read the CSV file
-        df = pd.read_csv(file_path, encoding="utf-8-sig", on_bad_lines="warn")
 
-        # 데이터 50개 이상인 파일만 남긴다.
-        if len(df) > max_rows:
-            # Save the file to the output directory
-            output_path = os.path.join(output_csv_folder + "/" + file_name)
-            df.to_csv(output_path, index=False, encoding="utf-8-sig")
+def _fused_filter_file(
+    file_name,
+    input_csv_folder,
+    output_csv_folder,
+    address_name,
+    open_year,
+    max_rows,
+    write_intermediate,
+    output_format,
+    usecols,
+    chunksize,
+    horizons,
+):
+    # type: (str, str, str, str, int, int, bool, str, list, int, tuple) -> dict
+    log("fused_filter -> file_name: ", file_name)
+    file_path = os.path.join(input_csv_folder, file_name)
+    encoding = detect_encoding(file_path)
+    columns = read_header(file_path, encoding)
+    if "소재지전체주소" not in columns:
+        return {"status": "skipped"}
+    usecols = _raw_usecols(usecols)
+    if usecols is not None:
+        columns = [column for column in columns if column in set(usecols)]
+
+    def output_path(folder_name):
+        return os.path.join(
+            output_csv_folder, folder_name, table_name(file_name, output_format)
+        )
 
-    print(
-        f"CSV files with {max_rows} rows or fewer have been saved to {output_csv_folder}."
+    # 중간 결과는 write_intermediate 인 경우에만 chunk 단위로 이어서 저장
+    if write_intermediate:
+        address_output = TableAppender(output_path(address_name), columns)
+        open_output = TableAppender(output_path("00openat" + str(open_year)), columns)
+
+    # 주소/영업상태/개업연도 조건은 chunk 단위로 적용하고 통과한 행만 모은다.
+    chunks = []
+    rows_in = 0
+    for chunk in iter_raw_chunks(
+        file_path, usecols=usecols, chunksize=chunksize, encoding=encoding
+    ):
+        rows_in += len(chunk)
+        chunk = _filter_address(chunk, address_name)
+        if write_intermediate:
+            address_output.append(chunk)
+
+        chunk = _filter_open_and_close(chunk, open_year)
+        if write_intermediate:
+            open_output.append(chunk)
+        chunks.append(chunk)
+
+    if write_intermediate:
+        address_output.close()
+        open_output.close()
+
+    df = (
+        pd.concat(chunks, ignore_index=True)
+        if chunks
+        else pd.DataFrame(columns=columns)
     )
-    return output_csv_folder
+
+    # 데이터 max_rows 개 이하인 파일은 제외
+    if len(df) <= max_rows:
+        return {"status": "skipped", "rows": len(df), "rows_in": rows_in}
+    if write_intermediate:
+        write_table(df, output_path("01filtered"), encoding="utf-8-sig")
+
+    df = _add_survival(df, horizons)
+    write_table(df, output_path("02survival"))
+    return {"rows": len(df), "rows_in": rows_in}
+
+
+def run_fused_filter(
+    input_csv_folder,
+    output_csv_folder,
+    address_name="서울특별시",
+    open_year=2016,
+    max_rows=50,
+    write_intermediate=False,
+    max_workers=None,
+    output_format="csv",
+    usecols=None,
+    chunksize=DEFAULT_CHUNKSIZE,
+    horizons=SURVIVAL_HORIZONS,
+    force=False,
+):
+    # type: (str, str, str, int, int, bool, int, str, list, int, tuple, bool) -> str
+    # filter_by_address -> filter_by_open_and_close -> filter_small_csv_files
+    # -> add_survival_column 을 원본 파일을 한 번만 읽어서 메모리에서 처리한다.
+    # 최종 결과(02survival)만 저장하고, write_intermediate 이면 각 단계 폴더도 저장한다.
+    banner("fused_filter")
+
+    folder_names = ["02survival"]
+    if write_intermediate:
+        folder_names += [address_name, "00openat" + str(open_year), "01filtered"]
+    for folder_name in folder_names:
+        os.makedirs(os.path.join(output_csv_folder, folder_name), exist_ok=True)
+
+    csv_files = [f for f in os.listdir(input_csv_folder) if f.endswith(".csv")]
+    run_cached_file_tasks(
+        partial(
+            _fused_filter_file,
+            input_csv_folder=input_csv_folder,
+            output_csv_folder=output_csv_folder,
+            address_name=address_name,
+            open_year=open_year,
+            max_rows=max_rows,
+            write_intermediate=write_intermediate,
+            output_format=output_format,
+            usecols=usecols,
+            chunksize=chunksize,
+            horizons=horizons,
+        ),
+        input_csv_folder,
+        csv_files,
+        output_csv_folder,
+        partial(
+            _output_names, output_format=output_format, folder_names=tuple(folder_names)
+        ),
+        params={
+            "address_name": address_name,
+            "open_year": open_year,
+            "max_rows": max_rows,
+            "write_intermediate": write_intermediate,
+            "usecols": usecols,
+            "horizons": horizons,
+            "output_format": output_format,
+        },
+        force=force,
+        max_workers=max_workers,
+        stage_name="fused_filter",
+    )
+
+    return os.path.join(output_csv_folder, "02survival")
+
+
+def _tracked_mask(n, rows):
+    # type: (int, np.ndarray) -> np.ndarray
+    # 평균을 계산할 업장 표시 (rows 가 None 이면 전체)
+    if rows is None:
+        return np.ones(n, dtype=bool)
+    tracked = np.zeros(n, dtype=bool)
+    tracked[rows] = True
+    return tracked
+
+
+def _select_rows(values, rows):
+    # type: (np.ndarray, np.ndarray) -> np.ndarray
+    return values if rows is None else values[rows]
+
+
+def _nearest_other_distance(
+    tree, tree_codes, query_coords, query_codes, tree_mask=None
+):
+    # type: (KDTree, np.ndarray, np.ndarray, np.ndarray, np.ndarray) -> tuple
+    # 사업장명이 같은 업장을 제외한 최근접 거리와 인덱스 (후보가 없으면 NaN, -1)
+    # 사업장명이 NaN(-1)인 경우 기존 `!=` 비교와 같이 모든 업장을 후보로 본다.
+    # tree_mask 가 주어지면 mask 가 True 인 업장만 후보로 본다.
+    distances = np.full(len(query_coords), np.nan)
+    nearest_idx = np.full(len(query_coords), -1, dtype=np.int64)
+    pending = np.arange(len(query_coords))
+    k = min(2, tree.n)
+
+    while len(pending) > 0:
+        dist, idx = tree.query(query_coords[pending], k=k)
+        dist = dist.reshape(len(pending), -1)
+        idx = idx.reshape(len(pending), -1)
+
+        own_codes = query_codes[pending][:, None]
+        valid = (tree_codes[idx] != own_codes) | (own_codes == -1)
+        if tree_mask is not None:
+            valid &= tree_mask[idx]
+        found = valid.any(axis=1)
+        first = valid.argmax(axis=1)
+        distances[pending[found]] = dist[found, first[found]]
+        nearest_idx[pending[found]] = idx[found, first[found]]
+
+        # 같은 이름의 업장만 잡힌 경우 k를 늘려서 다시 조회
+        pending = pending[~found]
+        if k >= tree.n:
+            break
+        k = min(k * 2, tree.n)
+
+    return distances, nearest_idx
+
+
+def _pairwise_nearest(coords, name_codes, rows, candidates, max_cells=2**22):
+    # type: (np.ndarray, np.ndarray, np.ndarray, np.ndarray, int) -> tuple
+    # rows 각각에 대해 candidates 중 사업장명이 다른 최근접 업장 (없으면 inf, -1)
+    distances = np.full(len(rows), np.inf)
+    nearest_idx = np.full(len(rows), -1, dtype=np.int64)
+    if len(rows) == 0 or len(candidates) == 0:
+        return distances, nearest_idx
+
+    step = max(1, max_cells // len(candidates))
+    for begin in range(0, len(rows), step):
+        chunk = rows[begin : begin + step]
+        dist = np.hypot(
+            coords[chunk, 0][:, None] - coords[candidates, 0][None, :],
+            coords[chunk, 1][:, None] - coords[candidates, 1][None, :],
+        )
+        own_codes = name_codes[chunk][:, None]
+        valid = (name_codes[candidates][None, :] != own_codes) | (own_codes == -1)
+        dist[~valid] = np.inf
+
+        best = dist.argmin(axis=1)
+        best_dist = dist[np.arange(len(chunk)), best]
+        distances[begin : begin + step] = best_dist
+        nearest_idx[begin : begin + step] = np.where(
+            np.isfinite(best_dist), candidates[best], -1
+        )
+
+    return distances, nearest_idx
+
+
+def _nearest_open(tree, coords, name_codes, rows, is_open):
+    # type: (KDTree, np.ndarray, np.ndarray, np.ndarray, np.ndarray) -> tuple
+    # rows 각각에 대해 현재 영업 중인 업장 중 최근접 업장 (없으면 inf, -1)
+    open_idx = np.flatnonzero(is_open)
+
+    # 영업 중인 업장 비율이 낮으면 KDTree 조회에서 k가 커지므로 직접 계산
+    if len(open_idx) * len(open_idx) < 64 * tree.n:
+        return _pairwise_nearest(coords, name_codes, rows, open_idx)
+
+    dist, idx = _nearest_other_distance(
+        tree, name_codes, coords[rows], name_codes[rows], tree_mask=is_open
+    )
+    return np.nan_to_num(dist, nan=np.inf), idx
+
+
+def _engine_result(averages, bounds, rows, return_bound):
+    # type: (np.ndarray, np.ndarray, np.ndarray, bool) -> ...
+    if return_bound:
+        return _select_rows(averages, rows), _select_rows(bounds, rows)
+    return _select_rows(averages, rows)
+
+
+def _month_starts(start_dates, end_dates):
+    # type: (np.ndarray, np.ndarray) -> np.ndarray
+    # 가장 이른 개업일부터 가장 늦은 폐업일까지 매월 1일
+    return pd.date_range(
+        start=start_dates.min(), end=end_dates.max(), freq="MS"
+    ).to_numpy(dtype="datetime64[ns]")
+
+
+def _in_window(times, window):
+    # type: (np.ndarray, tuple) -> np.ndarray
+    # window = (begin, end): [begin, end) 안의 시점만 (None 이면 그쪽으로 제한 없음)
+    if window is None:
+        return times
+    begin, end = window
+    keep = np.ones(len(times), dtype=bool)
+    if begin is not None:
+        keep &= times >= begin
+    if end is not None:
+        keep &= times < end
+    return times[keep]
+
+
+def _monthly_sums(coords, start_dates, end_dates, name_codes, tracked, window=None):
+    # type: (np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, tuple) -> tuple
+    # 월 단위 시점별 최근접 거리의 합계 / 횟수 / 최댓값 (window 안의 시점만)
+    # 시점끼리는 서로 독립이므로 구간별 합계를 더하면 전체 합계와 같다.
+    n = len(coords)
+    totals = np.zeros(n)
+    counts = np.zeros(n, dtype=np.int64)
+    bounds = np.zeros(n)
+    if not tracked.any():
+        return totals, counts, bounds
+
+    months = _in_window(_month_starts(start_dates[tracked], end_dates[tracked]), window)
+
+    # 계산할 업장이 일부뿐이면 (증분 갱신 등) 전체 업장 KDTree를 한 번만 만들고
+    # 매월 영업 중인 업장만 후보로 조회한다.
+    static_tree = KDTree(coords) if tracked.sum() * 8 < n else None
+
+    for month in months:
+        # 해당 월에 영업 중인 업장
+        is_open = (start_dates <= month) & (end_dates >= month)
+        open_idx = np.flatnonzero(is_open)
+        query_idx = open_idx[tracked[open_idx]]
+        if len(query_idx) == 0:
+            continue
+
+        if static_tree is not None:
+            dist, _ = _nearest_open(static_tree, coords, name_codes, query_idx, is_open)
+            dist[np.isinf(dist)] = np.nan
+        else:
+            tree = KDTree(coords[open_idx])
+            dist, _ = _nearest_other_distance(
+                tree, name_codes[open_idx], coords[query_idx], name_codes[query_idx]
+            )
+
+        found = ~np.isnan(dist)
+        totals[query_idx[found]] += dist[found]
+        counts[query_idx[found]] += 1
+        bounds[query_idx] = np.maximum(bounds[query_idx], np.where(found, dist, np.inf))
+
+    return totals, counts, bounds
+
+
+def monthly_average_distance(
+    coords, start_dates, end_dates, name_codes, rows=None, return_bound=False
+):
+    # type: (np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, bool) -> np.ndarray
+    # 월 단위 시점마다 영업 중인 업장으로 KDTree를 한 번만 만들고,
+    # 영업 중인 모든 업장을 한 번에 조회하여 업장별 평균에 누적한다.
+    # rows 가 주어지면 해당 업장의 평균만 계산해서 rows 순서로 반환한다.
+    # return_bound 이면 영업 기간 중 최근접 거리의 최댓값도 함께 반환한다.
+    # (최근접 업장이 없던 시점이 있으면 inf, 증분 갱신에서 영향 범위로 사용)
+    n = len(coords)
+    totals, counts, bounds = _monthly_sums(
+        coords, start_dates, end_dates, name_codes, _tracked_mask(n, rows)
+    )
+
+    # 비교 대상이 한 번도 없었던 업장은 0
+    averages = np.divide(totals, counts, out=np.zeros(n), where=counts > 0)
+    return _engine_result(averages, bounds, rows, return_bound)
+
+
+def _event_days(start_dates, end_dates):
+    # type: (np.ndarray, np.ndarray) -> tuple
+    # 개업일과 폐업 다음날 (1970-01-01 기준 일수)
+    starts = start_dates.astype("datetime64[D]").astype(np.int64)
+    closes = end_dates.astype("datetime64[D]").astype(np.int64) + 1
+    return starts, closes
+
+
+def _day(time):
+    # type: (np.datetime64) -> int
+    return None if time is None else int(np.datetime64(time, "D").astype(np.int64))
+
+
+def _event_sums(coords, start_dates, end_dates, name_codes, tracked, window=None):
+    # type: (np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, tuple) -> tuple
+    # 이벤트 사이 구간별 최근접 거리 x 일수의 합계 / 일수 합계 / 최댓값 (window 안의 구간만)
+    # window 의 시작 시점에는 그 전에 개업해서 아직 영업 중인 업장의 최근접 업장을
+    # 직접 구해서 시작하고, 끝 시점까지 누적하므로 구간별 합계를 더하면 전체 합계와 같다.
+    n = len(coords)
+    totals = np.zeros(n)
+    weights = np.zeros(n)
+    bounds = np.zeros(n)
+    if not tracked.any():
+        return totals, weights, bounds
+
+    starts, closes = _event_days(start_dates, end_dates)
+    valid_rows = np.flatnonzero(starts < closes)
+    open_order = valid_rows[np.argsort(starts[valid_rows], kind="stable")]
+    close_order = valid_rows[np.argsort(closes[valid_rows], kind="stable")]
+    open_times = starts[open_order]
+    close_times = closes[close_order]
+
+    # 전체 업장에 대한 KDTree는 한 번만 만든다.
+    tree = KDTree(coords)
+    is_open = np.zeros(n, dtype=bool)
+    nearest = np.full(n, np.inf)
+    nearest_idx = np.full(n, -1, dtype=np.int64)
+    last_time = np.zeros(n, dtype=np.int64)
+
+    def flush(target, time):
+        # 직전 갱신 시점부터 time 까지 현재 최근접 거리를 누적
+        span = time - last_time[target]
+        has_neighbour = np.isfinite(nearest[target])
+        totals[target[has_neighbour]] += (nearest[target] * span)[has_neighbour]
+        weights[target[has_neighbour]] += span[has_neighbour]
+        spanned = target[span > 0]
+        bounds[spanned] = np.maximum(bounds[spanned], nearest[spanned])
+        last_time[target] = time
+
+    times = np.unique(np.concatenate([open_times, close_times]))
+    begin, end = (None, None) if window is None else map(_day, window)
+    times = _in_window(times, (begin, end))
+    if begin is not None:
+        # begin 이전 이벤트까지 처리된 상태 (begin 당일 폐업하는 업장은 아직 영업 중)
+        opened = valid_rows[
+            (starts[valid_rows] < begin) & (closes[valid_rows] >= begin)
+        ]
+        is_open[opened] = True
+        last_time[opened] = begin
+        opened = opened[tracked[opened]]
+        nearest[opened], nearest_idx[opened] = _nearest_open(
+            tree, coords, name_codes, opened, is_open
+        )
+
+    for time in times:
+        # 폐업 이벤트: 폐업한 업장을 최근접으로 두던 업장만 다시 계산
+        closing = close_order[
+            np.searchsorted(close_times, time, side="left") : np.searchsorted(
+                close_times, time, side="right"
+            )
+        ]
+        if len(closing) > 0:
+            flush(closing, time)
+            is_open[closing] = False
+            nearest[closing] = np.inf
+            nearest_idx[closing] = -1
+
+            open_idx = np.flatnonzero(is_open)
+            affected = open_idx[np.isin(nearest_idx[open_idx], closing)]
+            if len(affected) > 0:
+                flush(affected, time)
+                nearest[affected], nearest_idx[affected] = _nearest_open(
+                    tree, coords, name_codes, affected, is_open
+                )
+
+        # 개업 이벤트: 새 업장이 현재 최근접보다 가까운 기존 업장만 갱신
+        opening = open_order[
+            np.searchsorted(open_times, time, side="left") : np.searchsorted(
+                open_times, time, side="right"
+            )
+        ]
+        if len(opening) > 0:
+            existing = np.flatnonzero(is_open & tracked)
+            if len(existing) > 0:
+                # 최근접 거리가 radius 이하인 업장은 새 업장 반경 radius 안에 있을
+                # 때만 영향을 받으므로, 반경 조회 결과와 먼 업장만 후보로 본다.
+                radius = np.percentile(nearest[existing], 95, method="lower")
+                if not np.isfinite(radius):
+                    radius = 0.0
+                nearby = tree.query_ball_point(coords[opening], r=radius)
+                candidates = np.unique(
+                    np.concatenate(
+                        [np.asarray(p, dtype=np.int64) for p in nearby]
+                        + [existing[nearest[existing] > radius]]
+                    )
+                )
+                candidates = candidates[is_open[candidates] & tracked[candidates]]
+
+                dist, idx = _pairwise_nearest(coords, name_codes, candidates, opening)
+                improved = dist < nearest[candidates]
+                flush(candidates[improved], time)
+                nearest[candidates[improved]] = dist[improved]
+                nearest_idx[candidates[improved]] = idx[improved]
+
+            is_open[opening] = True
+            last_time[opening] = time
+            opening = opening[tracked[opening]]
+            nearest[opening], nearest_idx[opening] = _nearest_open(
+                tree, coords, name_codes, opening, is_open
+            )
+
+    if end is not None:
+        # 다음 구간은 end 부터 누적하므로 영업 중인 업장을 end 까지 누적
+        flush(np.flatnonzero(is_open & tracked), end)
+    return totals, weights, bounds
+
+
+def event_average_distance(
+    coords, start_dates, end_dates, name_codes, rows=None, return_bound=False
+):
+    # type: (np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, bool) -> np.ndarray
+    # 개업일과 폐업 다음날을 이벤트로 보고 날짜순으로 처리한다.
+    # 이벤트 사이에서는 최근접 업장이 바뀌지 않으므로, 이벤트가 생길 때마다
+    # 영향을 받는 업장만 갱신하고 구간 길이(일)로 가중 평균한다.
+    # rows 가 주어지면 해당 업장의 최근접 거리만 추적해서 rows 순서로 반환한다.
+    # return_bound 는 monthly_average_distance 와 같다.
+    n = len(coords)
+    totals, weights, bounds = _event_sums(
+        coords, start_dates, end_dates, name_codes, _tracked_mask(n, rows)
+    )
+
+    # 비교 대상이 한 번도 없었던 업장은 0
+    averages = np.divide(totals, weights, out=np.zeros(n), where=weights > 0)
+    return _engine_result(averages, bounds, rows, return_bound)
+
+
+# 최근접 거리 계산 방식
+# - monthly: 매월 1일 시점 샘플링 (기존 방식)
+# - event: 개업/폐업 이벤트 기반의 정확한 기간 가중 평균
+DISTANCE_MODES = {
+    "monthly": monthly_average_distance,
+    "event": event_average_distance,
+}
+
+# 시간 구간별 합계 (shared_average_distance 에서 구간을 나눠 계산할 때 사용)
+DISTANCE_SUMS = {
+    "monthly": _monthly_sums,
+    "event": _event_sums,
+}
+
+
+def time_windows(mode, start_dates, end_dates, workers):
+    # type: (str, np.ndarray, np.ndarray, int) -> list
+    # 계산 시점(monthly: 매월 1일, event: 이벤트 날짜)을 작업량이 비슷한
+    # 연속 구간 [begin, end) 로 나눈다. (첫 구간의 begin 과 마지막 구간의 end 는 None)
+    if mode == "monthly":
+        times = _month_starts(start_dates, end_dates)
+        # 시점별 작업량: 그 달에 영업 중인 업장 수 (KDTree 크기)
+        work = np.searchsorted(np.sort(start_dates), times, side="right")
+        work = work - np.searchsorted(np.sort(end_dates), times, side="left")
+    else:
+        starts, closes = _event_days(start_dates, end_dates)
+        valid = starts < closes
+        days = np.unique(np.concatenate([starts[valid], closes[valid]]))
+        times = days.astype("datetime64[D]").astype("datetime64[ns]")
+        work = np.ones(len(times))
+
+    cumulative = np.cumsum(np.maximum(work, 1))
+    targets = cumulative[-1] * np.arange(1, workers) / workers
+    cuts = np.unique(np.searchsorted(cumulative, targets, side="right"))
+    cuts = cuts[(cuts > 0) & (cuts < len(times))]
+    edges = [None] + list(times[cuts]) + [None]
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def _shared_distance_worker(mode, specs, window):
+    # type: (str, dict, tuple) -> tuple
+    # 공유 메모리에 올라간 배열을 복사 없이 붙여서 window 구간의 합계만 계산
+    blocks = []
+    arrays = {}
+    try:
+        for key, (shm_name, shape, dtype) in specs.items():
+            shm = shared_memory.SharedMemory(name=shm_name)
+            blocks.append(shm)
+            arrays[key] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+        return DISTANCE_SUMS[mode](
+            arrays["coords"],
+            arrays["start_dates"],
+            arrays["end_dates"],
+            arrays["name_codes"],
+            np.ones(len(arrays["coords"]), dtype=bool),
+            window=window,
+        )
+    finally:
+        # 공유 메모리를 닫기 전에 참조하는 배열을 먼저 해제
+        arrays.clear()
+        for shm in blocks:
+            shm.close()
+
+
+def shared_average_distance(
+    mode, coords, start_dates, end_dates, name_codes, workers, return_bound=False
+):
+    # type: (str, np.ndarray, np.ndarray, np.ndarray, np.ndarray, int, bool) -> np.ndarray
+    # 한 파일의 계산을 시간 구간으로 나눠 여러 프로세스에서 계산한다.
+    # 좌표/날짜/사업장명 배열은 multiprocessing.shared_memory 에 한 번만 올리고,
+    # 각 프로세스는 time_windows 의 구간 하나에서 모든 업장의 합계를 계산한다.
+    # (월별 KDTree 는 그 달을 맡은 프로세스에서 한 번만 만든다)
+    # 구간별 합계를 더해서 평균을 내므로 단일 프로세스 결과와 부동소수점 합산 순서만 다르다.
+    arrays = {
+        "coords": np.ascontiguousarray(coords, dtype=np.float64),
+        "start_dates": np.ascontiguousarray(start_dates, dtype="datetime64[ns]"),
+        "end_dates": np.ascontiguousarray(end_dates, dtype="datetime64[ns]"),
+        "name_codes": np.ascontiguousarray(name_codes, dtype=np.int64),
+    }
+    windows = time_windows(mode, arrays["start_dates"], arrays["end_dates"], workers)
+
+    blocks = []
+    specs = {}
+    try:
+        for key, array in arrays.items():
+            shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            blocks.append(shm)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+            specs[key] = (shm.name, array.shape, array.dtype.str)
+
+        totals = np.zeros(len(coords))
+        counts = np.zeros(len(coords))
+        bounds = np.zeros(len(coords))
+        with ProcessPoolExecutor(max_workers=min(workers, len(windows))) as executor:
+            futures = [
+                executor.submit(_shared_distance_worker, mode, specs, window)
+                for window in windows
+            ]
+            for future in futures:
+                window_totals, window_counts, window_bounds = future.result()
+                totals += window_totals
+                counts += window_counts
+                bounds = np.maximum(bounds, window_bounds)
+
+        # 비교 대상이 한 번도 없었던 업장은 0
+        distances = np.divide(
+            totals, counts, out=np.zeros(len(coords)), where=counts > 0
+        )
+        if return_bound:
+            return distances, bounds
+        return distances
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+
+# 영업 기간 중 최근접 거리의 최댓값 (증분 갱신에서 영향 범위로 사용)
+DISTANCE_BOUND_COLUMN = "동일업종 최근접거리의 최대"
+
+# 증분 갱신에서 비교하는 업장 정보 (이 값이 같으면 같은 업장으로 본다)
+RECORD_COLUMNS = ["사업장명", "좌표정보x(epsg5174)", "좌표정보y(epsg5174)"]
+
+
+def _record_keys(old_df, new_df):
+    # type: (pd.DataFrame, pd.DataFrame) -> tuple
+    # 업장 식별 키: 관리번호가 두 스냅샷 모두에서 유일하면 관리번호,
+    # 아니면 사업장명 + 인허가일자 + 좌표 조합 (중복이 있으면 None)
+    def composite(df):
+        return (
+            df["사업장명"].astype(str)
+            + "|"
+            + df["start_date"].astype(str)
+            + "|"
+            + df["좌표정보x(epsg5174)"].astype(str)
+            + "|"
+            + df["좌표정보y(epsg5174)"].astype(str)
+        )
+
+    def usable(keys):
+        return keys.notna().all() and keys.is_unique
+
+    if "관리번호" in old_df.columns and "관리번호" in new_df.columns:
+        old_keys = old_df["관리번호"].astype(str).where(old_df["관리번호"].notna())
+        new_keys = new_df["관리번호"].astype(str).where(new_df["관리번호"].notna())
+        if usable(old_keys) and usable(new_keys):
+            return old_keys.to_numpy(), new_keys.to_numpy()
+
+    old_keys, new_keys = composite(old_df), composite(new_df)
+    if usable(old_keys) and usable(new_keys):
+        return old_keys.to_numpy(), new_keys.to_numpy()
+    return None, None
+
+
+def _same_records(old_df, new_df):
+    # type: (pd.DataFrame, pd.DataFrame) -> np.ndarray
+    # 같은 키의 두 행이 이름/좌표/영업 기간까지 같은지 비교
+    same = np.ones(len(new_df), dtype=bool)
+    for column in RECORD_COLUMNS:
+        old_values = old_df[column].to_numpy()
+        new_values = new_df[column].to_numpy()
+        both_missing = pd.isna(old_values) & pd.isna(new_values)
+        same &= both_missing | (old_values == new_values)
+    for column in ["start_date", "end_date"]:
+        same &= old_df[column].to_numpy() == new_df[column].to_numpy()
+    return same
+
+
+def _overlaps_any(start_dates, end_dates, other_start_dates, other_end_dates):
+    # type: (np.ndarray, np.ndarray, np.ndarray, np.ndarray) -> np.ndarray
+    # 각 기간이 other 기간 중 하나라도 겹치는지 (other 시작일 순 누적 최대 종료일 사용)
+    if len(other_start_dates) == 0:
+        return np.zeros(len(start_dates), dtype=bool)
+    order = np.argsort(other_start_dates, kind="stable")
+    sorted_starts = other_start_dates[order]
+    latest_ends = np.maximum.accumulate(other_end_dates[order])
+    position = np.searchsorted(sorted_starts, end_dates, side="right") - 1
+    overlaps = np.zeros(len(start_dates), dtype=bool)
+    has_start = position >= 0
+    overlaps[has_start] = latest_ends[position[has_start]] >= start_dates[has_start]
+    return overlaps
+
+
+def changed_neighbourhood(
+    coords, start_dates, end_dates, bounds, changed_coords, changed_starts, changed_ends
+):
+    # type: (np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray) -> np.ndarray
+    # 바뀐 업장(추가/삭제/수정 전후) 때문에 최근접 거리가 달라질 수 있는 업장 표시
+    # 업장 i 의 최근접 거리는 영업 기간이 겹치고 거리가 bounds[i] 이하인 업장이
+    # 추가되거나 사라질 때만 바뀔 수 있다. (bounds 가 inf 이면 기간만 확인)
+    affected = np.zeros(len(coords), dtype=bool)
+    if len(changed_coords) == 0 or len(coords) == 0:
+        return affected
+
+    unbounded = ~np.isfinite(bounds)
+    affected[unbounded] = _overlaps_any(
+        start_dates[unbounded], end_dates[unbounded], changed_starts, changed_ends
+    )
+
+    bounded = np.flatnonzero(~unbounded)
+    if len(bounded) > 0:
+        # 부동소수점 오차로 경계의 업장이 빠지지 않도록 반경을 조금 늘린다.
+        radius = bounds[bounded] * (1 + 1e-9) + 1e-9
+        nearby = KDTree(changed_coords).query_ball_point(coords[bounded], r=radius)
+        lengths = np.array([len(p) for p in nearby], dtype=np.int64)
+        if lengths.sum() > 0:
+            pair_rows = np.repeat(bounded, lengths)
+            pair_changed = np.concatenate(
+                [np.asarray(p, dtype=np.int64) for p in nearby]
+            )
+            overlap = (changed_starts[pair_changed] <= end_dates[pair_rows]) & (
+                start_dates[pair_rows] <= changed_ends[pair_changed]
+            )
+            affected[pair_rows[overlap]] = True
+    return affected
 
 
 class DistanceCalculator:
-    def __init__(self, folder_path, output_folder_path, end_date):
+    def __init__(
+        self,
+        folder_path,
+        output_folder_path,
+        end_date,
+        mode="monthly",
+        row_workers=None,
+        output_format="csv",
+        period_column=False,
+    ):
+        if mode not in DISTANCE_MODES:
+            raise ValueError(
+                f"mode must be one of {list(DISTANCE_MODES)}, got {mode!r}"
+            )
+
         self.folder_path = folder_path
+        self.output_root = output_folder_path
         self.output_folder_path = output_folder_path + "/03DISTANCE_CALCULATED"
         self.end_date = end_date
+        self.mode = mode
+        # 한 파일의 계산을 기간별로 나눠 맡길 프로세스 수 (None 또는 1 이면 단일 프로세스)
+        self.row_workers = row_workers
+        # 저장 형식 (csv / parquet / feather)
+        self.output_format = output_format
+        # "영업 시기" 문자열 컬럼 저장 여부 (계산에는 start_date / end_date 를 사용)
+        self.period_column = period_column
+        # update_all_files 에서 증분 갱신할 파일 (이전 결과와 파라미터가 같은 파일)
+        self.incremental_files = set()
 
         if not os.path.exists(self.output_folder_path):
             os.makedirs(self.output_folder_path)
 
-    # 날짜 파싱 함수
-    def parse_date(self, date_str):
-        try:
-            return datetime.strptime(date_str, "%Y-%m-%d")
-        except:
-            return None
+    # 영업 기간 (datetime64) 계산: 폐업일자가 없거나 잘못된 경우는 end_date 까지 영업
+    def operating_period(self, df):
+        start_dates = pd.to_datetime(
+            df["인허가일자"], format="%Y-%m-%d", errors="coerce"
+        )
+        end_dates = pd.to_datetime(df["폐업일자"], format="%Y-%m-%d", errors="coerce")
+        end_dates = end_dates.fillna(pd.Timestamp(self.end_date))
+        return start_dates, end_dates
 
-    # 영업 시기 문자열 생성
+    # 영업 시기 문자열 생성 ("YYYY-MM-DD~YYYY-MM-DD")
     def calculate_operating_period(self, df):
-        operating_periods = []
-        for _, row in df.iterrows():
-            start_date = self.parse_date(row["인허가일자"])
-            close_date = self.parse_date(row["폐업일자"])
-            if not close_date:
-                close_date = self.end_date
-            operating_periods.append(f"{start_date.date()}~{close_date.date()}")
-        return operating_periods
-
-    # 거리 계산
-    def calculate_average_distance(self, df):
-        distances = []
+        start_dates, end_dates = self.operating_period(df)
+        return (
+            start_dates.dt.strftime("%Y-%m-%d")
+            + "~"
+            + end_dates.dt.strftime("%Y-%m-%d")
+        )
 
+    # 영업 기간 추가 및 계산할 수 없는 행 제거
+    def prepare_rows(self, df):
         df = df.copy()
-        df["start_date"] = df["영업 시기"].apply(
-            lambda x: datetime.strptime(x.split("~")[0], "%Y-%m-%d")
-        )
-        df["end_date"] = df["영업 시기"].apply(
-            lambda x: datetime.strptime(x.split("~")[1], "%Y-%m-%d")
-        )
+        df["start_date"], df["end_date"] = self.operating_period(df)
+
+        # 인허가일자를 읽을 수 없는 행은 영업 기간을 알 수 없으므로 제거
+        df = df.dropna(subset=["start_date"])
 
         # 좌표 데이터에서 NaN 또는 비정상 값 제거
         df = df.dropna(subset=["좌표정보x(epsg5174)", "좌표정보y(epsg5174)"])
@@ -233,92 +1325,231 @@ class DistanceCalculator:
             np.isfinite(df["좌표정보x(epsg5174)"])
             & np.isfinite(df["좌표정보y(epsg5174)"])
         ]
+        return df
 
-        for idx, row in df.iterrows():
-            start_date, end_date = row["start_date"], row["end_date"]
-            current_location = (row["좌표정보x(epsg5174)"], row["좌표정보y(epsg5174)"])
-
-            # 월 단위 시점 샘플링
-            dates = pd.date_range(start=start_date, end=end_date, freq="MS")
-
-            min_distances = []
-
-            for date in dates:
-                # 현재 날짜에 영업 중인 다른 업장 필터링
-                operating = df[
-                    (df["사업장명"] != row["사업장명"])
-                    & (df["start_date"] <= date)
-                    & (df["end_date"] >= date)
-                ]
+    # 거리 계산 엔진 입력 배열
+    def engine_inputs(self, df):
+        coords = df[["좌표정보x(epsg5174)", "좌표정보y(epsg5174)"]].to_numpy(
+            dtype=float
+        )
+        name_codes, _ = pd.factorize(df["사업장명"])
+        start_dates = df["start_date"].to_numpy(dtype="datetime64[ns]")
+        end_dates = df["end_date"].to_numpy(dtype="datetime64[ns]")
+        return coords, start_dates, end_dates, name_codes
 
-                if len(operating) == 0:
-                    continue
+    # 거리 계산 (평균 최근접 거리, 영업 기간 중 최근접 거리의 최댓값)
+    def calculate_average_distance(self, df):
+        df = self.prepare_rows(df)
+        coords, start_dates, end_dates, name_codes = self.engine_inputs(df)
+
+        if self.row_workers and self.row_workers > 1 and len(df) > self.row_workers:
+            distances, bounds = shared_average_distance(
+                self.mode,
+                coords,
+                start_dates,
+                end_dates,
+                name_codes,
+                self.row_workers,
+                return_bound=True,
+            )
+        else:
+            distances, bounds = DISTANCE_MODES[self.mode](
+                coords, start_dates, end_dates, name_codes, return_bound=True
+            )
 
-                # 좌표 배열 생성
-                coords = (
-                    operating[["좌표정보x(epsg5174)", "좌표정보y(epsg5174)"]]
-                    .dropna()
-                    .values
-                )
-                tree = KDTree(coords)
-                dist, _ = tree.query([current_location], k=1)
-                min_distances.append(dist[0])
+        return df, distances, bounds
+
+    # 입력 파일 읽기 (필수 열이 없으면 None)
+    def read_input(self, file):
+        file_path = os.path.join(self.folder_path, file)
+        df = read_table(file_path, encoding="utf-8-sig", on_bad_lines="warn")
+
+        # 필수 열 확인
+        required_columns = {
+            "인허가일자",
+            "폐업일자",
+            "좌표정보x(epsg5174)",
+            "좌표정보y(epsg5174)",
+            "사업장명",
+        }
+
+        if not required_columns.issubset(df.columns):
+            log(f"⚠️ 필수 열 누락으로 스킵: {file}", level=QUIET)
+            missing_columns = required_columns - set(df.columns)
+            log(f"누락된 열: {missing_columns}", level=QUIET)
+            return None
 
-            avg_distance = np.mean(min_distances) if min_distances else 0
-            print(" 평균 최근접 거리:", avg_distance)
-            distances.append(avg_distance)
+        # 영업 시기 문자열은 period_column 인 경우에만 저장
+        if self.period_column:
+            df["영업 시기"] = self.calculate_operating_period(df)
+        return df
 
-        return df, distances
+    def output_path(self, file):
+        return os.path.join(
+            self.output_folder_path, table_name(file, self.output_format)
+        )
 
     # 개별 파일 처리 함수
     def process_file(self, file):
-        try:
-            print(f"🔄 처리 시작 add average distance -> {file}")
-            file_path = os.path.join(self.folder_path, file)
-            df = pd.read_csv(file_path, encoding="utf-8-sig", on_bad_lines="warn")
-
-            # 필수 열 확인
-            required_columns = {
-                "인허가일자",
-                "폐업일자",
-                "좌표정보x(epsg5174)",
-                "좌표정보y(epsg5174)",
-                "사업장명",
-            }
-
-            if not required_columns.issubset(df.columns):
-                print(f"⚠️ 필수 열 누락으로 스킵: {file}")
-                missing_columns = required_columns - set(df.columns)
-                print(f"누락된 열: {missing_columns}")
-                return
-
-            # 영업 시기 계산
-            df["영업 시기"] = self.calculate_operating_period(df)
+        log(f"🔄 처리 시작 add average distance -> {file}")
+        df = self.read_input(file)
+        if df is None:
+            return {"status": "skipped"}
+
+        # 평균 최근접 거리 계산
+        df, distances, bounds = self.calculate_average_distance(df)
+        df["동일업종 최근접거리의 평균"] = distances
+        df[DISTANCE_BOUND_COLUMN] = bounds
+        # 저장
+        write_table(df, self.output_path(file))
+        log(f"✅ 완료: {file}")
+        return {"rows": len(df), "rows_in": len(df)}
+
+    # 이전 결과와 비교해서 최근접 거리가 바뀔 수 있는 업장만 다시 계산
+    def update_file(self, file):
+        output_path = self.output_path(file)
+        if file not in self.incremental_files or not os.path.exists(output_path):
+            return self.process_file(file)
+
+        old_df = read_table(output_path, encoding="utf-8-sig")
+        if DISTANCE_BOUND_COLUMN not in old_df.columns:
+            return self.process_file(file)
+        # 이전 결과도 읽으므로 읽은 바이트에 포함
+        bytes_in = file_bytes(os.path.join(self.folder_path, file), output_path)
+
+        log(f"🔄 증분 갱신 add average distance -> {file}")
+        df = self.read_input(file)
+        if df is None:
+            return {"status": "skipped"}
+        df = self.prepare_rows(df)
+
+        old_df = old_df.reset_index(drop=True)
+        old_df["start_date"] = pd.to_datetime(old_df["start_date"])
+        old_df["end_date"] = pd.to_datetime(old_df["end_date"])
+        old_keys, new_keys = _record_keys(old_df, df)
+        if old_keys is None:
+            log(f"⚠️ 업장 키가 중복되어 전체 다시 계산: {file}", level=QUIET)
+            return self.process_file(file)
+
+        # 키가 같은 행은 이름/좌표/영업 기간까지 같아야 그대로 둔다.
+        old_position = pd.Index(old_keys).get_indexer(new_keys)
+        kept = old_position >= 0
+        kept[kept] = _same_records(
+            old_df.iloc[old_position[kept]], df.iloc[np.flatnonzero(kept)]
+        )
+        kept_old = np.zeros(len(old_df), dtype=bool)
+        kept_old[old_position[kept]] = True
+
+        # 추가/수정된 업장(새 값)과 삭제/수정된 업장(이전 값) 주변만 영향을 받는다.
+        coords, start_dates, end_dates, name_codes = self.engine_inputs(df)
+        old_coords, old_start_dates, old_end_dates, _ = self.engine_inputs(old_df)
+        old_bounds = old_df[DISTANCE_BOUND_COLUMN].to_numpy(dtype=float)
+
+        kept_rows = np.flatnonzero(kept)
+        affected = changed_neighbourhood(
+            coords[kept_rows],
+            start_dates[kept_rows],
+            end_dates[kept_rows],
+            old_bounds[old_position[kept_rows]],
+            np.concatenate([coords[~kept], old_coords[~kept_old]]),
+            np.concatenate([start_dates[~kept], old_start_dates[~kept_old]]),
+            np.concatenate([end_dates[~kept], old_end_dates[~kept_old]]),
+        )
+        recompute = np.sort(
+            np.concatenate([np.flatnonzero(~kept), kept_rows[affected]])
+        )
 
-            # 평균 최근접 거리 계산
-            df, distances = self.calculate_average_distance(df)
-            df["동일업종 최근접거리의 평균"] = distances
-            # 저장
-            output_path = os.path.join(self.output_folder_path, file)
-            df.to_csv(output_path, index=False)
-            print(f"✅ 완료: {file}")
+        distances = np.zeros(len(df))
+        bounds = np.zeros(len(df))
+        reused = kept_rows[~affected]
+        distances[reused] = old_df["동일업종 최근접거리의 평균"].to_numpy(dtype=float)[
+            old_position[reused]
+        ]
+        bounds[reused] = old_bounds[old_position[reused]]
+        if len(recompute) > 0:
+            distances[recompute], bounds[recompute] = DISTANCE_MODES[self.mode](
+                coords,
+                start_dates,
+                end_dates,
+                name_codes,
+                rows=recompute,
+                return_bound=True,
+            )
 
-        except Exception as e:
-            print(f"❌ 오류 발생: {file}")
-            traceback.print_exc()
+        df["동일업종 최근접거리의 평균"] = distances
+        df[DISTANCE_BOUND_COLUMN] = bounds
+        write_table(df, output_path)
+        log(f"✅ 완료: {file} ({len(recompute)}/{len(df)}개 업장 다시 계산)")
+        return {
+            "rows": len(df),
+            "rows_in": len(df),
+            "bytes_in": bytes_in,
+            "recomputed": len(recompute),
+        }
+
+    def stage_params(self):
+        return {
+            "end_date": self.end_date,
+            "mode": self.mode,
+            "period_column": self.period_column,
+            "output_format": self.output_format,
+        }
+
+    def _run_all_files(self, func, max_workers, force, keep_outputs=False):
+        csv_files = list_tables(self.folder_path)
+
+        # 프로세스 풀에서 파일별로 처리 (오류가 있으면 모든 파일 처리 후 예외 발생)
+        return run_cached_file_tasks(
+            func,
+            self.folder_path,
+            csv_files,
+            self.output_folder_path,
+            partial(_output_names, output_format=self.output_format),
+            params=self.stage_params(),
+            force=force,
+            max_workers=max_workers,
+            stage_name="add average distance",
+            keep_outputs=keep_outputs,
+        )
 
     # 모든 파일 처리 함수
-    def process_all_files(self):
-        print("=============================")
-        print("=== add average distance ====")
-        print("=============================")
-
-        csv_files = [f for f in os.listdir(self.folder_path) if f.endswith(".csv")]
+    def process_all_files(self, max_workers=None, force=False):
+        # force: True 이면 단계 캐시와 관계없이 모든 파일을 다시 계산
+        banner("add average distance")
+
+        results = self._run_all_files(self.process_file, max_workers, force)
+
+        log("🎉 모든 파일 처리 완료!", level=STAGE)
+        return results
+
+    # 새 스냅샷 반영: 입력이 바뀐 파일만 업장 단위로 증분 갱신
+    def update_all_files(self, max_workers=None, adjacent=True):
+        # 이전 결과가 같은 파라미터로 계산된 파일만 증분 갱신하고, 나머지는 전체 계산한다.
+        # adjacent 이면 04adj_industry_added 도 바뀐 파일만 다시 계산한다.
+        banner("update average distance")
+
+        key = params_key(self.stage_params())
+        self.incremental_files = {
+            file
+            for file, entry in read_stage_manifest(
+                self.output_folder_path, "add average distance"
+            ).items()
+            if entry["params"] == key
+        }
+        results = self._run_all_files(
+            self.update_file, max_workers, force=False, keep_outputs=True
+        )
 
-        with ThreadPoolExecutor() as executor:
-            executor.map(self.process_file, csv_files)
+        if adjacent:
+            add_adj_industry_count_column(
+                self.output_folder_path,
+                self.output_root,
+                max_workers=max_workers,
+                output_format=self.output_format,
+            )
 
-        print("🎉 모든 파일 처리 완료!")
+        log("🎉 모든 파일 갱신 완료!", level=STAGE)
+        return results
 
 
 if __name__ == "__main__":
@@ -326,6 +1557,33 @@ if __name__ == "__main__":
     OUTPUT_FOLDER = (
         "C:/Users/bsh96/Documents/GitHub/spring_UDIK/DATA/LOCALDATA_FILTERED_CSV"
     )
+    # 단계 사이 저장 형식 ("csv", "parquet", "feather")
+    OUTPUT_FORMAT = "csv"
+
+    # 콘솔 출력 수준 (QUIET: 경고/오류만, STAGE: 단계 요약, FILE: 파일별 진행)
+    # 단계별/파일별 처리 시간, 행 수, 바이트, 최대 메모리는 run_report.json 에 저장된다.
+    configure(verbosity=STAGE, report_path=os.path.join(OUTPUT_FOLDER, RUN_REPORT_NAME))
+
+    # # 원본 인코딩을 한 번만 판단해서 UTF-8 캐시로 변환 (이후 단계는 캐시를 입력으로 사용)
+    # INPUT_FOLDER = ingest_folder(
+    #     INPUT_FOLDER,
+    #     "C:/Users/bsh96/Documents/GitHub/spring_UDIK/DATA/LOCALDATA_UTF8_CSV",
+    # )
+
+    # # 주소/개업연도/파일 크기 필터와 생존 column 추가를 한 번에 처리
+    # output_csv_folder = run_fused_filter(
+    #     INPUT_FOLDER,
+    #     OUTPUT_FOLDER,
+    #     address_name="서울특별시 강남구",
+    #     open_year=2016,
+    #     max_rows=50,
+    # )
+
+    # # 서울특별시 25개 구를 한 번에 지역별로 나누고 지역별 인허가 수 저장
+    # # (00regions/서울특별시 강남구/ ... 를 이후 단계의 입력으로 사용)
+    # region_folder = partition_by_region(
+    #     INPUT_FOLDER, OUTPUT_FOLDER, level="시군구", sido="서울특별시"
+    # )
 
     # # 서울특별시 강남구 데이터만 필터링
     # output_csv_folder = filter_by_address(
@@ -350,12 +1608,24 @@ if __name__ == "__main__":
     output_csv_folder = add_survival_column(
         output_csv_folder,
         OUTPUT_FOLDER,
+        output_format=OUTPUT_FORMAT,
     )
 
-    # 최근접 거리 계산
+    # 최근접 거리 계산 (mode="event" 이면 이벤트 기반 정확한 기간 가중 평균)
+    # 큰 업종 파일은 row_workers 로 한 파일의 기간을 나눠 여러 프로세스에서 계산한다.
     calculator = DistanceCalculator(
-        output_csv_folder, OUTPUT_FOLDER, end_date=datetime(2019, 12, 31)
+        output_csv_folder,
+        OUTPUT_FOLDER,
+        end_date=datetime(2019, 12, 31),
+        mode="monthly",
+        row_workers=None,
+        output_format=OUTPUT_FORMAT,
     )
-    calculator.process_all_files()
+    # 입력 파일 내용과 파라미터가 이전 실행과 같으면 건너뛴다. (force=True 이면 모두 다시 계산)
+    calculator.process_all_files(force=False)
+
+    # # 새 LOCALDATA 스냅샷 반영: 바뀐 업장 주변만 다시 계산해서
+    # # 03DISTANCE_CALCULATED 와 04adj_industry_added 를 갱신
+    # calculator.update_all_files()
 
-    print("All filtering and processing tasks completed successfully.")
+    log("All filtering and processing tasks completed successfully.", level=QUIET)
@@ -2,228 +2,262 @@ import os
 import pandas as pd
 import numpy as np
 import traceback
+from functools import partial
+
+from dataset_loader import industry_name, load_table
+from instrumentation import (
+    QUIET,
+    RUN_REPORT_NAME,
+    STAGE,
+    banner,
+    configure,
+    file_bytes,
+    log,
+    main_stage,
+)
+from parallel import run_file_tasks
+from table_io import table_format, table_row_count
+
+# 보고서 이름: 저장 파일명
+REPORTS = {
+    "total": "업종별_인허가수_분석.csv",
+    "distance": "업종별_폐업율_분석.csv",
+    "adj": "업종별_폐업율_분석_인접업종수.csv",
+}
+
+# 보고서별 통계 컬럼과 저장 컬럼 이름 (평균, 표준편차, 최대값, 최소값)
+REPORT_STATS = {
+    "distance": (
+        "동일업종 최근접거리의 평균",
+        [
+            "동일업종 최근접거리의 평균",
+            "동일업종 최근접거리의 평균_표준편차",
+            "동일업종 최근접거리의 평균_최대값",
+            "동일업종 최근접거리의 평균_최소값",
+        ],
+    ),
+    "adj": (
+        "adj_industry_count",
+        [
+            "인접 업장수의 평균",
+            "인접 업장수의 표준편차",
+            "인접 업장수의 최대값",
+            "인접 업장수의 최소값",
+        ],
+    ),
+}
+
+STAT_NAMES = ["mean", "std", "max", "min"]
+GROUP_STAT_NAMES = ["count", "mean", "std", "min", "max"]
+
+
+def _aggregate_file(file_name, input_csv_folder, stat_columns, group_stats):
+    # type: (str, str, list, list) -> dict
+    # 파일 하나에서 필요한 컬럼만 한 번 읽어서 모든 보고서의 값을 계산
+    log("IMPORT FILE: ", file_name)
+    file_path = os.path.join(input_csv_folder, file_name)
+    industry = industry_name(file_name)
+
+    columns = ["생존"] + list(stat_columns)
+    for by_column, value_column in group_stats:
+        columns += [by_column, value_column]
+    if not stat_columns and not group_stats:
+        # 행 수만 필요하므로 전체를 읽지 않는다.
+        rows = table_row_count(file_path)
+        return {
+            "industry": industry,
+            "rows": rows,
+            "rows_in": rows,
+            "bytes_in": file_bytes(file_path),
+        }
+
+    # 다른 분석 스크립트와 같은 디스크 캐시를 사용 (필요한 컬럼만 파싱)
+    df = load_table(file_path, columns=columns)
+    total_count = len(df) if len(df.columns) > 0 else table_row_count(file_path)
+
+    stats = {}
+    for column in stat_columns:
+        if column in df.columns:
+            # 최대값/최소값은 원래 dtype 그대로 유지 (정수 컬럼은 정수)
+            stats[column] = {name: df[column].agg(name) for name in STAT_NAMES}
+
+    groups = {}
+    for by_column, value_column in group_stats:
+        if {by_column, value_column}.issubset(df.columns):
+            groups[(by_column, value_column)] = (
+                df.groupby(by_column)[value_column].agg(GROUP_STAT_NAMES).reset_index()
+            )
 
+    return {
+        "industry": industry,
+        "rows": total_count,
+        "rows_in": total_count,
+        "bytes_in": file_bytes(file_path),
+        "survival": df["생존"].sum() if "생존" in df.columns else 0,
+        "stats": stats,
+        "groups": groups,
+    }
+
+
+def _write_total_chart(results, ouput_folder):
+    # type: (list, str) -> str
+    # Calculate total permits
+    total_permits = sum(result["rows"] for result in results)
+
+    # Prepare data for output
+    output_data = []
+    for result in results:
+        percentage = (result["rows"] / total_permits) * 100
+        log(result["industry"], result["rows"], percentage)
+        output_data.append(
+            {
+                "업종": result["industry"],
+                "인허가수": result["rows"],
+                "퍼센트": percentage,
+            }
+        )
 
-def get_total_chart(input_csv_folder, ouput_folder):
-    try:
-        # Create output folder if it doesn't exist
-        if not os.path.exists(ouput_folder):
-            os.makedirs(ouput_folder)
-
-        # Initialize a dictionary to store counts
-        industry_counts = {}
-
-        # Read all CSV files in the input folder
-        for file_name in os.listdir(input_csv_folder):
-            print("IMPORT FILE: ", file_name)
-            if file_name.endswith(".csv"):
-                file_path = os.path.join(input_csv_folder, file_name)
-                df = pd.read_csv(file_path)
-                industry_name = file_name.split("_")[-1]
-                industry_name = industry_name.replace(".csv", "")
-                industry_counts[industry_name] = len(df)
-
-        # Calculate total permits
-        total_permits = sum(industry_counts.values())
-
-        # Prepare data for output
-        output_data = []
-        for industry, count in industry_counts.items():
-            percentage = (count / total_permits) * 100
-            print(industry, count, percentage)
-            output_data.append(
-                {"업종": industry, "인허가수": count, "퍼센트": percentage}
+    output_csv_path = os.path.join(ouput_folder, REPORTS["total"])
+    pd.DataFrame(output_data).to_csv(output_csv_path, index=False, encoding="utf-8-sig")
+    return output_csv_path
+
+
+def _write_survival_report(results, ouput_folder, report):
+    # type: (list, str, str) -> str
+    # 업종별 폐업률과 통계 컬럼의 평균/표준편차/최대값/최소값 (컬럼이 없으면 0)
+    stat_column, labels = REPORT_STATS[report]
+    output_data = []
+    for result in results:
+        total_count = result["rows"]
+        survival_count = result["survival"]
+        survival_rate = (survival_count / total_count) * 100 if total_count > 0 else 0
+        rate = round(100 - survival_rate, 2)
+        log(result["industry"], total_count, survival_count, rate)
+
+        row = {
+            "업종": result["industry"],
+            "총 개수": total_count,
+            "생존 개수": survival_count,
+            "개업 이후 3년 내 폐업률(%)": rate,
+        }
+        stats = result["stats"].get(stat_column)
+        for label, stat_name in zip(labels, STAT_NAMES):
+            row[label] = round(stats[stat_name], 2) if stats is not None else 0
+        output_data.append(row)
+
+    output_csv_path = os.path.join(ouput_folder, REPORTS[report])
+    pd.DataFrame(output_data).to_csv(output_csv_path, index=False, encoding="utf-8-sig")
+    return output_csv_path
+
+
+def _write_group_report(results, ouput_folder, by_column, value_column):
+    # type: (list, str, str, str) -> str
+    # 업종 x by_column 값별 value_column 통계
+    frames = []
+    for result in results:
+        group = result["groups"].get((by_column, value_column))
+        if group is not None:
+            frames.append(group.assign(업종=result["industry"]))
+    columns = ["업종", by_column] + GROUP_STAT_NAMES
+    output_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    output_df = output_df.reindex(columns=columns)
+
+    output_csv_path = os.path.join(
+        ouput_folder, f"업종별_{value_column}_{by_column}별_통계.csv"
+    )
+    output_df.to_csv(output_csv_path, index=False, encoding="utf-8-sig")
+    return output_csv_path
+
+
+def build_industry_reports(
+    input_csv_folder,
+    ouput_folder,
+    reports=tuple(REPORTS),
+    group_stats=(),
+    max_workers=None,
+):
+    # type: (str, str, tuple, list, int) -> str
+    # 여러 보고서를 한 번에 계산: 파일마다 필요한 컬럼만 한 번 읽고 (파일 단위 병렬),
+    # 모든 요약 CSV 를 함께 저장한다.
+    # - reports: REPORTS 의 보고서 이름 ("total", "distance", "adj")
+    # - group_stats: (by_column, value_column) 목록, 예: [("생존", "adj_industry_count")]
+    #   -> 업종별_{value_column}_{by_column}별_통계.csv
+    banner("industry_reports")
+    # Create output folder if it doesn't exist
+    if not os.path.exists(ouput_folder):
+        os.makedirs(ouput_folder)
+
+    stat_columns = [
+        REPORT_STATS[report][0] for report in reports if report in REPORT_STATS
+    ]
+    group_stats = [tuple(pair) for pair in group_stats]
+
+    file_names = [
+        f for f in os.listdir(input_csv_folder) if table_format(f) is not None
+    ]
+    results = run_file_tasks(
+        partial(
+            _aggregate_file,
+            input_csv_folder=input_csv_folder,
+            stat_columns=stat_columns,
+            group_stats=group_stats,
+        ),
+        file_names,
+        max_workers=max_workers,
+        stage_name="industry_reports",
+    )
+
+    # 보고서 저장은 현재 프로세스에서 하므로 별도 단계로 기록
+    with main_stage("industry_reports_write") as record:
+        output_paths = []
+        if "total" in reports:
+            output_paths.append(_write_total_chart(results, ouput_folder))
+        for report in reports:
+            if report in REPORT_STATS:
+                output_paths.append(
+                    _write_survival_report(results, ouput_folder, report)
+                )
+        for by_column, value_column in group_stats:
+            output_paths.append(
+                _write_group_report(results, ouput_folder, by_column, value_column)
             )
+        record["rows_in"] = len(results)
+        record["bytes_out"] = file_bytes(*output_paths)
+    log(f"{len(output_paths)}개 보고서를 {ouput_folder} 에 저장했습니다.", level=STAGE)
 
-        # Convert to DataFrame and save to CSV
-        output_df = pd.DataFrame(output_data)
-        output_csv_path = os.path.join(ouput_folder, "업종별_인허가수_분석.csv")
-        output_df.to_csv(output_csv_path, index=False, encoding="utf-8-sig")
+    return ouput_folder
 
-        return ouput_folder
+
+def get_total_chart(input_csv_folder, ouput_folder):
+    try:
+        return build_industry_reports(
+            input_csv_folder, ouput_folder, reports=("total",)
+        )
 
     except Exception as e:
-        print("An error occurred:", e)
+        log("An error occurred:", e, level=QUIET)
         traceback.print_exc()
         return None
 
 
 def get_survival_ratio_by_distance(input_csv_folder, ouput_folder):
     try:
-        # Create output folder if it doesn't exist
-        if not os.path.exists(ouput_folder):
-            os.makedirs(ouput_folder)
-
-        # Initialize a dictionary to store survival counts
-        survival_counts = {}
-
-        # Read all CSV files in the input folder
-        for file_name in os.listdir(input_csv_folder):
-            print("IMPORT FILE: ", file_name)
-            if file_name.endswith(".csv"):
-                file_path = os.path.join(input_csv_folder, file_name)
-                df = pd.read_csv(file_path)
-                industry_name = file_name.split("_")[-1]
-                industry_name = industry_name.replace(".csv", "")
-
-                # Calculate survival rate
-                total_count = len(df)
-                survival_count = df["생존"].sum() if "생존" in df.columns else 0
-                survival_rate = (
-                    (survival_count / total_count) * 100 if total_count > 0 else 0
-                )
-                # 거리평균
-                distance_average = (
-                    df["동일업종 최근접거리의 평균"].mean()
-                    if "동일업종 최근접거리의 평균" in df.columns
-                    else 0
-                )
-                # 거리표준편차
-                distance_std = (
-                    df["동일업종 최근접거리의 평균"].std()
-                    if "동일업종 최근접거리의 평균" in df.columns
-                    else 0
-                )
-                # 거리최대값
-                distance_max = (
-                    df["동일업종 최근접거리의 평균"].max()
-                    if "동일업종 최근접거리의 평균" in df.columns
-                    else 0
-                )
-                # 거리최소값
-                distance_min = (
-                    df["동일업종 최근접거리의 평균"].min()
-                    if "동일업종 최근접거리의 평균" in df.columns
-                    else 0
-                )
-
-                survival_counts[industry_name] = {
-                    "total": total_count,
-                    "survival": survival_count,
-                    "rate": round(100 - survival_rate, 2),
-                    "distance_average": round(distance_average, 2),
-                    "distance_std": round(distance_std, 2),
-                    "distance_max": round(distance_max, 2),
-                    "distance_min": round(distance_min, 2),
-                }
-
-        # Prepare data for output
-        output_data = []
-        for industry, data in survival_counts.items():
-            print(industry, data["total"], data["survival"], data["rate"])
-            output_data.append(
-                {
-                    "업종": industry,
-                    "총 개수": data["total"],
-                    "생존 개수": data["survival"],
-                    "개업 이후 3년 내 폐업률(%)": data["rate"],
-                    "동일업종 최근접거리의 평균": data["distance_average"],
-                    "동일업종 최근접거리의 평균_표준편차": data["distance_std"],
-                    "동일업종 최근접거리의 평균_최대값": data["distance_max"],
-                    "동일업종 최근접거리의 평균_최소값": data["distance_min"],
-                }
-            )
-
-        # Convert to DataFrame and save to CSV
-        output_df = pd.DataFrame(output_data)
-        output_csv_path = os.path.join(ouput_folder, "업종별_폐업율_분석.csv")
-        output_df.to_csv(output_csv_path, index=False, encoding="utf-8-sig")
-
-        return ouput_folder
+        return build_industry_reports(
+            input_csv_folder, ouput_folder, reports=("distance",)
+        )
 
     except Exception as e:
-        print("An error occurred:", e)
+        log("An error occurred:", e, level=QUIET)
         traceback.print_exc()
         return None
 
 
 def get_survival_ratio_by_adj_count(input_csv_folder, ouput_folder):
     try:
-        # Create output folder if it doesn't exist
-        if not os.path.exists(ouput_folder):
-            os.makedirs(ouput_folder)
-
-        # Initialize a dictionary to store survival counts
-        survival_counts = {}
-
-        # Read all CSV files in the input folder
-        for file_name in os.listdir(input_csv_folder):
-            print("IMPORT FILE: ", file_name)
-            if file_name.endswith(".csv"):
-                file_path = os.path.join(input_csv_folder, file_name)
-                df = pd.read_csv(file_path)
-                industry_name = file_name.split("_")[-1]
-                industry_name = industry_name.replace(".csv", "")
-
-                # Calculate survival rate
-                total_count = len(df)
-                survival_count = df["생존"].sum() if "생존" in df.columns else 0
-                survival_rate = (
-                    (survival_count / total_count) * 100 if total_count > 0 else 0
-                )
-                # 인접 동일 업장 수 평균
-                adj_count_average = (
-                    df["adj_industry_count"].mean()
-                    if "adj_industry_count" in df.columns
-                    else 0
-                )
-                # 인접 동일 업장 수 표준편차
-                adj_count_std = (
-                    df["adj_industry_count"].std()
-                    if "adj_industry_count" in df.columns
-                    else 0
-                )
-                # 인접 동일 업장 수 최대값
-                adj_count_max = (
-                    df["adj_industry_count"].max()
-                    if "adj_industry_count" in df.columns
-                    else 0
-                )
-                # 인접 동일 업장 수 최소값
-                adj_count_min = (
-                    df["adj_industry_count"].min()
-                    if "adj_industry_count" in df.columns
-                    else 0
-                )
-
-                survival_counts[industry_name] = {
-                    "total": total_count,
-                    "survival": survival_count,
-                    "rate": round(100 - survival_rate, 2),
-                    "adj_count_average": round(adj_count_average, 2),
-                    "adj_count_std": round(adj_count_std, 2),
-                    "adj_count_max": round(adj_count_max, 2),
-                    "adj_count_min": round(adj_count_min, 2),
-                }
-
-        # Prepare data for output
-        output_data = []
-        for industry, data in survival_counts.items():
-            print(industry, data["total"], data["survival"], data["rate"])
-            output_data.append(
-                {
-                    "업종": industry,
-                    "총 개수": data["total"],
-                    "생존 개수": data["survival"],
-                    "개업 이후 3년 내 폐업률(%)": data["rate"],
-                    "인접 업장수의 평균": data["adj_count_average"],
-                    "인접 업장수의 표준편차": data["adj_count_std"],
-                    "인접 업장수의 최대값": data["adj_count_max"],
-                    "인접 업장수의 최소값": data["adj_count_min"],
-                }
-            )
-
-        # Convert to DataFrame and save to CSV
-        output_df = pd.DataFrame(output_data)
-        output_csv_path = os.path.join(
-            ouput_folder, "업종별_폐업율_분석_인접업종수.csv"
-        )
-        output_df.to_csv(output_csv_path, index=False, encoding="utf-8-sig")
-
-        return ouput_folder
+        return build_industry_reports(input_csv_folder, ouput_folder, reports=("adj",))
 
     except Exception as e:
-        print("An error occurred:", e)
+        log("An error occurred:", e, level=QUIET)
         traceback.print_exc()
         return None
 
@@ -247,9 +281,23 @@ if __name__ == "__main__":
     #     OUTPUT_FOLDER,
     # )
 
+    # 콘솔 출력 수준과 실행 보고서 (단계별 처리 시간, 행 수, 바이트, 최대 메모리)
+    configure(verbosity=STAGE, report_path=os.path.join(OUTPUT_FOLDER, RUN_REPORT_NAME))
+
     input_csv_folder = "C:/Users/bsh96/Documents/GitHub/spring_UDIK/DATA/LOCALDATA_FILTERED_CSV/04adj_industry_added"
-    # 업종별 인허가수 분석
-    output_csv_folder = get_survival_ratio_by_adj_count(
+    # # 업종별 인허가수 분석
+    # output_csv_folder = get_survival_ratio_by_adj_count(
+    #     input_csv_folder,
+    #     OUTPUT_FOLDER,
+    # )
+
+    # 거리/인접 업장수 폐업률 분석과 생존 여부별 통계를 파일당 한 번만 읽어서 저장
+    output_csv_folder = build_industry_reports(
         input_csv_folder,
         OUTPUT_FOLDER,
+        reports=("distance", "adj"),
+        group_stats=[
+            ("생존", "동일업종 최근접거리의 평균"),
+            ("생존", "adj_industry_count"),
+        ],
     )
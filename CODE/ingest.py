@@ -0,0 +1,180 @@
+import codecs
+import json
+import os
+import shutil
+from functools import partial
+
+from instrumentation import STAGE, banner, file_bytes, log, main_stage
+from parallel import run_file_tasks
+
+MANIFEST_NAME = "ingest_manifest.json"
+
+# 캐시 파일은 모두 UTF-8 로 저장한다.
+CACHE_ENCODING = "utf-8"
+
+# 인코딩 판단에 사용하는 표본 크기와 위치 수 (파일 앞 + 중간 지점들)
+SAMPLE_SIZE = 1 << 20
+SAMPLE_POINTS = 4
+
+
+def _decodes(data, encoding, skip_partial=False):
+    # type: (bytes, str, bool) -> bool
+    # 표본 끝에서 잘린 문자는 오류로 보지 않는다. (final=False)
+    if skip_partial:
+        # 중간 표본은 UTF-8 문자 중간에서 시작할 수 있으므로 이어지는 바이트를 건너뛴다.
+        start = 0
+        while start < min(3, len(data)) and 0x80 <= data[start] <= 0xBF:
+            start += 1
+        data = data[start:]
+    try:
+        codecs.getincrementaldecoder(encoding)().decode(data, final=False)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+def sniff_encoding(file_path, sample_size=SAMPLE_SIZE, sample_points=SAMPLE_POINTS):
+    # type: (str, int, int) -> str
+    # 파일 앞부분과 중간 몇 군데의 바이트 표본만 읽어서 인코딩을 판단한다.
+    file_size = os.path.getsize(file_path)
+    with open(file_path, "rb") as f:
+        head = f.read(sample_size)
+        if head.startswith(codecs.BOM_UTF8):
+            return "utf-8-sig"
+
+        samples = []
+        for point in range(1, sample_points):
+            offset = file_size * point // sample_points
+            if offset <= len(head):
+                continue
+            f.seek(offset)
+            samples.append(f.read(sample_size))
+
+    if _decodes(head, "utf-8") and all(
+        _decodes(sample, "utf-8", skip_partial=True) for sample in samples
+    ):
+        return "utf-8"
+    return "cp949"
+
+
+def read_manifest(folder):
+    # type: (str) -> dict
+    manifest_path = os.path.join(folder, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_manifest(folder, manifest):
+    # type: (str, dict) -> None
+    manifest_path = os.path.join(folder, MANIFEST_NAME)
+    with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(manifest_path + ".tmp", manifest_path)
+
+
+def resolve_encoding(file_path):
+    # type: (str) -> str
+    # 같은 폴더의 manifest 에 기록된 인코딩을 우선 사용하고, 없으면 표본으로 판단한다.
+    folder, file_name = os.path.split(file_path)
+    entry = read_manifest(folder).get(file_name)
+    if entry is not None:
+        return entry["encoding"]
+    return sniff_encoding(file_path)
+
+
+def _transcode(source_path, cache_path, encoding):
+    # type: (str, str, str) -> None
+    # 파싱 없이 텍스트 스트림으로 한 번만 변환 (임시 파일에 쓴 뒤 교체)
+    temp_path = cache_path + ".tmp"
+    with open(source_path, encoding=encoding, newline="") as source:
+        with open(temp_path, "w", encoding=CACHE_ENCODING, newline="") as cache:
+            shutil.copyfileobj(source, cache, 1 << 20)
+    os.replace(temp_path, cache_path)
+
+
+def _ingest_file(file_name, input_csv_folder, cache_folder):
+    # type: (str, str, str) -> dict
+    log("ingest -> file_name: ", file_name)
+    source_path = os.path.join(input_csv_folder, file_name)
+    cache_path = os.path.join(cache_folder, file_name)
+
+    encoding = sniff_encoding(source_path)
+    try:
+        _transcode(source_path, cache_path, encoding)
+    except UnicodeDecodeError:
+        # 표본에 없던 구간에서 UTF-8 이 깨진 경우에만 cp949 로 다시 변환
+        if encoding == "cp949":
+            raise
+        encoding = "cp949"
+        _transcode(source_path, cache_path, encoding)
+
+    stat = os.stat(source_path)
+    return {
+        "bytes_in": stat.st_size,
+        "bytes_out": file_bytes(cache_path),
+        "source_encoding": encoding,
+        "source_size": stat.st_size,
+        "source_mtime": stat.st_mtime,
+    }
+
+
+def ingest_folder(input_csv_folder, cache_folder, max_workers=None):
+    # type: (str, str, int) -> str
+    # 원본 CSV 의 인코딩을 한 번 판단해서 manifest 에 기록하고, UTF-8 캐시로 변환한다.
+    # 원본의 크기/수정시각이 그대로인 파일은 다시 변환하지 않는다.
+    # 이후 단계는 cache_folder 를 입력으로 사용하면 인코딩을 다시 추측하지 않는다.
+    banner("ingest")
+
+    os.makedirs(cache_folder, exist_ok=True)
+    manifest = read_manifest(cache_folder)
+
+    pending = []
+    for file_name in os.listdir(input_csv_folder):
+        if not file_name.endswith(".csv"):
+            continue
+        stat = os.stat(os.path.join(input_csv_folder, file_name))
+        entry = manifest.get(file_name)
+        if (
+            entry is not None
+            and entry["source_size"] == stat.st_size
+            and entry["source_mtime"] == stat.st_mtime
+            and os.path.exists(os.path.join(cache_folder, file_name))
+        ):
+            continue
+        pending.append(file_name)
+
+    results = run_file_tasks(
+        partial(
+            _ingest_file, input_csv_folder=input_csv_folder, cache_folder=cache_folder
+        ),
+        pending,
+        max_workers=max_workers,
+        stage_name="ingest",
+        raise_on_error=False,
+    )
+
+    with main_stage("ingest_manifest") as record:
+        for result in results:
+            if result["status"] != "ok":
+                continue
+            manifest[result["file"]] = {
+                "source": os.path.join(input_csv_folder, result["file"]),
+                "source_encoding": result["source_encoding"],
+                "source_size": result["source_size"],
+                "source_mtime": result["source_mtime"],
+                "encoding": CACHE_ENCODING,
+            }
+        write_manifest(cache_folder, manifest)
+        record["rows"] = len(manifest)
+        record["bytes_out"] = file_bytes(os.path.join(cache_folder, MANIFEST_NAME))
+
+    failed = [result["file"] for result in results if result["status"] == "error"]
+    if failed:
+        raise RuntimeError(f"ingest: {len(failed)}개 파일 변환 실패 {failed}")
+
+    log(
+        f"{len(pending)}개 파일을 {cache_folder} 에 UTF-8 로 변환했습니다.", level=STAGE
+    )
+    return cache_folder
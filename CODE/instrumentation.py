@@ -0,0 +1,238 @@
+import ctypes
+import json
+import os
+import platform
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# 단계별 계측과 실행 보고서 (JSON)
+# - 파일별: 처리 시간, 읽은/쓴 행 수, 읽은/쓴 바이트, 최대 메모리
+# - 단계별: 위 값의 합계 (최대 메모리는 파일별 최대값), 전체 처리 시간
+# - 콘솔 출력은 VERBOSITY 로 조절 (작업 프로세스에도 환경 변수로 전달된다)
+#
+# 최대 메모리는 tracemalloc 대신 OS 가 기록하는 프로세스 최대 RSS 를 쓴다.
+# (tracemalloc 은 pandas 처리 시간을 몇 배로 늘린다)
+# Linux 는 파일마다 최대값을 되돌리므로 파일 하나의 최대값이고,
+# 되돌릴 수 없는 OS (Windows, macOS) 는 그 작업 프로세스가 앞서 처리한 파일을 포함한다.
+
+QUIET = 0  # 경고와 오류만
+STAGE = 1  # 단계 시작/요약
+FILE = 2  # 파일별 진행 (기본값)
+VERBOSITY_ENV = "LOCALDATA_VERBOSITY"
+VERBOSITY = int(os.environ.get(VERBOSITY_ENV, FILE))
+
+RUN_REPORT_NAME = "run_report.json"
+REPORT_VERSION = 1
+
+RUN_REPORT = {
+    "version": REPORT_VERSION,
+    "started_at": datetime.now().isoformat(timespec="seconds"),
+    "python": platform.python_version(),
+    "platform": platform.platform(),
+    "cpu_count": os.cpu_count(),
+    "stages": [],
+}
+_REPORT_PATH = None
+
+
+def configure(verbosity=None, report_path=None):
+    # type: (int, str) -> None
+    # verbosity: QUIET / STAGE / FILE
+    # report_path: 주어지면 단계가 끝날 때마다 실행 보고서를 이 경로에 다시 저장
+    global VERBOSITY, _REPORT_PATH
+    if verbosity is not None:
+        VERBOSITY = int(verbosity)
+        # 이후에 만드는 작업 프로세스도 같은 값을 쓰도록 환경 변수로 전달
+        os.environ[VERBOSITY_ENV] = str(VERBOSITY)
+    if report_path is not None:
+        _REPORT_PATH = report_path
+
+
+def log(*args, level=FILE):
+    # type: (...) -> None
+    if VERBOSITY >= level:
+        print(*args)
+
+
+def banner(title):
+    # type: (str) -> None
+    # 단계 시작 표시 (STAGE 이상에서 출력)
+    log("=============================", level=STAGE)
+    log(f" {title} ".center(29, "="), level=STAGE)
+    log("=============================", level=STAGE)
+
+
+class _MemoryCounters(ctypes.Structure):
+    # Windows PROCESS_MEMORY_COUNTERS
+    _fields_ = [
+        ("cb", ctypes.c_ulong),
+        ("PageFaultCount", ctypes.c_ulong),
+        ("PeakWorkingSetSize", ctypes.c_size_t),
+        ("WorkingSetSize", ctypes.c_size_t),
+        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+        ("PagefileUsage", ctypes.c_size_t),
+        ("PeakPagefileUsage", ctypes.c_size_t),
+    ]
+
+
+def _windows_peak_bytes():
+    # type: () -> int
+    kernel32 = ctypes.WinDLL("kernel32")
+    kernel32.GetCurrentProcess.restype = ctypes.c_void_p
+    kernel32.K32GetProcessMemoryInfo.argtypes = [
+        ctypes.c_void_p,
+        ctypes.POINTER(_MemoryCounters),
+        ctypes.c_ulong,
+    ]
+    counters = _MemoryCounters()
+    counters.cb = ctypes.sizeof(counters)
+    if not kernel32.K32GetProcessMemoryInfo(
+        kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb
+    ):
+        return None
+    return counters.PeakWorkingSetSize
+
+
+def reset_peak_memory():
+    # type: () -> bool
+    # 프로세스 최대 RSS 를 현재 값으로 되돌린다. (Linux 만 가능, 되돌렸으면 True)
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_memory_mb():
+    # type: () -> float
+    # 현재 프로세스의 최대 RSS (MB), 알 수 없으면 None
+    try:
+        if sys.platform == "win32":
+            peak = _windows_peak_bytes()
+            return None if peak is None else round(peak / 2**20, 1)
+        try:
+            with open("/proc/self/status") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        return round(int(line.split()[1]) / 1024, 1)
+        except OSError:
+            pass
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS 는 바이트, 나머지는 KB
+        return round(peak / (2**20 if sys.platform == "darwin" else 1024), 1)
+    except Exception:
+        return None
+
+
+def file_bytes(*paths):
+    # type: (...) -> int
+    # 존재하는 파일의 크기 합계
+    return sum(os.path.getsize(path) for path in paths if os.path.exists(path))
+
+
+@contextmanager
+def measure(record):
+    # type: (dict) -> None
+    # with 블록의 처리 시간(seconds)과 최대 메모리(peak_memory_mb)를 record 에 기록
+    reset_peak_memory()
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["seconds"] = round(time.perf_counter() - start, 3)
+        record["peak_memory_mb"] = peak_memory_mb()
+
+
+def _total(results, key):
+    # type: (list, str) -> int
+    values = [result.get(key) for result in results]
+    values = [value for value in values if value is not None]
+    return sum(values) if values else None
+
+
+def record_stage(stage_name, results, seconds, started_at=None):
+    # type: (str, list, float, str) -> dict
+    # 파일별 결과(run_file_tasks 형식)를 단계 기록으로 모아서 실행 보고서에 추가
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    peaks = [result.get("peak_memory_mb") for result in results]
+    peaks = [peak for peak in peaks if peak is not None]
+
+    stage = {
+        "stage": stage_name,
+        "started_at": started_at,
+        "seconds": round(seconds, 3),
+        "files": counts,
+        "rows_in": _total(results, "rows_in"),
+        "rows_out": _total(results, "rows"),
+        "bytes_in": _total(results, "bytes_in"),
+        "bytes_out": _total(results, "bytes_out"),
+        "peak_memory_mb": max(peaks) if peaks else None,
+        "file_seconds": round(sum(result["seconds"] for result in results), 3),
+        "per_file": [
+            {
+                "file": result["file"],
+                "status": result["status"],
+                "seconds": result["seconds"],
+                "rows_in": result.get("rows_in"),
+                "rows_out": result.get("rows"),
+                "bytes_in": result.get("bytes_in"),
+                "bytes_out": result.get("bytes_out"),
+                "peak_memory_mb": result.get("peak_memory_mb"),
+            }
+            for result in results
+        ],
+    }
+    RUN_REPORT["stages"].append(stage)
+    if _REPORT_PATH is not None:
+        write_run_report(_REPORT_PATH)
+    return stage
+
+
+@contextmanager
+def main_stage(stage_name):
+    # type: (str) -> None
+    # 현재 프로세스에서 실행하는 단계 (보고서 저장 등)를 하나의 파일처럼 기록한다.
+    # with 블록 안에서 yield 된 dict 에 rows_in / rows / bytes_in / bytes_out 을 채운다.
+    started_at = datetime.now().isoformat(timespec="seconds")
+    record = {"file": stage_name, "status": "ok", "rows": None}
+    try:
+        with measure(record):
+            yield record
+    except Exception:
+        record["status"] = "error"
+        raise
+    finally:
+        record_stage(stage_name, [record], record["seconds"], started_at)
+
+
+def write_run_report(path):
+    # type: (str) -> str
+    # 실행 보고서를 JSON 으로 저장 (단계는 실행 순서대로)
+    report = dict(RUN_REPORT)
+    report["written_at"] = datetime.now().isoformat(timespec="seconds")
+    report["seconds"] = round(
+        sum(stage["seconds"] for stage in RUN_REPORT["stages"]), 3
+    )
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def reset_run_report():
+    # type: () -> None
+    RUN_REPORT["stages"] = []
+    RUN_REPORT["started_at"] = datetime.now().isoformat(timespec="seconds")
@@ -1,7 +1,21 @@
 import os
+import numpy as np
 import pandas as pd
-import statsmodels.api as sm
-from sklearn.metrics import accuracy_score
+
+from dataset_loader import load_industries
+from logit_batch import fit_logit_batch, stack_designs
+
+
+def significance(p_value):
+    # type: (float) -> str
+    if p_value < 0.001:
+        return "***"
+    if p_value < 0.01:
+        return "**"
+    if p_value < 0.05:
+        return "*"
+    return ""
+
 
 # ▶ 설정: CSV 파일이 들어있는 폴더 경로
 input_folder = "C:/Users/bsh96/Documents/GitHub/spring_UDIK/DATA/LOCALDATA_FILTERED_CSV/04adj_industry_added"
@@ -11,75 +25,55 @@ output_folder = (
 result_csv_name = "logistic_summary.csv"
 result_list = []
 
-for file_name in os.listdir(input_folder):
-    if not file_name.endswith(".csv"):
-        continue
-
-    file_path = os.path.join(input_folder, file_name)
+# 업종별 설계행렬을 모은 뒤 한 번에 적합한다.
+features = ["동일업종 최근접거리의 평균", "adj_industry_count"]
+industry_names = []
+designs = []
+targets = []
 
-    # 업종명
-    industry_name = file_name.replace(".csv", "").split("_")[-1]
-    df = pd.read_csv(file_path, encoding="utf-8-sig")
-
-    # 필수 컬럼 확인
-    required_columns = ["생존", "동일업종 최근접거리의 평균", "adj_industry_count"]
-    if not all(col in df.columns for col in required_columns):
-        continue
+# 필수 컬럼만 읽기 (필수 컬럼이 없는 업종은 제외, 공유 캐시 로더)
+required_columns = ["생존", "동일업종 최근접거리의 평균", "adj_industry_count"]
+datasets = load_industries(input_folder, columns=required_columns, required=True)
 
+for industry_name, df in datasets.items():
     # 결측 제거
     df = df[required_columns].dropna()
 
     if df["생존"].nunique() < 2 or len(df) < 10:
         continue  # 생존 값이 전부 동일하거나 너무 적으면 skip
 
-    # X, y 설정
-    X = df[["동일업종 최근접거리의 평균", "adj_industry_count"]]
-    X = sm.add_constant(X)  # 상수항 추가
-    y = df["생존"].astype(int)
-
-    # 모델 피팅
-    model = sm.Logit(y, X).fit(disp=0)
-
-    # 예측 및 정확도 계산
-    pred_probs = model.predict(X)
-    y_pred = (pred_probs >= 0.5).astype(int)
-    accuracy = accuracy_score(y, y_pred)
-
-    # McFadden R² 계산
-    mcfadden_r2 = 1 - (model.llf / model.llnull)
-
-    # p-value 및 유의성 계산
-    p_values = model.pvalues
-    significance_distance = ""
-    significance_adj_count = ""
-
-    if p_values["동일업종 최근접거리의 평균"] < 0.001:
-        significance_distance = "***"
-    elif p_values["동일업종 최근접거리의 평균"] < 0.01:
-        significance_distance = "**"
-    elif p_values["동일업종 최근접거리의 평균"] < 0.05:
-        significance_distance = "*"
-
-    if p_values["adj_industry_count"] < 0.001:
-        significance_adj_count = "***"
-    elif p_values["adj_industry_count"] < 0.01:
-        significance_adj_count = "**"
-    elif p_values["adj_industry_count"] < 0.05:
-        significance_adj_count = "*"
+    # X, y 설정 (상수항 추가)
+    X = np.column_stack([np.ones(len(df)), df[features].to_numpy(dtype=float)])
+    y = df["생존"].astype(int).to_numpy()
+
+    industry_names.append(industry_name)
+    designs.append(X)
+    targets.append(y)
+
+# 모델 피팅 (모든 업종을 한 번에 Newton 반복)
+fit = fit_logit_batch(*stack_designs(designs, targets)) if designs else None
+
+for i, industry_name in enumerate(industry_names):
+    if not fit["converged"][i]:
+        print(f"⚠️ 수렴하지 않음: {industry_name}")
+
+    # 계수 순서: 상수항, 거리, 인접 업종 수
+    params = fit["params"][i]
+    p_values = fit["pvalues"][i]
 
     # 결과 저장
     result_list.append(
         {
             "업종명": industry_name,
-            "coef(거리)": round(model.params["동일업종 최근접거리의 평균"], 4),
-            "p값(거리)": round(p_values["동일업종 최근접거리의 평균"], 5),
-            "P값 유의성(거리)": significance_distance,
-            "coef(인접 업종 수)": round(model.params["adj_industry_count"], 4),
-            "p값(인접 업종 수)": round(p_values["adj_industry_count"], 5),
-            "P값 유의성(인접 업종 수)": significance_adj_count,
-            "정확도": round(accuracy, 3),
-            "McFadden R²": round(mcfadden_r2, 4),
-            "샘플수": len(df),
+            "coef(거리)": round(params[1], 4),
+            "p값(거리)": round(p_values[1], 5),
+            "P값 유의성(거리)": significance(p_values[1]),
+            "coef(인접 업종 수)": round(params[2], 4),
+            "p값(인접 업종 수)": round(p_values[2], 5),
+            "P값 유의성(인접 업종 수)": significance(p_values[2]),
+            "정확도": round(fit["accuracy"][i], 3),
+            "McFadden R²": round(fit["mcfadden_r2"][i], 4),
+            "샘플수": int(fit["nobs"][i]),
         }
     )
 
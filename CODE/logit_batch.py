@@ -0,0 +1,109 @@
+import numpy as np
+from scipy.special import expit
+from scipy.stats import norm
+
+# statsmodels Logit.fit(method="newton") 기본값과 같은 반복 횟수 / 수렴 기준
+MAXITER = 35
+TOL = 1e-8
+
+
+def stack_designs(designs, targets):
+    # type: (list, list) -> tuple
+    # 업종별 설계행렬(상수항 포함)과 0/1 목표값을 한 배열로 이어 붙이고 모델 번호를 붙인다.
+    groups = np.repeat(np.arange(len(designs)), [len(X) for X in designs])
+    X = np.concatenate([np.asarray(X, dtype=float) for X in designs])
+    y = np.concatenate([np.asarray(y, dtype=float) for y in targets])
+    return X, y, groups
+
+
+def _segment_sums(values, starts):
+    # type: (np.ndarray, np.ndarray) -> np.ndarray
+    # 모델별로 연속된 행의 합 (행은 모델 번호 순서로 정렬되어 있어야 한다)
+    return np.add.reduceat(values, starts, axis=0)
+
+
+def _model_rows(X, products, y, groups, active, nobs):
+    # type: (np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray) -> tuple
+    # active 모델의 행만 골라서 모델 번호를 0 부터 다시 붙인다. (nobs: 남은 모델의 행 수)
+    selected = active[groups]
+    local = np.repeat(np.arange(len(nobs)), nobs)
+    return X[selected], products[selected], y[selected], local
+
+
+def _score_and_hessian(X, products, y, groups, pairs, params):
+    # type: (np.ndarray, np.ndarray, np.ndarray, np.ndarray, tuple, np.ndarray) -> tuple
+    # 모델별 로그우도의 기울기와 (음의) 헤시안 X' W X
+    # products 는 X 의 열 쌍 곱 (대칭이므로 위 삼각만), 반복마다 가중치만 곱해서 합한다.
+    starts = np.searchsorted(groups, np.arange(len(params)))
+    prob = expit(np.einsum("ij,ij->i", X, params[groups]))
+    score = _segment_sums(X * (y - prob)[:, None], starts)
+    upper = _segment_sums(products * (prob * (1 - prob))[:, None], starts)
+    information = np.empty((len(params), X.shape[1], X.shape[1]))
+    information[:, pairs[0], pairs[1]] = upper
+    information[:, pairs[1], pairs[0]] = upper
+    return score, information
+
+
+def fit_logit_batch(X, y, groups, maxiter=MAXITER, tol=TOL):
+    # type: (np.ndarray, np.ndarray, np.ndarray, int, float) -> dict
+    # 여러 개의 작은 로지스틱 회귀를 이어 붙인 배열에서 한 번에 적합한다. (Newton / IRLS)
+    # groups 는 행별 모델 번호 (0 부터, 정렬되어 있고 빈 모델이 없어야 한다. stack_designs 참고)
+    # 모델마다 statsmodels Logit 과 같이 0 에서 시작해서 계수 변화가 tol 이하가 되면 멈춘다.
+    # 반환값은 모델 번호 순서의 배열:
+    # - params / bse / pvalues: (모델 수, 계수 수), p값은 z 검정 (양측)
+    # - llf / llnull: 로그우도, 상수항만 있는 모델의 로그우도 (닫힌 형태)
+    # - mcfadden_r2 / accuracy (예측확률 0.5 이상을 1 로 본 정확도) / nobs / converged
+    n_models = int(groups.max()) + 1 if len(groups) > 0 else 0
+    nobs = np.bincount(groups, minlength=n_models)
+    pairs = np.triu_indices(X.shape[1])
+    products = X[:, pairs[0]] * X[:, pairs[1]]
+    params = np.zeros((n_models, X.shape[1]))
+    active = np.ones(n_models, dtype=bool)
+
+    # 수렴한 모델이 절반 이상이 되면 남은 모델의 행만 골라서 계속 반복한다.
+    batch = np.arange(n_models)
+    rows = (X, products, y, groups)
+    for _ in range(maxiter):
+        if not active.any():
+            break
+        if active.sum() * 2 <= len(batch):
+            batch = np.flatnonzero(active)
+            rows = _model_rows(X, products, y, groups, active, nobs[batch])
+        score, information = _score_and_hessian(
+            *rows, pairs=pairs, params=params[batch]
+        )
+        # 완전 분리 등으로 헤시안이 특이하면 의사역행렬로 계속 진행
+        step = np.einsum("mij,mj->mi", np.linalg.pinv(information), score)
+        step[~active[batch]] = 0
+        params[batch] += step
+        active[batch] &= np.abs(step).max(axis=1) > tol
+
+    _, information = _score_and_hessian(
+        X, products, y, groups, pairs=pairs, params=params
+    )
+    bse = np.sqrt(np.diagonal(np.linalg.pinv(information), axis1=1, axis2=2))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pvalues = 2 * norm.sf(np.abs(params / bse))
+
+    eta = np.einsum("ij,ij->i", X, params[groups])
+    llf = np.bincount(
+        groups, weights=y * eta - np.logaddexp(0, eta), minlength=n_models
+    )
+    mean_y = np.bincount(groups, weights=y, minlength=n_models) / nobs
+    with np.errstate(divide="ignore", invalid="ignore"):
+        llnull = nobs * (mean_y * np.log(mean_y) + (1 - mean_y) * np.log(1 - mean_y))
+        mcfadden_r2 = 1 - llf / llnull
+    correct = ((eta >= 0) == (y == 1)).astype(float)
+    accuracy = np.bincount(groups, weights=correct, minlength=n_models) / nobs
+
+    return {
+        "params": params,
+        "bse": bse,
+        "pvalues": pvalues,
+        "llf": llf,
+        "llnull": llnull,
+        "mcfadden_r2": mcfadden_r2,
+        "accuracy": accuracy,
+        "nobs": nobs,
+        "converged": ~active,
+    }
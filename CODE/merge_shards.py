@@ -0,0 +1,233 @@
+import os
+from collections import defaultdict
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import (
+    QUIET,
+    RUN_REPORT_NAME,
+    STAGE,
+    banner,
+    configure,
+    file_bytes,
+    log,
+    main_stage,
+)
+from parallel import run_file_tasks
+from raw_reader import (
+    DEFAULT_CHUNKSIZE,
+    TableAppender,
+    detect_encoding,
+    iter_raw_chunks,
+    read_header,
+)
+from table_io import TABLE_FORMATS
+
+# 중복 판단 기준 컬럼 (인허가 관리번호)
+KEY_COLUMN = "관리번호"
+MERGED_SUFFIX = "_merged"
+REPORT_NAME = "shard_merge_report.csv"
+
+
+def shard_group(file_name):
+    # type: (str) -> str
+    # fulldata_01_01_02_P_업종명.csv -> fulldata_01_01 (병합 결과 파일은 None)
+    parts = os.path.splitext(file_name)[0].split("_")
+    if len(parts) < 4 or not file_name.endswith(".csv"):
+        return None
+    if file_name.endswith(MERGED_SUFFIX + ".csv"):
+        return None
+    return "_".join(parts[:3])
+
+
+def shard_groups(input_folder):
+    # type: (str) -> dict
+    # {그룹: [shard 파일, ...]} (파일 이름 순서)
+    groups = defaultdict(list)
+    for file_name in sorted(os.listdir(input_folder)):
+        group_key = shard_group(file_name)
+        if group_key is not None:
+            groups[group_key].append(file_name)
+    return dict(groups)
+
+
+class KeyHashSet:
+    # 이미 쓴 레코드 키의 64bit 해시를 정렬된 uint64 배열로 보관 (키 하나당 8바이트)
+    # 서로 다른 키의 해시가 같을 확률은 키 1,000만 개에서도 약 3e-6 이다.
+    def __init__(self):
+        self.hashes = np.empty(0, dtype=np.uint64)
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def add_new(self, hashes):
+        # type: (np.ndarray) -> np.ndarray
+        # 처음 나온 해시 위치만 True (같은 chunk 안의 중복은 첫 번째만 남긴다)
+        # 새 해시는 집합에 추가한다.
+        _, first = np.unique(hashes, return_index=True)
+        is_first = np.zeros(len(hashes), dtype=bool)
+        is_first[first] = True
+        position = np.searchsorted(self.hashes, hashes)
+        seen = np.zeros(len(hashes), dtype=bool)
+        inside = position < len(self.hashes)
+        seen[inside] = self.hashes[position[inside]] == hashes[inside]
+        is_new = is_first & ~seen
+        # 두 정렬된 구간을 이어 붙인 배열은 stable 정렬(timsort)이 거의 선형 시간에 처리한다.
+        self.hashes = np.sort(
+            np.concatenate([self.hashes, np.sort(hashes[is_new])]), kind="stable"
+        )
+        return is_new
+
+
+def key_hashes(keys):
+    # type: (pd.Series) -> np.ndarray
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy(dtype=np.uint64)
+
+
+def merge_shard_group(
+    group_key,
+    groups,
+    input_folder,
+    output_folder,
+    key_column=KEY_COLUMN,
+    output_format="csv",
+    chunksize=DEFAULT_CHUNKSIZE,
+):
+    # type: (str, dict, str, str, str, str, int) -> dict
+    # 그룹의 shard 파일을 chunk 단위로 읽어서 하나의 파일에 바로 이어 쓴다.
+    # key_column 값이 이미 나온 레코드는 건너뛴다. (먼저 나온 shard 의 레코드를 남김)
+    # key_column 이 비어 있는 행은 비교할 수 없으므로 모두 남긴다.
+    log("merge_shards -> group: ", group_key)
+    files = groups[group_key]
+    encodings = {
+        file_name: detect_encoding(os.path.join(input_folder, file_name))
+        for file_name in files
+    }
+
+    # 모든 shard 의 컬럼을 처음 나온 순서대로 합친다. (없는 컬럼은 빈 값)
+    headers = {
+        file_name: read_header(
+            os.path.join(input_folder, file_name), encodings[file_name]
+        )
+        for file_name in files
+    }
+    columns = []
+    for file_name in files:
+        columns += [column for column in headers[file_name] if column not in columns]
+
+    output_path = os.path.join(
+        output_folder, group_key + MERGED_SUFFIX + TABLE_FORMATS[output_format]
+    )
+    appender = TableAppender(output_path, columns)
+    seen = KeyHashSet()
+    shards = []
+    for file_name in files:
+        if key_column not in headers[file_name]:
+            log(
+                f"⚠️ {key_column} 컬럼이 없어 중복을 제거하지 않음: {file_name}",
+                level=QUIET,
+            )
+        stats = {"shard": file_name, "rows": 0, "duplicates": 0, "bad_lines": 0}
+        bad_lines = []
+        for chunk in iter_raw_chunks(
+            os.path.join(input_folder, file_name),
+            chunksize=chunksize,
+            encoding=encodings[file_name],
+            bad_lines=bad_lines,
+        ):
+            stats["rows"] += len(chunk)
+            if key_column in chunk.columns:
+                keep = chunk[key_column].isna().to_numpy()
+                has_key = ~keep
+                keep[has_key] = seen.add_new(key_hashes(chunk.loc[has_key, key_column]))
+                stats["duplicates"] += int(np.count_nonzero(~keep))
+                chunk = chunk[keep]
+            appender.append(chunk.reindex(columns=columns))
+        stats["bad_lines"] = len(bad_lines)
+        shards.append(stats)
+
+    rows = appender.close()
+    return {
+        "rows": rows,
+        "rows_in": sum(stats["rows"] for stats in shards),
+        "bytes_in": file_bytes(
+            *[os.path.join(input_folder, file_name) for file_name in files]
+        ),
+        "bytes_out": file_bytes(output_path),
+        "shards": shards,
+    }
+
+
+def merge_shards(
+    input_folder,
+    output_folder,
+    key_column=KEY_COLUMN,
+    max_workers=None,
+    output_format="csv",
+    chunksize=DEFAULT_CHUNKSIZE,
+):
+    # type: (str, str, str, int, str, int) -> str
+    # fulldata_XX_YY_* shard 파일을 그룹(fulldata_XX_YY)별로 하나의 파일로 병합한다.
+    # - 메모리 사용량은 chunksize 와 키 해시 수(키당 8바이트)에 비례
+    # - 그룹 단위로 병렬 처리
+    # - shard 별 읽은 행 수 / 제거한 중복 수 / 건너뛴 잘못된 행 수를 REPORT_NAME 에 저장
+    banner("merge_shards")
+
+    os.makedirs(output_folder, exist_ok=True)
+    groups = shard_groups(input_folder)
+    results = run_file_tasks(
+        partial(
+            merge_shard_group,
+            groups=groups,
+            input_folder=input_folder,
+            output_folder=output_folder,
+            key_column=key_column,
+            output_format=output_format,
+            chunksize=chunksize,
+        ),
+        list(groups),
+        max_workers=max_workers,
+        stage_name="merge_shards",
+    )
+
+    with main_stage("shard_merge_report") as record:
+        report = pd.DataFrame(
+            [
+                {
+                    "그룹": result["file"],
+                    "shard": stats["shard"],
+                    "읽은 행 수": stats["rows"],
+                    "중복 제거 수": stats["duplicates"],
+                    "잘못된 행 수": stats["bad_lines"],
+                }
+                for result in results
+                for stats in result["shards"]
+            ],
+            columns=["그룹", "shard", "읽은 행 수", "중복 제거 수", "잘못된 행 수"],
+        )
+        report_path = os.path.join(output_folder, REPORT_NAME)
+        report.to_csv(report_path, index=False, encoding="utf-8-sig")
+        record["rows"] = len(report)
+        record["bytes_out"] = file_bytes(report_path)
+
+    # 잘못된 행을 건너뛴 shard 는 iter_raw_chunks 가 경고를 출력한다.
+    log(
+        f"{len(groups)}개 그룹을 {output_folder} 에 병합했습니다. ({report_path})",
+        level=STAGE,
+    )
+    return output_folder
+
+
+if __name__ == "__main__":
+    input_folder = "C:/Users/bsh96/Documents/GitHub/spring_UDIK/DATA/LOCALDATA_ALL_CSV"
+    output_folder = (
+        "C:/Users/bsh96/Documents/GitHub/spring_UDIK/DATA/LOCALDATA_MERGED_CSV"
+    )
+
+    # 콘솔 출력 수준과 실행 보고서 (단계별 처리 시간, 행 수, 바이트, 최대 메모리)
+    configure(verbosity=STAGE, report_path=os.path.join(output_folder, RUN_REPORT_NAME))
+
+    # 중분류(fulldata_XX_YY)별 shard 병합 (관리번호 기준 중복 제거)
+    merge_shards(input_folder, output_folder)
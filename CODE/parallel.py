@@ -0,0 +1,120 @@
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from instrumentation import FILE, QUIET, STAGE, log, measure, record_stage
+
+
+def _run_file_task(func, file_name):
+    # type: (callable, str) -> dict
+    # 작업 프로세스 안에서 실행: 예외를 잡아서 결과로 돌려준다.
+    # 처리 시간과 최대 메모리는 instrumentation.measure 가 기록한다.
+    # func 는 rows(쓴 행 수) 외에 rows_in / bytes_in / bytes_out 을 돌려줄 수 있다.
+    result = {
+        "file": file_name,
+        "status": "ok",
+        "rows": None,
+        "seconds": 0.0,
+        "error": None,
+    }
+    with measure(result):
+        try:
+            output = func(file_name)
+            if isinstance(output, dict):
+                result.update(output)
+        except Exception:
+            result["status"] = "error"
+            result["error"] = traceback.format_exc()
+    return result
+
+
+def print_summary(results, stage_name=""):
+    # type: (list, str) -> None
+    log(f"----- {stage_name} 파일별 결과 -----", level=FILE)
+    for result in results:
+        rows = "" if result["rows"] is None else f"{result['rows']} rows"
+        log(
+            f"[{result['status']}] {result['file']} {rows} ({result['seconds']}s)",
+            level=FILE,
+        )
+
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    log(f"----- {stage_name} 요약: {counts} -----", level=STAGE)
+
+
+def run_file_tasks(
+    func,
+    file_names,
+    max_workers=None,
+    stage_name="",
+    raise_on_error=True,
+    initializer=None,
+    initargs=(),
+):
+    # type: (callable, list, int, str, bool, callable, tuple) -> list
+    # 파일 단위 작업 func(file_name)을 프로세스 풀에서 실행하고 파일별 결과를 모은다.
+    # func 는 모듈 최상위 함수(또는 functools.partial)여야 pickle 로 전달된다.
+    # func 가 dict 를 반환하면 결과에 합쳐진다. (예: {"rows": 10}, {"status": "skipped"})
+    # max_workers 가 1 이면 현재 프로세스에서 순서대로 실행한다.
+    # initializer(*initargs) 는 작업 프로세스마다 한 번 실행된다. (공유 데이터 적재 등)
+    # 단계 전체와 파일별 계측 값은 instrumentation 실행 보고서에 기록된다.
+    file_names = list(file_names)
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(file_names) or 1))
+
+    started_at = datetime.now().isoformat(timespec="seconds")
+    start = time.perf_counter()
+    results = []
+    if max_workers == 1:
+        if initializer is not None:
+            initializer(*initargs)
+        for file_name in file_names:
+            results.append(_run_file_task(func, file_name))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=max_workers, initializer=initializer, initargs=initargs
+        ) as executor:
+            futures = {
+                executor.submit(_run_file_task, func, file_name): file_name
+                for file_name in file_names
+            }
+            for future in as_completed(futures):
+                try:
+                    results.append(future.result())
+                except Exception:
+                    # 작업 프로세스가 비정상 종료된 경우 (BrokenProcessPool 등)
+                    results.append(
+                        {
+                            "file": futures[future],
+                            "status": "error",
+                            "rows": None,
+                            "seconds": 0.0,
+                            "error": traceback.format_exc(),
+                        }
+                    )
+
+    results.sort(key=lambda result: file_names.index(result["file"]))
+    record_stage(stage_name, results, time.perf_counter() - start, started_at)
+    print_summary(results, stage_name)
+
+    for result in results:
+        if result["status"] == "error":
+            log(f"❌ 오류 발생: {result['file']}", level=QUIET)
+            log(result["error"], level=QUIET)
+    if raise_on_error:
+        raise_on_failed(results, stage_name)
+
+    return results
+
+
+def raise_on_failed(results, stage_name=""):
+    # type: (list, str) -> None
+    # 실패한 파일이 있으면 모든 파일 처리가 끝난 뒤 예외 발생
+    failed = [result["file"] for result in results if result["status"] == "error"]
+    if failed:
+        raise RuntimeError(f"{stage_name}: {len(failed)}개 파일 처리 실패 {failed}")
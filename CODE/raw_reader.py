@@ -0,0 +1,182 @@
+import csv
+
+import pandas as pd
+
+from ingest import resolve_encoding
+from instrumentation import QUIET, log
+from table_io import long_csv_records, table_format, write_table
+
+# 파이프라인 전체에서 사용하는 원본 컬럼 (usecols 로 넘기면 나머지 컬럼은 읽지 않는다)
+PIPELINE_COLUMNS = [
+    "관리번호",
+    "사업장명",
+    "인허가일자",
+    "폐업일자",
+    "영업상태명",
+    "소재지전체주소",
+    "좌표정보x(epsg5174)",
+    "좌표정보y(epsg5174)",
+]
+
+# 한 번에 읽는 행 수 (메모리 사용량은 이 값에 비례)
+DEFAULT_CHUNKSIZE = 200_000
+
+
+def detect_encoding(file_path):
+    # type: (str) -> str
+    # ingest 단계의 manifest 에 기록된 인코딩을 사용하고, 없으면 바이트 표본으로 판단한다.
+    return resolve_encoding(file_path)
+
+
+def read_header(file_path, encoding):
+    # type: (str, str) -> list
+    return list(pd.read_csv(file_path, encoding=encoding, nrows=0).columns)
+
+
+def iter_raw_chunks(
+    file_path,
+    transform=None,
+    usecols=None,
+    chunksize=DEFAULT_CHUNKSIZE,
+    encoding=None,
+    bad_lines=None,
+):
+    # type: (str, callable, list, int, str, list) -> iter
+    # 원본 CSV를 chunksize 행씩 읽으면서 transform(chunk) 결과만 돌려준다.
+    # - usecols: 읽을 컬럼 (파일에 없는 컬럼은 무시, None 이면 전체)
+    # - bad_lines: 주어지면 건너뛴 잘못된 행의 번호 (헤더 = 0) 를 이 list 에 추가
+    # - 모든 값을 문자열로 읽어서 chunk 마다 dtype 이 달라지지 않도록 한다.
+    #   그래서 CSV 로 저장하면 원본 표기가 그대로 남는다. (파일 전체를 pd.read_csv 로
+    #   읽던 이전 결과와 달리 관리번호 / 영업상태구분코드의 앞자리 0 이 유지되고 ("03"),
+    #   결측이 있는 정수 컬럼도 "3.0" 이 아니라 "3" 으로 저장된다)
+    #   다음 단계는 CSV 를 다시 읽으면서 dtype 을 추론하므로 계산 결과는 같고,
+    #   parquet / feather 는 table_io.to_typed 가 날짜/좌표/생존 컬럼의 dtype 을 맞춘다.
+    #
+    # 필드가 헤더보다 많은 행은 chunksize 와 관계없이 건너뛴다.
+    # (on_bad_lines="warn" 은 그런 행이 chunk 의 첫 행이면 남는 필드를 버리고 경고 없이 읽는다)
+    if encoding is None:
+        encoding = detect_encoding(file_path)
+
+    if usecols is not None:
+        wanted = set(usecols)
+        usecols = lambda column: column in wanted
+
+    skip = long_rows(file_path, encoding)
+    if bad_lines is not None:
+        bad_lines += skip
+
+    # 잘못된 행은 미리 건너뛰므로, 남은 잘못된 행이 있으면 조용히 넘어가지 않고 오류가 난다.
+    reader = pd.read_csv(
+        file_path,
+        encoding=encoding,
+        on_bad_lines="error",
+        skiprows=set(skip) or None,
+        usecols=usecols,
+        dtype=str,
+        chunksize=chunksize,
+    )
+    with reader:
+        for chunk in reader:
+            yield chunk if transform is None else transform(chunk)
+    if skip:
+        log(
+            f"⚠️ 필드 수가 헤더보다 많은 행 {len(skip)}개를 건너뜀: {file_path}",
+            level=QUIET,
+        )
+
+
+def long_rows(file_path, encoding):
+    # type: (str, str) -> list
+    # 필드 수가 헤더보다 많은 행의 번호 (헤더 = 0, pd.read_csv 의 skiprows 기준)
+    # 바이트 검사로 판단할 수 없는 파일 (필드 중간의 따옴표 등) 은 csv 모듈로 센다.
+    # (csv 모듈은 pd.read_csv 의 C 엔진과 같은 규칙으로 행과 필드를 나눈다)
+    fields = len(read_header(file_path, encoding))
+    rows = long_csv_records(file_path, fields)
+    if rows is None:
+        with open(file_path, encoding=encoding, newline="") as f:
+            rows = [
+                row for row, values in enumerate(csv.reader(f)) if len(values) > fields
+            ]
+    return rows
+
+
+class TableAppender:
+    # chunk 단위 결과를 하나의 테이블 파일로 저장
+    # CSV 는 chunk 마다 바로 이어 쓰고, parquet / feather 는 모아서 마지막에 저장한다.
+    def __init__(self, path, columns, encoding="utf-8-sig"):
+        self.path = path
+        self.columns = list(columns)
+        self.encoding = encoding
+        self.rows = 0
+        self._chunks = []
+        self._is_csv = table_format(path) == "csv"
+        self._header_written = False
+
+    def append(self, chunk):
+        self.rows += len(chunk)
+        if not self._is_csv:
+            self._chunks.append(chunk)
+            return
+        chunk.to_csv(
+            self.path,
+            mode="a" if self._header_written else "w",
+            header=not self._header_written,
+            index=False,
+            encoding=self._chunk_encoding(),
+        )
+        self._header_written = True
+
+    def _chunk_encoding(self):
+        # BOM 은 파일 처음에만 쓴다.
+        if self._header_written and self.encoding == "utf-8-sig":
+            return "utf-8"
+        return self.encoding
+
+    def close(self):
+        if self._is_csv:
+            if not self._header_written:
+                pd.DataFrame(columns=self.columns).to_csv(
+                    self.path, index=False, encoding=self.encoding
+                )
+            return self.rows
+        if self._chunks:
+            df = pd.concat(self._chunks, ignore_index=True)
+        else:
+            df = pd.DataFrame(columns=self.columns)
+        write_table(df, self.path)
+        return self.rows
+
+
+def stream_filter_csv(
+    input_path,
+    output_path,
+    transform,
+    usecols=None,
+    chunksize=DEFAULT_CHUNKSIZE,
+    encoding=None,
+    output_encoding="utf-8-sig",
+    stats=None,
+):
+    # type: (str, str, callable, list, int, str, str, dict) -> int
+    # 원본 파일을 chunk 단위로 읽고 transform 을 통과한 행만 output_path 에 이어서 저장
+    # stats 가 주어지면 stats["rows_in"] 에 읽은 행 수를 기록한다.
+    if encoding is None:
+        encoding = detect_encoding(input_path)
+
+    columns = read_header(input_path, encoding)
+    if usecols is not None:
+        columns = [column for column in columns if column in set(usecols)]
+
+    appender = TableAppender(output_path, columns, encoding=output_encoding)
+    rows_in = 0
+    for chunk in iter_raw_chunks(
+        input_path,
+        usecols=usecols,
+        chunksize=chunksize,
+        encoding=encoding,
+    ):
+        rows_in += len(chunk)
+        appender.append(chunk if transform is None else transform(chunk))
+    if stats is not None:
+        stats["rows_in"] = rows_in
+    return appender.close()
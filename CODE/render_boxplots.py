@@ -0,0 +1,130 @@
+import os
+from functools import lru_cache, partial
+
+import matplotlib
+
+# 화면 없이 파일로만 그린다. (작업 프로세스에서도 사용)
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+import seaborn as sns
+from matplotlib import font_manager
+
+from dataset_loader import industry_name, load_table
+from instrumentation import QUIET, RUN_REPORT_NAME, STAGE, banner, configure, log
+from stage_cache import run_cached_file_tasks
+from table_io import list_tables
+
+# 한글 폰트 후보 (Windows, macOS, Linux 순서), 설치된 첫 번째 폰트를 사용
+KOREAN_FONTS = ["Malgun Gothic", "AppleGothic", "NanumGothic", "Noto Sans CJK KR"]
+
+X_COLUMN = "생존"
+Y_COLUMN = "동일업종 최근접거리의 평균"
+FIGSIZE = (6, 4)
+
+
+@lru_cache(maxsize=None)
+def korean_font():
+    # type: () -> str
+    # 설치된 한글 폰트 이름 (없으면 None)
+    available = {font.name for font in font_manager.fontManager.ttflist}
+    for name in KOREAN_FONTS:
+        if name in available:
+            return name
+    log(
+        f"⚠️ 한글 폰트를 찾지 못함 (후보: {KOREAN_FONTS}), 기본 폰트로 그립니다.",
+        level=QUIET,
+    )
+    return None
+
+
+def set_korean_font():
+    # type: () -> str
+    font = korean_font()
+    if font is not None:
+        plt.rcParams["font.family"] = font
+    plt.rcParams["axes.unicode_minus"] = False  # 마이너스 기호 깨짐 방지
+    return font
+
+
+def plot_name(file_name):
+    # type: (str) -> str
+    return f"{industry_name(file_name)}_boxplot.png"
+
+
+def _render_boxplot(file_name, input_folder, plot_dir, x_column, y_column):
+    # type: (str, str, str, str, str) -> dict
+    log("render_boxplots -> file_name: ", file_name)
+    df = load_table(os.path.join(input_folder, file_name), columns=[x_column, y_column])
+    if not {x_column, y_column}.issubset(df.columns) or df[y_column].isna().all():
+        return {"status": "skipped", "rows": len(df), "rows_in": len(df)}
+
+    set_korean_font()
+    fig, ax = plt.subplots(figsize=FIGSIZE)
+    try:
+        sns.boxplot(data=df, x=x_column, y=y_column, ax=ax)
+        ax.set_title(f"Boxplot - {industry_name(file_name)}")
+        fig.tight_layout()
+        fig.savefig(os.path.join(plot_dir, plot_name(file_name)))
+    finally:
+        plt.close(fig)
+    return {"rows": len(df), "rows_in": len(df)}
+
+
+def _output_names(file_name):
+    # type: (str) -> list
+    return [plot_name(file_name)]
+
+
+def render_boxplots(
+    input_folder,
+    plot_dir,
+    x_column=X_COLUMN,
+    y_column=Y_COLUMN,
+    max_workers=None,
+    force=False,
+):
+    # type: (str, str, str, str, int, bool) -> str
+    # 업종 파일마다 x_column 별 y_column 박스플롯을 plot_dir/<업종명>_boxplot.png 로 저장한다.
+    # 그림은 프로세스 풀에서 Agg 백엔드로 그리고, 입력 파일 내용과 설정이 이전 실행과 같으면
+    # 다시 그리지 않는다. (force=True 이면 모두 다시 그림)
+    banner("render_boxplots")
+
+    os.makedirs(plot_dir, exist_ok=True)
+    run_cached_file_tasks(
+        partial(
+            _render_boxplot,
+            input_folder=input_folder,
+            plot_dir=plot_dir,
+            x_column=x_column,
+            y_column=y_column,
+        ),
+        input_folder,
+        list_tables(input_folder),
+        plot_dir,
+        _output_names,
+        params={
+            "x_column": x_column,
+            "y_column": y_column,
+            "figsize": FIGSIZE,
+            "font": korean_font(),
+        },
+        force=force,
+        max_workers=max_workers,
+        stage_name="render_boxplots",
+    )
+    return plot_dir
+
+
+if __name__ == "__main__":
+    RESULT_FOLDER = (
+        "C:/Users/bsh96/Documents/GitHub/spring_UDIK/ANALYSIS_RESULT/00TTEST"
+    )
+    input_folder = "C:/Users/bsh96/Documents/GitHub/spring_UDIK/DATA/LOCALDATA_FILTERED_CSV/04adj_industry_added"
+    plot_dir = os.path.join(RESULT_FOLDER, "boxplots")
+
+    # 콘솔 출력 수준과 실행 보고서 (단계별 처리 시간, 행 수, 바이트, 최대 메모리)
+    configure(verbosity=STAGE, report_path=os.path.join(RESULT_FOLDER, RUN_REPORT_NAME))
+
+    # 업종별 생존 여부에 따른 최근접 거리 박스플롯
+    render_boxplots(input_folder, plot_dir)
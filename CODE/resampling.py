@@ -0,0 +1,141 @@
+import numpy as np
+from functools import partial
+
+from parallel import run_file_tasks
+
+# 재표본 수와 한 번에 만드는 인덱스 행렬의 최대 원소 수 (배치 크기 = MAX_CELLS // 표본 수)
+N_RESAMPLES = 10000
+CONFIDENCE = 0.95
+MAX_CELLS = 1 << 22
+
+# 작업 프로세스마다 한 번만 적재하는 업종별 표본과 난수 시드
+# {업종명: (생존 값 배열, 폐업 값 배열)}, {업종명: SeedSequence}
+_SAMPLES = {}
+_SEEDS = {}
+
+
+def _batches(n_resamples, n, max_cells):
+    # type: (int, int, int) -> list
+    # n_resamples 개의 재표본을 (배치 크기 x n) 인덱스 행렬이 max_cells 를 넘지 않도록 나눈다.
+    batch_size = max(1, max_cells // max(n, 1))
+    return [
+        min(batch_size, n_resamples - start)
+        for start in range(0, n_resamples, batch_size)
+    ]
+
+
+def permutation_test(alive, dead, rng, n_resamples=N_RESAMPLES, max_cells=MAX_CELLS):
+    # type: (np.ndarray, np.ndarray, np.random.Generator, int, int) -> float
+    # 평균 차이(생존 - 폐업)의 양측 순열 검정 p값 ((초과 수 + 1) / (재표본 수 + 1))
+    # 배치마다 순열을 (배치 크기 x n) 인덱스 행렬로 만들고 앞쪽 len(alive) 개를 생존 그룹으로 본다.
+    pooled = np.concatenate([alive, dead]).astype(float)
+    n, n_alive = len(pooled), len(alive)
+    total = pooled.sum()
+    observed = abs(alive.mean() - dead.mean())
+    # 부동소수점 오차로 관측값과 같은 순열이 빠지지 않도록 약간 낮춘 기준
+    threshold = observed - 1e-12 * max(1.0, observed)
+
+    exceed = 0
+    order = np.arange(n, dtype=np.int32)
+    for size in _batches(n_resamples, n, max_cells):
+        index = rng.permuted(np.broadcast_to(order, (size, n)), axis=1)
+        alive_sum = pooled[index[:, :n_alive]].sum(axis=1)
+        diffs = alive_sum / n_alive - (total - alive_sum) / (n - n_alive)
+        exceed += int(np.count_nonzero(np.abs(diffs) >= threshold))
+    return (exceed + 1) / (n_resamples + 1)
+
+
+def bootstrap_ci(
+    alive,
+    dead,
+    rng,
+    n_resamples=N_RESAMPLES,
+    confidence=CONFIDENCE,
+    max_cells=MAX_CELLS,
+):
+    # type: (np.ndarray, np.ndarray, np.random.Generator, int, float, int) -> tuple
+    # 평균 차이(생존 - 폐업)의 부트스트랩 백분위 신뢰구간 (하한, 상한)
+    # 그룹별로 복원추출 인덱스 행렬을 배치 단위로 만들어서 평균을 한 번에 계산한다.
+    alive = np.asarray(alive, dtype=float)
+    dead = np.asarray(dead, dtype=float)
+    diffs = []
+    for size in _batches(n_resamples, len(alive) + len(dead), max_cells):
+        alive_index = rng.integers(0, len(alive), size=(size, len(alive)))
+        dead_index = rng.integers(0, len(dead), size=(size, len(dead)))
+        diffs.append(alive[alive_index].mean(axis=1) - dead[dead_index].mean(axis=1))
+    diffs = np.concatenate(diffs)
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(diffs, [alpha, 1 - alpha])
+    return low, high
+
+
+def compare_groups(
+    alive,
+    dead,
+    rng,
+    n_resamples=N_RESAMPLES,
+    confidence=CONFIDENCE,
+    max_cells=MAX_CELLS,
+):
+    # type: (np.ndarray, np.ndarray, np.random.Generator, int, float, int) -> dict
+    alive = np.asarray(alive, dtype=float)
+    dead = np.asarray(dead, dtype=float)
+    low, high = bootstrap_ci(alive, dead, rng, n_resamples, confidence, max_cells)
+    return {
+        "mean_diff": alive.mean() - dead.mean(),
+        "permutation_p": permutation_test(alive, dead, rng, n_resamples, max_cells),
+        "ci_low": low,
+        "ci_high": high,
+    }
+
+
+def _init_samples(samples, seeds):
+    # type: (dict, dict) -> None
+    # 프로세스 풀 initializer: 업종별 표본과 시드를 작업 프로세스에 한 번만 전달
+    _SAMPLES.clear()
+    _SAMPLES.update(samples)
+    _SEEDS.clear()
+    _SEEDS.update(seeds)
+
+
+def _compare_task(name, n_resamples, confidence, max_cells):
+    # type: (str, int, float, int) -> dict
+    alive, dead = _SAMPLES[name]
+    rng = np.random.default_rng(_SEEDS[name])
+    return compare_groups(alive, dead, rng, n_resamples, confidence, max_cells)
+
+
+def compare_industries(
+    samples,
+    seed=None,
+    n_resamples=N_RESAMPLES,
+    confidence=CONFIDENCE,
+    max_cells=MAX_CELLS,
+    max_workers=None,
+):
+    # type: (dict, int, int, float, int, int) -> dict
+    # 업종별 (생존, 폐업) 표본에 순열 검정과 부트스트랩 신뢰구간을 업종 단위로 병렬 계산한다.
+    # seed 의 SeedSequence 를 업종명 순서로 나눠 쓰므로 작업 수/순서와 관계없이 결과가 같다.
+    # 반환값: {업종명: {"mean_diff", "permutation_p", "ci_low", "ci_high"}}
+    names = sorted(samples)
+    seeds = dict(zip(names, np.random.SeedSequence(seed).spawn(len(names))))
+    results = run_file_tasks(
+        partial(
+            _compare_task,
+            n_resamples=n_resamples,
+            confidence=confidence,
+            max_cells=max_cells,
+        ),
+        names,
+        max_workers=max_workers,
+        stage_name="resampling",
+        initializer=_init_samples,
+        initargs=(samples, seeds),
+    )
+    return {
+        result["file"]: {
+            key: result[key]
+            for key in ("mean_diff", "permutation_p", "ci_low", "ci_high")
+        }
+        for result in results
+    }
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+from functools import partial
+
+from instrumentation import file_bytes
+from parallel import raise_on_failed, run_file_tasks
+
+MANIFEST_NAME = "stage_manifest.json"
+
+
+def file_hash(file_path, block_size=1 << 20):
+    # type: (str, int) -> str
+    # 파일 내용 해시 (수정시각이 바뀌어도 내용이 같으면 같은 값)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def params_key(params):
+    # type: (dict) -> str
+    # 단계 파라미터를 비교 가능한 문자열로 변환 (datetime 등은 str 로 저장)
+    return json.dumps(params, ensure_ascii=False, sort_keys=True, default=str)
+
+
+def read_stage_manifest(output_folder, stage_name):
+    # type: (str, str) -> dict
+    manifest_path = os.path.join(output_folder, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, encoding="utf-8") as f:
+        return json.load(f).get(stage_name, {})
+
+
+def write_stage_manifest(output_folder, stage_name, entries):
+    # type: (str, str, dict) -> None
+    # 같은 폴더를 쓰는 다른 단계의 기록은 그대로 둔다.
+    manifest_path = os.path.join(output_folder, MANIFEST_NAME)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    manifest[stage_name] = entries
+    with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(manifest_path + ".tmp", manifest_path)
+
+
+def _remove_outputs(output_folder, names):
+    # type: (str, list) -> None
+    for name in names:
+        path = os.path.join(output_folder, name)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _cached_file_task(
+    file_name,
+    func,
+    input_folder,
+    output_folder,
+    output_names,
+    entries,
+    key,
+    force,
+    keep_outputs,
+):
+    # type: (str, callable, str, str, callable, dict, str, bool, bool) -> dict
+    # 작업 프로세스 안에서 입력 파일 해시를 계산하고, 기록과 같으면 func 를 건너뛴다.
+    # bytes_in 은 입력 파일 크기, bytes_out 은 이번에 만든 출력 파일 크기의 합계
+    input_path = os.path.join(input_folder, file_name)
+    input_hash = file_hash(input_path)
+    entry = entries.get(file_name)
+    if (
+        not force
+        and entry is not None
+        and entry["input_hash"] == input_hash
+        and entry["params"] == key
+        and all(
+            os.path.exists(os.path.join(output_folder, name))
+            for name in entry["outputs"]
+        )
+    ):
+        return {
+            "status": "cached",
+            "rows": entry["rows"],
+            "bytes_in": file_bytes(input_path),
+            "bytes_out": 0,
+        }
+
+    # 이전 실행의 출력을 지운 뒤 다시 계산 (이번에 건너뛰는 파일의 출력이 남지 않도록)
+    # keep_outputs 이면 func 가 이전 출력을 읽을 수 있도록 건너뛴 경우에만 지운다.
+    if entry is not None and not keep_outputs:
+        _remove_outputs(output_folder, entry["outputs"])
+
+    result = {"status": "ok", "rows": None}
+    output = func(file_name)
+    if isinstance(output, dict):
+        result.update(output)
+    if entry is not None and keep_outputs and result["status"] == "skipped":
+        _remove_outputs(output_folder, entry["outputs"])
+    result["input_hash"] = input_hash
+    result["outputs"] = [
+        name
+        for name in output_names(file_name)
+        if os.path.exists(os.path.join(output_folder, name))
+    ]
+    result.setdefault("bytes_in", file_bytes(input_path))
+    result.setdefault(
+        "bytes_out",
+        file_bytes(*[os.path.join(output_folder, name) for name in result["outputs"]]),
+    )
+    return result
+
+
+def run_cached_file_tasks(
+    func,
+    input_folder,
+    file_names,
+    output_folder,
+    output_names,
+    params,
+    force=False,
+    max_workers=None,
+    stage_name="",
+    keep_outputs=False,
+):
+    # type: (callable, str, list, str, callable, dict, bool, int, str, bool) -> list
+    # run_file_tasks 와 같지만, 입력 파일 내용과 params 가 이전 실행과 같고
+    # 출력 파일이 남아 있으면 다시 계산하지 않는다. (결과 status 는 "cached")
+    # - output_names(file_name): output_folder 기준 출력 파일 경로 목록
+    # - params: 출력에 영향을 주는 단계 파라미터 (max_workers 등은 제외)
+    # - force: True 이면 기록과 관계없이 모두 다시 계산
+    # - keep_outputs: 다시 계산할 때 이전 출력을 남겨둔다. (이전 출력을 고쳐 쓰는 증분 갱신용)
+    entries = read_stage_manifest(output_folder, stage_name)
+    key = params_key(params)
+
+    # 입력 폴더에서 사라진 파일의 출력과 기록은 삭제
+    for file_name in set(entries) - set(file_names):
+        _remove_outputs(output_folder, entries.pop(file_name)["outputs"])
+
+    results = run_file_tasks(
+        partial(
+            _cached_file_task,
+            func=func,
+            input_folder=input_folder,
+            output_folder=output_folder,
+            output_names=output_names,
+            entries=entries,
+            key=key,
+            force=force,
+            keep_outputs=keep_outputs,
+        ),
+        file_names,
+        max_workers=max_workers,
+        stage_name=stage_name,
+        raise_on_error=False,
+    )
+
+    for result in results:
+        if result["status"] == "cached":
+            continue
+        if result["status"] == "error":
+            entries.pop(result["file"], None)
+            continue
+        entries[result["file"]] = {
+            "input_hash": result.pop("input_hash"),
+            "params": key,
+            "outputs": result.pop("outputs"),
+            "status": result["status"],
+            "rows": result["rows"],
+        }
+    write_stage_manifest(output_folder, stage_name, entries)
+
+    raise_on_failed(results, stage_name)
+    return results
@@ -0,0 +1,187 @@
+import os
+import numpy as np
+import pandas as pd
+
+# 실제 LOCALDATA 와 같은 컬럼 이름/형식의 합성 업종 파일 생성 (성능 측정, 회귀 확인용)
+# 좌표는 EPSG:5174 (m) 기준으로 구마다 몇 개의 상권 중심 주변에 모이도록 만든다.
+
+# 구 이름: (중심 x, 중심 y, 반경 m) - EPSG:5174 근사값
+DISTRICTS = {
+    "서울특별시 강남구": (203500, 444500, 3000),
+    "서울특별시 서초구": (200500, 442000, 3500),
+    "서울특별시 송파구": (209000, 445000, 3000),
+    "서울특별시 마포구": (193000, 450500, 2500),
+    "서울특별시 종로구": (198000, 454000, 2500),
+    "서울특별시 관악구": (195500, 441500, 2500),
+    "경기도 수원시 장안구": (199000, 421000, 2500),
+    "경기도 성남시 분당구": (209500, 433500, 3000),
+    "부산광역시 해운대구": (393000, 188000, 3000),
+}
+DISTRICT_WEIGHTS = [0.2, 0.15, 0.15, 0.12, 0.1, 0.08, 0.07, 0.08, 0.05]
+
+# 업종명: 개방서비스아이디
+INDUSTRIES = {
+    "일반음식점": "07_24_04_P",
+    "휴게음식점": "07_24_05_P",
+    "제과점영업": "07_24_01_P",
+    "미용업": "05_18_01_P",
+    "세탁업": "05_19_01_P",
+    "안경업": "01_03_01_P",
+    "약국": "01_01_06_P",
+    "노래연습장업": "03_11_01_P",
+}
+
+COLUMNS = [
+    "번호",
+    "개방서비스명",
+    "개방서비스아이디",
+    "관리번호",
+    "인허가일자",
+    "영업상태구분코드",
+    "영업상태명",
+    "폐업일자",
+    "소재지전체주소",
+    "도로명전체주소",
+    "사업장명",
+    "업태구분명",
+    "좌표정보x(epsg5174)",
+    "좌표정보y(epsg5174)",
+]
+
+# 영업상태명: (영업상태구분코드, 비율) - 폐업 여부는 폐업 시점으로 정한다.
+OTHER_STATUS = {"휴업": ("02", 0.02), "취소/말소/만료/정지/중지": ("04", 0.02)}
+
+HOTSPOTS_PER_DISTRICT = 4
+BACKGROUND_RATIO = 0.15
+MISSING_COORD_RATIO = 0.02
+MISSING_CLOSE_DATE_RATIO = 0.01
+END_DATE = pd.Timestamp("2024-12-31")
+
+
+def clustered_coordinates(rng, n):
+    # type: (np.random.Generator, int) -> tuple
+    # 구를 고른 뒤 구 안의 상권 중심 주변 (표준편차 100~400m) 또는 구 전체에 고르게 배치
+    names = list(DISTRICTS)
+    district = rng.choice(len(names), size=n, p=DISTRICT_WEIGHTS)
+    centers = np.array([DISTRICTS[name][:2] for name in names], dtype=float)
+    radii = np.array([DISTRICTS[name][2] for name in names], dtype=float)
+
+    # 구마다 고정된 상권 중심 (같은 seed 이면 같은 위치)
+    hotspot_rng = np.random.default_rng(5174)
+    angles = hotspot_rng.uniform(0, 2 * np.pi, (len(names), HOTSPOTS_PER_DISTRICT))
+    distances = hotspot_rng.uniform(0, 0.7, angles.shape) * radii[:, None]
+    hotspots = centers[:, None, :] + np.stack(
+        [np.cos(angles) * distances, np.sin(angles) * distances], axis=2
+    )
+    spreads = hotspot_rng.uniform(100, 400, angles.shape)
+
+    hotspot = rng.integers(0, HOTSPOTS_PER_DISTRICT, n)
+    coords = hotspots[district, hotspot] + rng.normal(size=(n, 2)) * (
+        spreads[district, hotspot][:, None]
+    )
+
+    background = rng.random(n) < BACKGROUND_RATIO
+    angle = rng.uniform(0, 2 * np.pi, background.sum())
+    radius = np.sqrt(rng.random(background.sum())) * radii[district[background]]
+    coords[background] = centers[district[background]] + np.column_stack(
+        [np.cos(angle) * radius, np.sin(angle) * radius]
+    )
+    return np.array(names, dtype=object)[district], coords.round(1)
+
+
+def make_industry(n, industry="일반음식점", seed=0, open_years=(2000, 2023)):
+    # type: (int, str, int, tuple) -> pd.DataFrame
+    # 업종 하나의 원본 형식 표 (모든 값은 원본 CSV 와 같은 문자열 형식)
+    rng = np.random.default_rng(seed)
+    service_id = INDUSTRIES.get(industry, "07_24_04_P")
+
+    first = pd.Timestamp(f"{open_years[0]}-01-01")
+    span = (pd.Timestamp(f"{open_years[1]}-12-31") - first).days + 1
+    start = first + pd.to_timedelta(rng.integers(0, span, n), unit="D")
+    # 영업 기간은 평균 약 6년 (지수분포), END_DATE 이후 폐업이면 영업 중
+    close = start + pd.to_timedelta(rng.exponential(365 * 6, n).astype(int), unit="D")
+    closed = close <= END_DATE
+
+    status = np.where(closed, "폐업", "영업/정상").astype(object)
+    status_code = np.where(closed, "03", "01").astype(object)
+    draw = rng.random(n)
+    low = 0.0
+    for name, (code, ratio) in OTHER_STATUS.items():
+        other = ~closed & (draw >= low) & (draw < low + ratio)
+        status[other] = name
+        status_code[other] = code
+        low += ratio
+
+    close_date = np.where(closed, close.strftime("%Y-%m-%d"), None).astype(object)
+    close_date[closed & (rng.random(n) < MISSING_CLOSE_DATE_RATIO)] = None
+
+    districts, coords = clustered_coordinates(rng, n)
+    lot = rng.integers(1, 999, n).astype(str)
+    addresses = districts + " 가상동 " + lot + "번지"
+    roads = districts + " 가상로 " + lot
+
+    # 체인점 이름이 여러 업장에 나오도록 상호 수는 업장 수보다 적게
+    names = np.array([f"{industry}{i}" for i in range(max(1, n // 3))], dtype=object)
+
+    df = pd.DataFrame(
+        {
+            "번호": np.arange(1, n + 1),
+            "개방서비스명": industry,
+            "개방서비스아이디": service_id,
+            "관리번호": [f"{seed:04d}{i:012d}" for i in range(n)],
+            "인허가일자": start.strftime("%Y-%m-%d"),
+            "영업상태구분코드": status_code,
+            "영업상태명": status,
+            "폐업일자": close_date,
+            "소재지전체주소": addresses,
+            "도로명전체주소": roads,
+            "사업장명": rng.choice(names, n),
+            "업태구분명": industry,
+            "좌표정보x(epsg5174)": coords[:, 0],
+            "좌표정보y(epsg5174)": coords[:, 1],
+        },
+        columns=COLUMNS,
+    )
+    missing = rng.random(n) < MISSING_COORD_RATIO
+    df.loc[missing, ["좌표정보x(epsg5174)", "좌표정보y(epsg5174)"]] = np.nan
+    return df
+
+
+def write_localdata(
+    output_folder,
+    total_rows,
+    n_industries=4,
+    encoding="cp949",
+    seed=0,
+    open_years=(2000, 2023),
+):
+    # type: (str, int, int, str, int, tuple) -> list
+    # total_rows 를 업종 수로 나눠서 (업종마다 크기가 다르게) 원본 파일 이름 형식으로 저장
+    # encoding: "cp949" (원본과 같음), "utf-8", "utf-8-sig"
+    # open_years: 인허가일자 범위 (시작 연도, 끝 연도)
+    os.makedirs(output_folder, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    industries = list(INDUSTRIES)[:n_industries]
+    shares = rng.dirichlet(np.full(len(industries), 2.0))
+    sizes = np.maximum(1, (shares * total_rows).astype(int))
+
+    file_names = []
+    for i, (industry, size) in enumerate(zip(industries, sizes)):
+        file_name = f"fulldata_{INDUSTRIES[industry]}_{industry}.csv"
+        df = make_industry(
+            int(size), industry, seed=seed * 1000 + i, open_years=open_years
+        )
+        df.to_csv(
+            os.path.join(output_folder, file_name), index=False, encoding=encoding
+        )
+        file_names.append(file_name)
+    return file_names
+
+
+if __name__ == "__main__":
+    OUTPUT_FOLDER = (
+        "C:/Users/bsh96/Documents/GitHub/spring_UDIK/DATA/LOCALDATA_SYNTHETIC_CSV"
+    )
+
+    # 4개 업종, 전체 10만 행, 원본과 같은 cp949 인코딩
+    write_localdata(OUTPUT_FOLDER, 100_000, n_industries=4, encoding="cp949")
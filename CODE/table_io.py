@@ -0,0 +1,331 @@
+import mmap
+import os
+import numpy as np
+import pandas as pd
+
+# 단계 사이 중간 결과 저장 형식
+# - csv: 기존 UTF-8 CSV (내보내기용)
+# - parquet / feather: 날짜, 좌표, 생존 여부를 원래 dtype 그대로 저장 (pyarrow 필요)
+TABLE_FORMATS = {
+    "csv": ".csv",
+    "parquet": ".parquet",
+    "feather": ".feather",
+}
+
+DATE_COLUMNS = ["인허가일자", "폐업일자", "start_date", "end_date"]
+COORD_COLUMNS = ["좌표정보x(epsg5174)", "좌표정보y(epsg5174)"]
+FLAG_PREFIX = "생존"
+
+
+def table_format(file_name):
+    # type: (str) -> str
+    # 확장자로 형식 판단 (지원하지 않는 형식이면 None)
+    extension = os.path.splitext(file_name)[1].lower()
+    for fmt, fmt_extension in TABLE_FORMATS.items():
+        if extension == fmt_extension:
+            return fmt
+    return None
+
+
+def table_name(file_name, fmt):
+    # type: (str, str) -> str
+    # 확장자를 fmt 형식으로 교체 (업종명.csv -> 업종명.parquet)
+    return os.path.splitext(file_name)[0] + TABLE_FORMATS[fmt]
+
+
+def list_tables(folder):
+    # type: (str) -> list
+    return [f for f in os.listdir(folder) if table_format(f) is not None]
+
+
+def to_typed(df):
+    # type: (pd.DataFrame) -> pd.DataFrame
+    # 컬럼형 형식으로 저장하기 전에 날짜/좌표/생존 컬럼을 원래 dtype으로 변환
+    df = df.copy()
+    for column in df.columns:
+        if column in DATE_COLUMNS:
+            if not pd.api.types.is_datetime64_any_dtype(df[column]):
+                df[column] = pd.to_datetime(
+                    df[column], format="%Y-%m-%d", errors="coerce"
+                )
+        elif column in COORD_COLUMNS:
+            df[column] = pd.to_numeric(df[column], errors="coerce")
+        elif column.startswith(FLAG_PREFIX) and df[column].dtype == object:
+            df[column] = (
+                df[column]
+                .map({True: True, False: False, "True": True, "False": False})
+                .astype("boolean")
+            )
+        elif df[column].dtype == object:
+            # 숫자/문자가 섞인 컬럼은 문자열로 통일 (pyarrow 변환 오류 방지)
+            if pd.api.types.infer_dtype(df[column], skipna=True) not in (
+                "string",
+                "empty",
+            ):
+                df[column] = df[column].where(df[column].isna(), df[column].astype(str))
+    return df
+
+
+def write_table(df, path, encoding=None):
+    # type: (pd.DataFrame, str, str) -> str
+    fmt = table_format(path)
+    if fmt == "csv":
+        df.to_csv(path, index=False, encoding=encoding)
+    elif fmt == "parquet":
+        to_typed(df).to_parquet(path, index=False)
+    elif fmt == "feather":
+        to_typed(df).reset_index(drop=True).to_feather(path)
+    else:
+        raise ValueError(f"지원하지 않는 형식: {path}")
+    return path
+
+
+def _table_columns(path, fmt):
+    # type: (str, str) -> list
+    # 데이터를 읽지 않고 스키마에서 컬럼 이름만 확인
+    if fmt == "parquet":
+        import pyarrow.parquet
+
+        return pyarrow.parquet.read_schema(path).names
+    import pyarrow.ipc
+
+    with pyarrow.ipc.open_file(path) as reader:
+        return reader.schema.names
+
+
+def read_table(path, columns=None, **csv_kwargs):
+    # type: (str, list, ...) -> pd.DataFrame
+    # columns 가 주어지면 파일에 있는 컬럼 중 해당 컬럼만 읽는다.
+    # csv_kwargs 는 CSV 파일인 경우에만 pd.read_csv 로 전달된다.
+    fmt = table_format(path)
+    if fmt == "csv":
+        if columns is not None:
+            wanted = set(columns)
+            csv_kwargs["usecols"] = lambda column: column in wanted
+        return pd.read_csv(path, **csv_kwargs)
+
+    if fmt not in ("parquet", "feather"):
+        raise ValueError(f"지원하지 않는 형식: {path}")
+    if columns is not None:
+        available = _table_columns(path, fmt)
+        columns = [column for column in available if column in set(columns)]
+    if fmt == "parquet":
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_feather(path, columns=columns)
+
+
+# 행 수 세기에서 한 번에 검사하는 바이트 수
+COUNT_BLOCK_SIZE = 1 << 24
+# pd.read_csv 가 빈 행으로 보는 공백 바이트 ("\t", "\r", " ")
+BLANK_BYTES = (9, 13, 32)
+
+
+def _bom_size(data):
+    # type: (np.ndarray) -> int
+    return 3 if data[:3].tobytes() == b"\xef\xbb\xbf" else 0
+
+
+def _irregular_rows(data, quote_pos, return_pos, quotes, bom):
+    # type: (np.ndarray, np.ndarray, np.ndarray, int, int) -> bool
+    # 바이트 검사로 pd.read_csv 와 같은 방식으로 행을 나눴다고 보장할 수 없는지
+    # (quote_pos / return_pos 는 블록 안 '"' / '\r' 의 파일 기준 위치, quotes 는 그 앞의 '"' 수)
+    # - 여는 따옴표는 필드 시작 (파일 처음, ',', 줄바꿈, 이스케이프 '""' 뒤),
+    #   닫는 따옴표 뒤는 ',', 줄바꿈, '"', 파일 끝이어야 한다.
+    #   (필드 중간의 따옴표는 pd.read_csv 가 문자로 읽으므로 따옴표 안/밖이 달라진다)
+    # - 따옴표 밖의 '\r' 은 '\r\n' 이어야 한다. ('\r' 만으로도 줄을 바꾼다)
+    size = len(data)
+    opening = (np.arange(len(quote_pos)) + quotes) % 2 == 0
+    before = data[np.maximum(quote_pos - 1, 0)]
+    opening_ok = (quote_pos == bom) | np.isin(before, (10, 13, 34, 44))
+    after = data[np.minimum(quote_pos + 1, size - 1)]
+    closing_ok = (quote_pos == size - 1) | np.isin(after, (10, 13, 34, 44))
+    return_pos = return_pos[(np.searchsorted(quote_pos, return_pos) + quotes) % 2 == 0]
+    bare_return = data[np.minimum(return_pos + 1, size - 1)] != 10
+    bare_return[return_pos == size - 1] = False
+    return not (opening_ok[opening].all() and closing_ok[~opening].all()) or bool(
+        bare_return.any()
+    )
+
+
+def _count_csv_rows_parsed(path, stop_after=None, chunksize=1 << 20):
+    # type: (str, int, int) -> int
+    # pd.read_csv 로 첫 번째 컬럼만 읽어서 행 수를 센다. (바이트 검사를 할 수 없는 파일)
+    # '"', ',', 줄바꿈은 UTF-8 / cp949 다중 바이트 문자에 나오지 않으므로 latin-1 로 읽어도 같다.
+    rows = 0
+    try:
+        reader = pd.read_csv(
+            path, encoding="latin-1", usecols=[0], dtype=str, chunksize=chunksize
+        )
+    except pd.errors.EmptyDataError:
+        return 0
+    with reader:
+        for chunk in reader:
+            rows += len(chunk)
+            if stop_after is not None and rows > stop_after:
+                break
+    return rows
+
+
+def count_csv_rows(path, stop_after=None, block_size=COUNT_BLOCK_SIZE):
+    # type: (str, int, int) -> int
+    # CSV 를 파싱하지 않고 바이트만 훑어서 데이터 행 수(헤더 제외)를 센다.
+    # - 따옴표 안의 줄바꿈(주소 등)은 행 구분으로 보지 않는다. ("" 이스케이프 포함)
+    # - 빈 줄과 공백/탭만 있는 줄은 pd.read_csv(skip_blank_lines=True) 와 같이 세지 않는다.
+    # - stop_after 가 주어지면 그 값을 넘는 순간 멈추고 그때까지 센 값을 반환한다.
+    #   (반환값 > stop_after 이면 실제 행 수도 stop_after 보다 많다)
+    # UTF-8 / cp949 모두 다중 바이트 문자에 '"' 와 '\n' 바이트가 나오지 않는다.
+    # 필드 중간의 따옴표나 '\r' 만으로 바꾼 줄이 있으면 pd.read_csv 로 센다.
+    # on_bad_lines 로 버려지는 잘못된 행은 세므로 실제 읽은 행 수보다 많을 수 있다.
+    if os.path.getsize(path) == 0:
+        return 0
+
+    irregular = False
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        data = np.frombuffer(mm, dtype=np.uint8)
+        bom = _bom_size(data)
+        records = 0
+        quotes = 0  # 지금까지 나온 '"' 수 (홀수이면 따옴표 안)
+        line_start = 0  # 현재 행의 시작 위치
+        for offset in range(0, len(data), block_size):
+            block = data[offset : offset + block_size]
+            quote_pos = np.flatnonzero(block == 34)
+            newline_pos = np.flatnonzero(block == 10)
+            return_pos = np.flatnonzero(block == 13)
+            if _irregular_rows(
+                data, quote_pos + offset, return_pos + offset, quotes, bom
+            ):
+                del block
+                irregular = True
+                break
+
+            # 각 줄바꿈 앞에 나온 '"' 수가 짝수이면 행 구분
+            outside = (np.searchsorted(quote_pos, newline_pos) + quotes) % 2 == 0
+            ends = newline_pos[outside] + offset
+            quotes += len(quote_pos)
+            if len(ends) > 0:
+                starts = np.empty_like(ends)
+                starts[0] = line_start
+                starts[1:] = ends[:-1] + 1
+                records += _non_blank_lines(data, starts, ends)
+                line_start = ends[-1] + 1
+
+            del block
+            if stop_after is not None and records - 1 > stop_after:
+                break
+        else:
+            # 마지막 줄바꿈 뒤에 남은 행
+            records += _non_blank_lines(
+                data, np.array([line_start]), np.array([len(data)])
+            )
+        del data
+
+    if irregular:
+        return _count_csv_rows_parsed(path, stop_after=stop_after)
+    return max(records - 1, 0)
+
+
+def _non_blank_lines(data, starts, ends):
+    # type: (np.ndarray, np.ndarray, np.ndarray) -> int
+    # [start, end) 구간 중 BLANK_BYTES 외의 바이트가 있는 행 수
+    # 처음과 끝 바이트가 모두 공백인 행만 행 전체를 확인한다. (데이터 행은 대부분 아님)
+    lengths = ends - starts
+    blank = lengths == 0
+    filled = np.flatnonzero(~blank)
+    edges = np.isin(data[starts[filled]], BLANK_BYTES) & np.isin(
+        data[ends[filled] - 1], BLANK_BYTES
+    )
+    for row in filled[edges]:
+        blank[row] = not bytes(data[starts[row] : ends[row]]).strip(b"\t\r ")
+    return int(len(lengths) - blank.sum())
+
+
+def long_csv_records(path, max_fields, block_size=COUNT_BLOCK_SIZE):
+    # type: (str, int, int) -> list
+    # CSV 를 파싱하지 않고 바이트만 훑어서 필드가 max_fields 보다 많은 행의 번호를 구한다.
+    # - 번호는 pd.read_csv 의 skiprows 와 같이 헤더를 0 으로, 빈 줄도 하나의 행으로 센다.
+    # - 따옴표 안의 ',' 와 줄바꿈은 세지 않는다. ("" 이스케이프 포함)
+    # 따옴표가 필드의 처음/끝이 아닌 곳에 있거나, 닫히지 않았거나, '\r' 만으로 줄을 바꾸면
+    # pd.read_csv 와 같은 방식으로 행을 나눴다고 보장할 수 없으므로 None 을 반환한다.
+    if os.path.getsize(path) == 0:
+        return []
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        data = np.frombuffer(mm, dtype=np.uint8)
+        size = len(data)
+        bom = _bom_size(data)
+        long_records = []
+        records = 0  # 끝난 행 수
+        quotes = 0  # 지금까지 나온 '"' 수 (홀수이면 따옴표 안)
+        commas = 0  # 아직 끝나지 않은 행에서 따옴표 밖에 나온 ',' 수
+        for offset in range(0, size, block_size):
+            block = data[offset : offset + block_size]
+            quote_pos = np.flatnonzero(block == 34) + offset
+            newline_pos = np.flatnonzero(block == 10) + offset
+            comma_pos = np.flatnonzero(block == 44) + offset
+            return_pos = np.flatnonzero(block == 13) + offset
+
+            if _irregular_rows(data, quote_pos, return_pos, quotes, bom):
+                del block
+                long_records = None
+                break
+
+            outside = (np.searchsorted(quote_pos, comma_pos) + quotes) % 2 == 0
+            comma_pos = comma_pos[outside]
+            ends = newline_pos[
+                (np.searchsorted(quote_pos, newline_pos) + quotes) % 2 == 0
+            ]
+            quotes += len(quote_pos)
+            if len(ends) == 0:
+                commas += len(comma_pos)
+            else:
+                # 행마다 따옴표 밖 ',' 수 (첫 행은 이전 블록에서 이어진 수 포함)
+                per_line = np.diff(np.searchsorted(comma_pos, ends), prepend=0)
+                per_line[0] += commas
+                long_records += (
+                    np.flatnonzero(per_line >= max_fields) + records
+                ).tolist()
+                records += len(ends)
+                commas = len(comma_pos) - int(np.searchsorted(comma_pos, ends[-1]))
+            del block
+        del data
+
+    # 닫히지 않은 따옴표
+    if long_records is None or quotes % 2:
+        return None
+    # 마지막 줄바꿈 뒤에 남은 행
+    if commas >= max_fields:
+        long_records.append(records)
+    return long_records
+
+
+def table_row_count(path, stop_after=None):
+    # type: (str, int) -> int
+    # parquet / feather 는 메타데이터에서 행 수를 읽는다.
+    # CSV 는 count_csv_rows 로 파싱 없이 센다. (stop_after 는 CSV 에만 적용)
+    fmt = table_format(path)
+    if fmt == "parquet":
+        import pyarrow.parquet
+
+        return pyarrow.parquet.read_metadata(path).num_rows
+    if fmt == "feather":
+        import pyarrow.ipc
+
+        with pyarrow.ipc.open_file(path) as reader:
+            return sum(
+                reader.get_batch(i).num_rows for i in range(reader.num_record_batches)
+            )
+    return count_csv_rows(path, stop_after=stop_after)
+
+
+def convert_folder(input_folder, output_folder, fmt="csv", encoding="utf-8-sig"):
+    # type: (str, str, str, str) -> str
+    # 폴더 안의 모든 테이블을 fmt 형식으로 변환 (예: parquet -> csv 내보내기)
+    os.makedirs(output_folder, exist_ok=True)
+    for file_name in list_tables(input_folder):
+        df = read_table(os.path.join(input_folder, file_name))
+        write_table(
+            df,
+            os.path.join(output_folder, table_name(file_name, fmt)),
+            encoding=encoding,
+        )
+    return output_folder
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# CODE 폴더의 모듈을 스크립트와 같은 방식 (import table_io) 으로 불러온다.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
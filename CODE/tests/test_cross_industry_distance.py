@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+from scipy.spatial import KDTree
+
+from cross_industry_distance import nearest_overlapping, overlap_counts
+
+
+def _brute(target_coords, target_starts, target_ends, coords, starts, ends):
+    dist = np.hypot(
+        coords[:, 0][:, None] - target_coords[:, 0][None, :],
+        coords[:, 1][:, None] - target_coords[:, 1][None, :],
+    )
+    valid = (target_starts[None, :] <= ends[:, None]) & (
+        starts[:, None] <= target_ends[None, :]
+    )
+    dist[~valid] = np.inf
+    best = dist.min(axis=1)
+    return np.where(np.isfinite(best), best, np.nan)
+
+
+def _random_case(rng, n, m):
+    target_coords = rng.uniform(0, 1000, (n, 2))
+    coords = rng.uniform(0, 1000, (m, 2))
+    # 일부는 시작일 > 종료일
+    target_starts = rng.integers(0, 5000, n)
+    target_ends = target_starts + rng.integers(-50, 800, n)
+    starts = rng.integers(0, 5000, m)
+    ends = starts + rng.integers(-50, 800, m)
+    return target_coords, target_starts, target_ends, coords, starts, ends
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("max_k", [1, 4, 64])
+def test_matches_brute_force(seed, max_k):
+    rng = np.random.default_rng(seed)
+    target_coords, target_starts, target_ends, coords, starts, ends = _random_case(
+        rng, int(rng.integers(1, 300)), int(rng.integers(1, 200))
+    )
+    distances = nearest_overlapping(
+        KDTree(target_coords),
+        target_starts,
+        target_ends,
+        coords,
+        starts,
+        ends,
+        max_k=max_k,
+    )
+    expected = _brute(target_coords, target_starts, target_ends, coords, starts, ends)
+    np.testing.assert_allclose(distances, expected, rtol=0, atol=1e-9)
+
+
+def _exact_counts(target_starts, target_ends, starts, ends):
+    return (
+        (target_starts[None, :] <= ends[:, None])
+        & (starts[:, None] <= target_ends[None, :])
+    ).sum(axis=1)
+
+
+def test_overlap_counts():
+    rng = np.random.default_rng(0)
+    target_starts = rng.integers(0, 5000, 300)
+    target_ends = target_starts + rng.integers(0, 800, 300)
+    starts = rng.integers(0, 5000, 200)
+    ends = starts + rng.integers(0, 800, 200)
+    counts = overlap_counts(target_starts, target_ends, starts, ends)
+    assert (counts == _exact_counts(target_starts, target_ends, starts, ends)).all()
+
+
+def test_overlap_counts_never_undercount():
+    # 시작일 > 종료일인 대상 업장이 있어도 겹치는 업장 수보다 적게 세지 않는다.
+    # (시작일 > 종료일인 기준 업장은 nearest_overlapping 이 항상 조회한다)
+    rng = np.random.default_rng(1)
+    _, target_starts, target_ends, _, starts, ends = _random_case(rng, 300, 200)
+    counts = overlap_counts(target_starts, target_ends, starts, ends)
+    exact = _exact_counts(target_starts, target_ends, starts, ends)
+    ordered = starts <= ends
+    assert (counts[ordered] >= exact[ordered]).all()
+
+
+def test_no_overlapping_target_is_nan():
+    # 대상 업종이 모두 나중에 영업하면 조회 없이 NaN
+    rng = np.random.default_rng(0)
+    target_coords = rng.uniform(0, 1000, (500, 2))
+    coords = rng.uniform(0, 1000, (50, 2))
+    distances = nearest_overlapping(
+        KDTree(target_coords),
+        np.full(500, 100),
+        np.full(500, 200),
+        coords,
+        np.full(50, 0),
+        np.full(50, 50),
+    )
+    assert np.isnan(distances).all()
@@ -0,0 +1,90 @@
+import pandas as pd
+import pytest
+
+from merge_shards import REPORT_NAME, merge_shard_group, merge_shards
+from raw_reader import iter_raw_chunks
+
+HEADER = "관리번호,업종,값\n"
+# 필드가 헤더보다 많은 행은 chunk 경계와 관계없이 건너뛴다.
+# {이름: (데이터 행, 남는 관리번호, 건너뛴 행 번호 (헤더 = 0))}
+BAD_ROWS = {
+    "first_row": ("7,8,9,X\n1,2,3\n4,5,6\n", ["1", "4"], [1]),
+    "chunk_boundary": ("1,2,3\n4,5,6\n7,8,9,X\n10,11,12\n", ["1", "4", "10"], [3]),
+    "consecutive": ("1,2,3\n7,8,9,X\n10,11,12,Y\n4,5,6\n", ["1", "4"], [2, 3]),
+    "blank_line": ("1,2,3\n\n7,8,9,X\n4,5,6\n", ["1", "4"], [3]),
+    "quoted": ('1,"가,나",3\n7,"8",9,X\n4,"5\n6",6\n', ["1", "4"], [2]),
+    "mid_field_quote": ('1,a"b,3\n7,8,9,"X"\n4,5,6\n', ["1", "4"], [2]),
+    "last_row": ("1,2,3\n4,5,6\n7,8,9,X", ["1", "4"], [3]),
+}
+
+
+def _read(path, chunksize):
+    bad_lines = []
+    chunks = list(
+        iter_raw_chunks(
+            str(path), chunksize=chunksize, encoding="utf-8", bad_lines=bad_lines
+        )
+    )
+    return pd.concat(chunks, ignore_index=True), bad_lines
+
+
+@pytest.mark.parametrize("name", sorted(BAD_ROWS))
+@pytest.mark.parametrize("chunksize", [1, 2, 3, 1000])
+def test_bad_rows_skipped_for_any_chunksize(tmp_path, name, chunksize):
+    rows, kept, skipped = BAD_ROWS[name]
+    path = tmp_path / "table.csv"
+    path.write_text(HEADER + rows, encoding="utf-8")
+    df, bad_lines = _read(path, chunksize)
+    assert list(df.columns) == ["관리번호", "업종", "값"]
+    assert df["관리번호"].tolist() == kept
+    assert bad_lines == skipped
+
+
+def test_clean_file_reads_every_row(tmp_path):
+    path = tmp_path / "table.csv"
+    path.write_text(HEADER + '1,"가,나",3\n4,"5\n6",6\n\n7,8,\n', encoding="utf-8")
+    df, bad_lines = _read(path, 1)
+    assert df.fillna("").values.tolist() == [
+        ["1", "가,나", "3"],
+        ["4", "5\n6", "6"],
+        ["7", "8", ""],
+    ]
+    assert bad_lines == []
+
+
+@pytest.mark.parametrize("chunksize", [1, 2, 1000])
+def test_merge_reports_bad_row_at_chunk_boundary(tmp_path, chunksize):
+    input_folder = tmp_path / "shards"
+    input_folder.mkdir()
+    (input_folder / "fulldata_01_01_01_P_약국.csv").write_text(
+        HEADER + "A1,가,1\nA2,나,2\n", encoding="utf-8"
+    )
+    # 두 번째 shard 의 세 번째 행이 chunksize=2 에서 chunk 의 첫 행이 된다.
+    (input_folder / "fulldata_01_01_02_P_약국.csv").write_text(
+        HEADER + "A1,가,1\nA4,라,4\nA3,다,3,X\nA5,마,5\n", encoding="utf-8"
+    )
+    output_folder = tmp_path / "merged"
+    merge_shards(
+        str(input_folder), str(output_folder), max_workers=1, chunksize=chunksize
+    )
+
+    merged = pd.read_csv(output_folder / "fulldata_01_01_merged.csv", dtype=str)
+    assert merged["관리번호"].tolist() == ["A1", "A2", "A4", "A5"]
+    report = pd.read_csv(output_folder / REPORT_NAME)
+    assert report["읽은 행 수"].tolist() == [2, 3]
+    assert report["중복 제거 수"].tolist() == [0, 1]
+    assert report["잘못된 행 수"].tolist() == [0, 1]
+
+
+def test_merge_group_counts_bad_first_row(tmp_path):
+    (tmp_path / "fulldata_01_01_01_P_약국.csv").write_text(
+        HEADER + "A0,가,0,X\nA1,나,1\n", encoding="utf-8"
+    )
+    groups = {"fulldata_01_01": ["fulldata_01_01_01_P_약국.csv"]}
+    result = merge_shard_group(
+        "fulldata_01_01", groups, str(tmp_path), str(tmp_path), chunksize=1
+    )
+    assert result["rows"] == 1
+    assert result["shards"][0]["bad_lines"] == 1
+    merged = pd.read_csv(tmp_path / "fulldata_01_01_merged.csv", dtype=str)
+    assert merged.values.tolist() == [["A1", "나", "1"]]
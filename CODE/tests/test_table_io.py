@@ -0,0 +1,90 @@
+import csv
+import io
+
+import pandas as pd
+import pytest
+
+from table_io import count_csv_rows, long_csv_records
+
+# count_csv_rows 결과는 pd.read_csv 로 읽은 행 수와 같아야 한다.
+CASES = {
+    "plain": "a,b\n1,2\n3,4\n",
+    "no_trailing_newline": "a,b\n1,2\n3,4",
+    "crlf": "a,b\r\n1,2\r\n3,4\r\n",
+    "blank_lines": "a,b\n\n1,2\n\n\n3,4\n\n",
+    "cr_only_line": "a,b\n1,2\n\r\n3,4\n",
+    "space_line": "a,b\n1,2\n   \n3,4\n",
+    "tab_line": "a,b\n1,2\n\t\n3,4\n",
+    "mixed_whitespace_crlf": "a,b\r\n1,2\r\n \t \r\n3,4\r\n",
+    "whitespace_last_line": "a,b\n1,2\n3,4\n  ",
+    "leading_space_value": "a,b\n 1,2 \n3,4\n",
+    "quoted_newline": 'a,b\n"x\ny",2\n"z",4\n',
+    "quoted_blank_line": 'a,b\n"x\n\n  \ny",2\n3,4\n',
+    "escaped_quote": 'a,b\n"say ""hi""\nthere",2\n3,4\n',
+    "header_only": "a,b\n",
+    "korean_cp949": "업종,주소\n약국,서울특별시 강남구\n  \n미용업,서울특별시 종로구\n",
+}
+
+# 바이트 검사로 판단할 수 없어 pd.read_csv 로 세는 경우
+IRREGULAR_CASES = {
+    "mid_field_quote": 'a,b\n카페"A,2\n3,4\n5,6\n',
+    "quote_after_quoted": 'a,b\n"x"y,2\n3,4\n',
+    "cr_only": "a,b\r1,2\r3,4\r",
+    "mid_field_quote_blank_lines": 'a,b\n1,x"y\n\n  \n3,4\n',
+}
+
+
+@pytest.mark.parametrize("name", sorted({**CASES, **IRREGULAR_CASES}))
+@pytest.mark.parametrize("encoding", ["utf-8", "utf-8-sig", "cp949"])
+@pytest.mark.parametrize("block_size", [3, 1 << 24])
+def test_count_matches_read_csv(tmp_path, name, encoding, block_size):
+    text = {**CASES, **IRREGULAR_CASES}[name]
+    path = tmp_path / "table.csv"
+    path.write_bytes(text.encode(encoding))
+    expected = len(pd.read_csv(io.BytesIO(path.read_bytes()), encoding=encoding))
+    assert count_csv_rows(str(path), block_size=block_size) == expected
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "empty.csv"
+    path.write_bytes(b"")
+    assert count_csv_rows(str(path)) == 0
+
+
+@pytest.mark.parametrize("stop_after", [0, 5, 49, 50, 51, 200])
+@pytest.mark.parametrize("row", ["1", 'x"y'])
+def test_stop_after(tmp_path, stop_after, row):
+    # stop_after 를 넘으면 멈추지만, 반환값과 stop_after 의 대소 관계는 실제 행 수와 같다.
+    path = tmp_path / "table.csv"
+    path.write_text("a\n" + f"{row}\n \n" * 100)
+    count = count_csv_rows(str(path), stop_after=stop_after, block_size=16)
+    assert (count > stop_after) == (100 > stop_after)
+    assert count <= 100
+
+
+# long_csv_records 는 csv 모듈로 센 필드 수가 헤더보다 많은 행 번호와 같아야 한다.
+LONG_CASES = {
+    **CASES,
+    "long_rows": "a,b\n1,2,3\n\n3,4\n5,6,7,8",
+    "quoted_comma": 'a,b\n"1,2",3\n"x\n,y",4,5\n"say ""a,b""",6\n',
+}
+
+
+@pytest.mark.parametrize("name", sorted(LONG_CASES))
+@pytest.mark.parametrize("block_size", [3, 1 << 24])
+def test_long_records_match_csv_module(tmp_path, name, block_size):
+    path = tmp_path / "table.csv"
+    path.write_bytes(LONG_CASES[name].encode("utf-8"))
+    rows = list(csv.reader(io.StringIO(LONG_CASES[name], newline="")))
+    expected = [row for row, values in enumerate(rows) if len(values) > len(rows[0])]
+    assert long_csv_records(str(path), len(rows[0]), block_size=block_size) == expected
+
+
+@pytest.mark.parametrize(
+    "text", ['a,b\n1,x"y"\n', 'a,b\n"1"x,2\n', 'a,b\n"1,2\n', "a,b\r1,2\r"]
+)
+def test_long_records_unknown(tmp_path, text):
+    # 필드 중간의 따옴표, 닫히지 않은 따옴표, '\r' 만으로 바꾼 줄은 판단하지 않는다.
+    path = tmp_path / "table.csv"
+    path.write_bytes(text.encode("utf-8"))
+    assert long_csv_records(str(path), 2) is None